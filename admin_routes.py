@@ -0,0 +1,1210 @@
+"""
+Blueprint 'admin' : tableau de bord, gestion des réservations et des contenus,
+import/export, flux temps réel, et authentification (/login, /admin/login).
+"""
+import base64
+import json
+import logging
+import os
+import secrets
+import time
+from datetime import date, datetime
+from functools import wraps
+
+from flask import (Blueprint, Response, current_app, flash, jsonify, redirect, render_template, request, session,
+                   stream_with_context, url_for)
+from sqlalchemy import func, tuple_
+from werkzeug.security import check_password_hash
+from werkzeug.utils import secure_filename
+
+from chunked_upload import UploadError
+from data_export import image_entry_name, iter_csv, iter_jsonl, iter_zip
+from db_pool import pool_stats
+from extensions import db
+from image_assets import attach_image, duplicate_warning, find_duplicate_clusters, iter_image_chunks, release_image
+from image_utils import allowed_file, get_image_attrs
+from models import (CHANGE_NOTIFY_CHANNEL, ChangeLog, ImageAsset, ImagePurge, Leaderboard, Photo,
+                    Reservation, ReservationPending, User, WallOfShame, purge_change_log, search_pending_reservations,
+                    serialize_pending)
+from reservation_import import parse_import_file, resolve_conflicts
+from server_session import regenerate_session
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('admin', __name__)
+
+# Pagination par clé (keyset) pour les listes de l'admin
+ADMIN_PAGE_SIZE = 50
+ADMIN_MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at, row_id):
+    """Encode la position (created_at, id) du dernier élément d'une page"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Décode un curseur de pagination, lève ValueError s'il est invalide"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError('Curseur de pagination invalide')
+
+def page_limit(args):
+    """Taille de page demandée (?limit=), plafonnée ; lève ValueError si elle n'est pas positive"""
+    limit = args.get('limit', ADMIN_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError('limit doit être positif')
+    return min(limit, ADMIN_MAX_PAGE_SIZE)
+
+def keyset_paginate(query, model, cursor=None, limit=ADMIN_PAGE_SIZE):
+    """
+    Retourne (éléments, curseur suivant) triés par (created_at, id) décroissants.
+    Le curseur suivant vaut None sur la dernière page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def apply_listing_filters(query, model, args):
+    """
+    Filtres communs des listes admin :
+    status, from/to (séjours qui chevauchent la fenêtre, format YYYY-MM-DD)
+    """
+    status = args.get('status', '').strip()
+    if status:
+        query = query.filter(model.status == status)
+    
+    date_from = args.get('from', '').strip()
+    if date_from:
+        query = query.filter(model.end_date >= datetime.strptime(date_from, '%Y-%m-%d').date())
+    
+    date_to = args.get('to', '').strip()
+    if date_to:
+        query = query.filter(model.start_date <= datetime.strptime(date_to, '%Y-%m-%d').date())
+    
+    return query
+
+def serialize_reservation(reservation):
+    """Représentation JSON d'une réservation pour l'admin"""
+    return {
+        'id': reservation.id,
+        'guest_name': reservation.guest_name,
+        'start_date': reservation.start_date.isoformat(),
+        'end_date': reservation.end_date.isoformat(),
+        'status': reservation.status,
+        'created_at': reservation.created_at.isoformat() if reservation.created_at else None
+    }
+
+def import_reservations(filename, content, dry_run=False):
+    """
+    Importe un fichier CSV ou iCalendar de réservations.
+    Une seule requête pour les réservations existantes, un seul INSERT groupé.
+    Retourne un rapport {'imported', 'rejected', 'dry_run'}.
+    """
+    rows, errors = parse_import_file(filename, content)
+    
+    # Charger uniquement les réservations approuvées qui recouvrent la période du fichier
+    existing = []
+    approved_rows = [row for row in rows if row['status'] == 'approved']
+    if approved_rows:
+        window_start = min(row['start_date'] for row in approved_rows)
+        window_end = max(row['end_date'] for row in approved_rows)
+        existing = db.session.query(Reservation.start_date, Reservation.end_date, Reservation.guest_name).filter(
+            Reservation.status == 'approved',
+            Reservation.start_date < window_end,
+            Reservation.end_date > window_start
+        ).all()
+    
+    accepted, conflicts = resolve_conflicts(rows, existing)
+    errors.extend(conflicts)
+    
+    if accepted and not dry_run:
+        db.session.execute(db.insert(Reservation), [{
+            'start_date': row['start_date'],
+            'end_date': row['end_date'],
+            'guest_name': row['guest_name'],
+            'status': row['status'],
+            'token': secrets.token_urlsafe(32)
+        } for row in accepted])
+        db.session.commit()
+    
+    return {
+        'imported': len(accepted),
+        'rejected': sorted(errors, key=lambda error: error['line']),
+        'dry_run': dry_run
+    }
+
+def decode_upload(raw):
+    """Décode un fichier texte téléversé (UTF-8 avec ou sans BOM, sinon Latin-1 pour les exports Excel)"""
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+# Export / sauvegarde en flux
+# dataset -> (modèle, colonnes exportées) ; les images binaires sont exportées à part dans le ZIP
+# image_assets en premier : les autres datasets y font référence (restauration dans cet ordre)
+EXPORT_DATASETS = {
+    'image_assets': (ImageAsset, ['id', 'token', 'content_hash', 'mime_type', 'width', 'height', 'byte_size',
+                                  'phash', 'placeholder', 'created_at']),
+    'reservations': (Reservation, ['id', 'start_date', 'end_date', 'guest_name', 'status', 'created_at', 'token']),
+    'pending': (ReservationPending, ['id', 'start_date', 'end_date', 'guest_name', 'nickname', 'status',
+                                     'created_at', 'ip_address', 'user_agent']),
+    'leaderboard': (Leaderboard, ['id', 'person_name', 'visit_count', 'rank_position', 'last_visit',
+                                  'image_token', 'image_asset_id', 'image_url', 'created_at']),
+    'wall_of_shame': (WallOfShame, ['id', 'person_name', 'image_token', 'image_asset_id', 'image_url',
+                                    'created_at', 'display_order']),
+    'photos': (Photo, ['id', 'filename', 'image_token', 'image_asset_id', 'caption', 'display_order',
+                       'created_at']),
+}
+IMAGE_DATASETS = ('image_assets',)
+
+def iter_dataset_rows(dataset):
+    """Lignes d'un dataset sous forme de dicts, lues par lots via un curseur serveur"""
+    model, fields = EXPORT_DATASETS[dataset]
+    query = db.session.query(*[getattr(model, field) for field in fields]).order_by(model.id)
+    for row in query.execution_options(yield_per=500):
+        yield row._asdict()
+
+def iter_dataset_images(dataset):
+    """(nom dans l'archive, morceaux d'octets) pour chaque image stockée en base, lue par morceaux"""
+    model = EXPORT_DATASETS[dataset][0]
+    query = db.session.query(model.id, model.mime_type, model.byte_size).order_by(model.id)
+    for row_id, mime_type, byte_size in query.execution_options(yield_per=500):
+        yield image_entry_name(dataset, row_id, mime_type), iter_image_chunks(row_id, byte_size)
+
+def iter_backup_archive():
+    """Entrées du ZIP de sauvegarde : manifest, un JSONL par dataset, puis les images"""
+    manifest = {
+        'app_version': current_app.config['APP_VERSION'],
+        'created_at': datetime.utcnow().isoformat(),
+        'datasets': list(EXPORT_DATASETS)
+    }
+    yield 'manifest.json', [json.dumps(manifest, indent=2).encode('utf-8')], True
+    for dataset in EXPORT_DATASETS:
+        yield f'data/{dataset}.jsonl', iter_jsonl(iter_dataset_rows(dataset)), True
+    for dataset in IMAGE_DATASETS:
+        for name, chunks in iter_dataset_images(dataset):
+            yield name, chunks, False
+
+# Décorateur pour vérifier l'authentification admin
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not session.get('is_admin'):
+            flash('Accès refusé. Connexion admin requise.', 'error')
+            return redirect(url_for('admin.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def update_expired_reservations():
+    """Passer les réservations passées en statut 'expired' (Passée)"""
+    today = date.today()
+
+    # Marquer les réservations expirées
+    expired_count = ReservationPending.query.filter(
+        ReservationPending.end_date < today,
+        ReservationPending.status == 'pending'
+    ).update({'status': 'expired'})
+
+    db.session.commit()
+
+    if expired_count > 0:
+        logger.info("Marcqué %s réservation(s) comme expirée(s)", expired_count)
+
+    return expired_count
+
+# Expiration des demandes passées, faite ici plutôt que sur /api/reservations
+# qui reste en lecture seule (servie par le réplica), et purge du journal des changements
+# (sinon seulement au démarrage du worker : la table grossirait jusqu'au prochain déploiement)
+HOUSEKEEPING_INTERVAL_SECONDS = 300
+_last_housekeeping = 0.0
+
+@bp.before_request
+def admin_housekeeping():
+    """Au plus une fois toutes les 5 minutes par processus, avant une page admin"""
+    global _last_housekeeping
+    if not session.get('is_admin') or time.monotonic() - _last_housekeeping < HOUSEKEEPING_INTERVAL_SECONDS:
+        return None
+    _last_housekeeping = time.monotonic()
+    try:
+        update_expired_reservations()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("Expiration des réservations en attente: %s", e)
+    try:
+        purged = purge_change_log(current_app.config['CHANGE_LOG_RETENTION_HOURS'])
+        db.session.commit()
+        if purged:
+            logger.info("Journal des changements: %s entrée(s) purgée(s)", purged)
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("Purge du journal des changements: %s", e)
+    return None
+
+@bp.route('/admin')
+@admin_required
+def dashboard():
+    # Première page seulement, la suite est chargée via /admin/api/reservations
+    reservations, next_cursor = keyset_paginate(Reservation.query, Reservation)
+    status_counts = dict(
+        db.session.query(Reservation.status, func.count(Reservation.id)).group_by(Reservation.status).all()
+    )
+    # Compter les réservations en attente
+    pending_count = ReservationPending.query.filter_by(status='pending').count()
+    return render_template('admin_dashboard.html', reservations=reservations, next_cursor=next_cursor,
+                           status_counts=status_counts, total_count=sum(status_counts.values()),
+                           pending_count=pending_count)
+
+@bp.route('/admin/api/reservations')
+@admin_required
+def admin_api_reservations():
+    """
+    Liste paginée des réservations (pagination par clé).
+    Paramètres : cursor, limit, status, from, to, q (nom)
+    """
+    try:
+        query = apply_listing_filters(Reservation.query, Reservation, request.args)
+        search_term = request.args.get('q', '').strip()
+        if search_term:
+            query = query.filter(Reservation.guest_name.ilike(f'%{search_term}%'))
+        limit = page_limit(request.args)
+        reservations, next_cursor = keyset_paginate(query, Reservation, request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'items': [serialize_reservation(r) for r in reservations],
+        'next_cursor': next_cursor
+    })
+
+@bp.route('/admin/api/pending')
+@admin_required
+def admin_api_pending():
+    """
+    Liste paginée des réservations en attente (pagination par clé).
+    Paramètres : cursor, limit, status, from, to
+    """
+    try:
+        query = apply_listing_filters(ReservationPending.query, ReservationPending, request.args)
+        limit = page_limit(request.args)
+        pending, next_cursor = keyset_paginate(query, ReservationPending, request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'items': [serialize_pending(p) for p in pending],
+        'next_cursor': next_cursor
+    })
+
+def _open_change_listener():
+    """PostgreSQL : connexion dédiée (hors pool) en LISTEN sur le canal des changements"""
+    if db.engine.dialect.name != 'postgresql':
+        return None
+    try:
+        import psycopg2
+        import psycopg2.extensions
+        url = db.engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        connection = psycopg2.connect(url)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        connection.cursor().execute(f"LISTEN {CHANGE_NOTIFY_CHANNEL}")
+        return connection
+    except Exception as e:
+        logger.warning("LISTEN indisponible, interrogation périodique du journal: %s", e)
+        return None
+
+def _wait_for_changes(listener, timeout):
+    """Attend une notification PostgreSQL, ou simplement le délai d'interrogation"""
+    if listener is None:
+        time.sleep(timeout)
+        return
+    import select as io_select
+    if io_select.select([listener], [], [], timeout)[0]:
+        listener.poll()
+        listener.notifies.clear()
+
+def build_change_events(changes):
+    """Transforme des lignes du journal en événements pour le tableau de bord"""
+    reservation_ids = {c.row_id for c in changes if c.table_name == 'reservation' and c.row_id and c.action != 'delete'}
+    reservations = {r.id: r for r in Reservation.query.filter(Reservation.id.in_(reservation_ids))} if reservation_ids else {}
+    pending_count = None
+    if any(c.table_name == 'reservation_pending' for c in changes):
+        pending_count = ReservationPending.query.filter_by(status='pending').count()
+    
+    events = []
+    for change in changes:
+        payload = {'table': change.table_name, 'action': change.action, 'id': change.row_id}
+        if change.table_name == 'reservation' and change.row_id in reservations:
+            payload['reservation'] = serialize_reservation(reservations[change.row_id])
+        if change.table_name == 'reservation_pending':
+            payload['pending_count'] = pending_count
+        events.append((change.id, payload))
+    return events
+
+@bp.route('/admin/api/changes')
+@admin_required
+def admin_changes():
+    """
+    Écritures sur les réservations depuis ?after=<id> : mêmes événements que /admin/events,
+    pour les navigateurs qui interrogent au lieu de garder un flux ouvert (workers sync).
+    Sans after : seulement le dernier id, point de départ des interrogations suivantes.
+    """
+    try:
+        after = request.args.get('after', type=int)
+        if after is None:
+            last_id = db.session.query(func.max(ChangeLog.id)).scalar() or 0
+            return jsonify({'success': True, 'last_id': last_id, 'events': []})
+        changes = ChangeLog.query.filter(ChangeLog.id > after).order_by(ChangeLog.id).limit(100).all()
+        events = build_change_events(changes) if changes else []
+        return jsonify({'success': True, 'last_id': events[-1][0] if events else after,
+                        'events': [{'event_id': event_id, **payload} for event_id, payload in events]})
+    except Exception as e:
+        logger.error("Erreur lors de la lecture des changements: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/api/rate-limit')
+@admin_required
+def admin_rate_limit_stats():
+    """Compteurs du limiteur de /reserver (ce processus) et seaux les plus rejetés (tous workers)"""
+    try:
+        return jsonify({'success': True, 'enabled': current_app.config['RATE_LIMIT_ENABLED'],
+                        **current_app.extensions['reservation_limiter'].stats()})
+    except Exception as e:
+        logger.error("Erreur lors de la lecture des statistiques du limiteur: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/api/db-pool')
+@admin_required
+def admin_db_pool_stats():
+    """État et compteurs des pools de connexions (ce processus) : base principale et réplica"""
+    try:
+        return jsonify({'success': True, 'pid': os.getpid(),
+                        'pools': {key or 'primary': pool_stats(engine) for key, engine in db.engines.items()}})
+    except Exception as e:
+        logger.error("Erreur lors de la lecture des statistiques du pool: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/api/image-duplicates')
+@admin_required
+def admin_image_duplicates():
+    """Groupes d'images identiques ou proches (photos, Wall of Shame, leaderboard) ; ?distance= en bits"""
+    try:
+        max_distance = request.args.get('distance', current_app.config['IMAGE_DUPLICATE_DISTANCE'], type=int)
+        max_distance = max(0, min(max_distance, 64))
+        clusters = find_duplicate_clusters(max_distance)
+        return jsonify({'success': True, 'distance': max_distance, 'count': len(clusters), 'clusters': clusters})
+    except Exception as e:
+        logger.error("Erreur lors de la recherche des doublons d'images: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/api/image-purges')
+@admin_required
+def admin_image_purges():
+    """
+    URLs d'images supprimées ou remplacées, à purger du proxy ou du CDN (IMAGE_PUBLIC_CACHE) ;
+    ?after=<id> : seulement celles enregistrées depuis le dernier appel (last_id)
+    """
+    try:
+        after = request.args.get('after', 0, type=int)
+        purges = ImagePurge.query.filter(ImagePurge.id > after).order_by(ImagePurge.id).limit(1000).all()
+        return jsonify({
+            'success': True,
+            'last_id': purges[-1].id if purges else after,
+            'purges': [{'id': purge.id, 'url': purge.url,
+                        'created_at': purge.created_at.isoformat() if purge.created_at else None}
+                       for purge in purges],
+        })
+    except Exception as e:
+        logger.error("Erreur lors de la lecture des purges d'images: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/events')
+@admin_required
+def admin_events():
+    """
+    Flux Server-Sent Events des écritures sur les réservations.
+    Alimenté par ChangeLog ; réveil par LISTEN/NOTIFY sur PostgreSQL, interrogation périodique sinon.
+    Reprise après reconnexion grâce à l'en-tête Last-Event-ID.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    if last_event_id is None:
+        # Première connexion : ne pas rejouer l'historique
+        last_event_id = db.session.query(func.max(ChangeLog.id)).scalar() or 0
+    db.session.close()
+    
+    poll_seconds = current_app.config['ADMIN_EVENTS_POLL_SECONDS']
+    max_seconds = current_app.config['ADMIN_EVENTS_MAX_SECONDS']
+    
+    def generate():
+        last_id = last_event_id
+        listener = _open_change_listener()
+        deadline = time.monotonic() + max_seconds
+        last_ping = time.monotonic()
+        try:
+            yield 'retry: 3000\n\n'
+            while time.monotonic() < deadline:
+                changes = ChangeLog.query.filter(ChangeLog.id > last_id).order_by(ChangeLog.id).limit(100).all()
+                events = build_change_events(changes) if changes else []
+                # Rendre la connexion au pool entre deux interrogations
+                db.session.close()
+                
+                for event_id, payload in events:
+                    last_id = event_id
+                    yield f"id: {event_id}\nevent: change\ndata: {json.dumps(payload)}\n\n"
+                
+                if not events:
+                    if time.monotonic() - last_ping > 15:
+                        # Commentaire SSE : garde la connexion ouverte et détecte les clients partis
+                        last_ping = time.monotonic()
+                        yield ': ping\n\n'
+                    _wait_for_changes(listener, poll_seconds)
+        finally:
+            if listener is not None:
+                listener.close()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Désactiver la mise en tampon du reverse proxy
+    return response
+
+@bp.route('/admin/login', methods=['GET', 'POST'])
+def admin_login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        
+        # Vérification normale du mot de passe
+        user = User.query.filter_by(username=username).first()
+        
+        if user and check_password_hash(user.password_hash, password) and user.is_admin:
+            regenerate_session()
+            session['user_id'] = user.id
+            session['username'] = user.username
+            session['is_admin'] = True
+            flash('Connexion réussie !', 'success')
+            logger.info("Connexion admin: %s", username)
+            return redirect(url_for('admin.dashboard'))
+        else:
+            flash('Nom d\'utilisateur ou mot de passe incorrect.', 'error')
+            logger.warning("Tentative de connexion échouée pour: %s", username)
+    
+    return render_template('admin_login.html')
+
+@bp.route('/admin/add', methods=['GET', 'POST'])
+@admin_required
+def admin_add_reservation():
+    if request.method == 'POST':
+        try:
+            start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
+            
+            if start_date >= end_date:
+                return jsonify({'success': False, 'message': 'Le jour de départ doit être après le jour d\'arrivée !'})
+            
+            if start_date < date.today():
+                return jsonify({'success': False, 'message': 'Impossible de réserver dans le passé !'})
+            
+            # Vérifier les conflits
+            conflicting = Reservation.query.filter(
+                Reservation.status == 'approved',
+                Reservation.start_date < end_date,
+                Reservation.end_date > start_date
+            ).first()
+            
+            if conflicting:
+                return jsonify({'success': False, 'message': f'Ces dates sont déjà réservées par {conflicting.guest_name} !'})
+            
+            token = secrets.token_urlsafe(32)
+            
+            reservation = Reservation(
+                start_date=start_date,
+                end_date=end_date,
+                guest_name=request.form['guest_name'],
+                status=request.form['status'],
+                token=token
+            )
+            
+            db.session.add(reservation)
+            db.session.commit()
+            
+            logger.info("Réservation admin créée pour %s", request.form['guest_name'])
+            return jsonify({'success': True, 'message': 'Réservation créée avec succès !'})
+            
+        except Exception as e:
+            logger.error("Erreur lors de la création de réservation admin: %s", e)
+            return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+    
+    return render_template('admin_add.html')
+
+@bp.route('/admin/import', methods=['POST'])
+@admin_required
+def admin_import_reservations():
+    """Importer des réservations depuis un fichier CSV ou iCalendar (.ics)"""
+    try:
+        file = request.files.get('file')
+        if not file or not file.filename:
+            return jsonify({'success': False, 'message': 'Aucun fichier sélectionné'})
+        
+        dry_run = request.form.get('dry_run') in ('1', 'true', 'on')
+        report = import_reservations(file.filename, decode_upload(file.read()), dry_run=dry_run)
+        
+        logger.info("Import de réservations (%s): %s importée(s), %s rejetée(s)%s",
+                    file.filename, report['imported'], len(report['rejected']), ' [simulation]' if dry_run else '')
+        return jsonify({'success': True, **report})
+        
+    except Exception as e:
+        logger.error("Erreur lors de l'import de réservations: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/export/<dataset>.<fmt>')
+@admin_required
+def admin_export_dataset(dataset, fmt):
+    """Export en flux d'un dataset (reservations, pending, leaderboard, wall_of_shame, photos) en JSONL ou CSV"""
+    if dataset not in EXPORT_DATASETS or fmt not in ('jsonl', 'csv'):
+        return '', 404
+    
+    rows = iter_dataset_rows(dataset)
+    if fmt == 'csv':
+        body, mimetype = iter_csv(rows, EXPORT_DATASETS[dataset][1]), 'text/csv'
+    else:
+        body, mimetype = iter_jsonl(rows), 'application/x-ndjson'
+    
+    filename = f"chez-meme-{dataset}-{date.today().isoformat()}.{fmt}"
+    logger.info("Export %s.%s", dataset, fmt)
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store'
+    })
+
+@bp.route('/admin/export/archive.zip')
+@admin_required
+def admin_export_archive():
+    """Sauvegarde complète (données + images) en ZIP généré au fil de l'eau. Restauration : restore_backup.py"""
+    filename = f"chez-meme-backup-{date.today().isoformat()}.zip"
+    logger.info("Export de la sauvegarde complète")
+    return Response(stream_with_context(iter_zip(iter_backup_archive())), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store'
+    })
+
+@bp.route('/admin/edit/<int:reservation_id>', methods=['POST'])
+@admin_required
+def admin_edit_reservation(reservation_id):
+    try:
+        reservation = Reservation.query.get_or_404(reservation_id)
+        
+        start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
+        
+        if start_date >= end_date:
+            return jsonify({'success': False, 'message': 'Le jour de départ doit être après le jour d\'arrivée !'})
+        
+        # Vérifier les conflits (en excluant la réservation actuelle)
+        conflicting = Reservation.query.filter(
+            Reservation.id != reservation_id,
+            Reservation.status == 'approved',
+            Reservation.start_date < end_date,
+            Reservation.end_date > start_date
+        ).first()
+        
+        if conflicting:
+            return jsonify({'success': False, 'message': f'Ces dates sont déjà réservées par {conflicting.guest_name} !'})
+        
+        reservation.guest_name = request.form['guest_name']
+        reservation.start_date = start_date
+        reservation.end_date = end_date
+        reservation.status = request.form['status']
+        
+        db.session.commit()
+        
+        logger.info("Réservation %s modifiée", reservation_id)
+        return jsonify({'success': True, 'message': 'Réservation modifiée avec succès !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la modification de réservation: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/delete/<int:reservation_id>', methods=['DELETE'])
+@admin_required
+def admin_delete_reservation(reservation_id):
+    try:
+        reservation = Reservation.query.get_or_404(reservation_id)
+        guest_name = reservation.guest_name
+        
+        db.session.delete(reservation)
+        db.session.commit()
+        
+        logger.info("Réservation supprimée: %s", guest_name)
+        return jsonify({'success': True, 'message': f'Réservation de {guest_name} supprimée avec succès !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la suppression de réservation: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+# Routes pour la gestion des photos
+@bp.route('/admin/photos')
+@admin_required
+def admin_photos():
+    photos = Photo.query.order_by(Photo.display_order, Photo.created_at).all()
+    return render_template('admin_photos.html', photos=photos, get_image_attrs=get_image_attrs,
+                           upload_max_mb=current_app.config['UPLOAD_MAX_FILE_MB'])
+
+@bp.route('/admin/photos/upload', methods=['POST'])
+@admin_required
+def admin_upload_photos():
+    try:
+        if 'photos' not in request.files:
+            return jsonify({'success': False, 'message': 'Aucun fichier sélectionné'})
+        
+        files = request.files.getlist('photos')
+        captions = request.form.getlist('captions')
+        
+        if len(files) > 10:
+            return jsonify({'success': False, 'message': 'Maximum 10 photos autorisées'})
+        
+        uploaded_count = 0
+        warnings = []
+        
+        for i, file in enumerate(files):
+            if file and file.filename and allowed_file(file.filename):
+                # Récupérer la légende correspondante
+                caption = captions[i] if i < len(captions) else ""
+                
+                photo = Photo(
+                    filename=secure_filename(file.filename) or 'image',
+                    caption=caption,
+                    display_order=Photo.query.count() + uploaded_count
+                )
+                attach_image(photo, file.stream)
+                
+                db.session.add(photo)
+                warning = duplicate_warning(photo)
+                if warning:
+                    warnings.append(f"{file.filename} : {warning}")
+                uploaded_count += 1
+        
+        db.session.commit()
+        
+        logger.info("%s photo(s) téléversée(s)", uploaded_count)
+        message = f'{uploaded_count} photo(s) téléversée(s) avec succès !'
+        return jsonify({
+            'success': True, 
+            'message': '\n'.join([message, *warnings]),
+            'warnings': warnings
+        })
+        
+    except Exception as e:
+        logger.error("Erreur lors du téléversement de photos: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+# Téléversement des photos fichier par fichier, par morceaux reprenables (voir chunked_upload.py)
+# POST /admin/uploads -> PUT /admin/uploads/<id>?offset=N (x n) -> POST .../complete -> GET jusqu'à 'done'
+def upload_error_response(error):
+    return jsonify({'success': False, 'message': str(error), 'received': error.received}), error.status
+
+def upload_state_json(state):
+    """Champs de l'état d'un téléversement renvoyés au navigateur"""
+    return {key: state.get(key) for key in ('upload_id', 'filename', 'size', 'received', 'status', 'photo_id',
+                                            'message', 'warning')}
+
+def process_photo_upload(app, upload_id):
+    """Thread du pool de traitement : crée la photo à partir du fichier reçu"""
+    store = app.extensions['upload_store']
+    with app.app_context():
+        try:
+            state = store.status(upload_id)
+            photo = Photo(
+                filename=secure_filename(state['filename']) or 'image',
+                caption=state.get('caption', ''),
+                display_order=Photo.query.count()
+            )
+            with open(store.data_path(upload_id), 'rb') as stream:
+                attach_image(photo, stream)
+            db.session.add(photo)
+            warning = duplicate_warning(photo)
+            db.session.commit()
+            store.finish(upload_id, 'done', photo_id=photo.id, warning=warning)
+            logger.info("Photo %s téléversée par morceaux (%s)", photo.id, state['filename'])
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Erreur lors du traitement du téléversement %s: %s", upload_id, e)
+            store.finish(upload_id, 'error', message=str(e))
+
+@bp.route('/admin/uploads', methods=['POST'])
+@admin_required
+def admin_create_upload():
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename', '')
+    if not allowed_file(filename):
+        return jsonify({'success': False, 'message': 'Format de fichier non autorisé'}), 400
+    try:
+        state = current_app.extensions['upload_store'].create(filename, int(data.get('size', 0)))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Taille de fichier invalide'}), 400
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True, 'chunk_size': current_app.extensions['upload_store'].chunk_size,
+                    **upload_state_json(state)}), 201
+
+@bp.route('/admin/uploads/<upload_id>', methods=['GET'])
+@admin_required
+def admin_upload_status(upload_id):
+    try:
+        state = current_app.extensions['upload_store'].status(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True, **upload_state_json(state)})
+
+@bp.route('/admin/uploads/<upload_id>', methods=['PUT'])
+@admin_required
+def admin_upload_chunk(upload_id):
+    """Corps brut : octets du fichier à partir de ?offset= (octets déjà reçus)"""
+    try:
+        offset = request.args.get('offset', 0, type=int)
+        received = current_app.extensions['upload_store'].append(upload_id, offset, request.stream)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True, 'received': received})
+
+@bp.route('/admin/uploads/<upload_id>/complete', methods=['POST'])
+@admin_required
+def admin_complete_upload(upload_id):
+    """Lance le traitement du fichier dans le pool de threads ; suivre l'état par GET"""
+    data = request.get_json(silent=True) or {}
+    try:
+        state = current_app.extensions['upload_store'].complete(upload_id, caption=data.get('caption', ''))
+    except UploadError as e:
+        return upload_error_response(e)
+    current_app.extensions['upload_executor'].submit(process_photo_upload, current_app._get_current_object(),
+                                                     upload_id)
+    return jsonify({'success': True, **upload_state_json(state)}), 202
+
+@bp.route('/admin/photos/delete/<int:photo_id>', methods=['DELETE'])
+@admin_required
+def admin_delete_photo(photo_id):
+    try:
+        photo = Photo.query.get_or_404(photo_id)
+        
+        # Supprimer le fichier physique (anciennes photos stockées sur disque)
+        if photo.image_asset_id is None:
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], photo.filename)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        
+        # Supprimer de la base de données, avec l'image si aucune autre entrée ne l'utilise
+        image_asset_id = photo.image_asset_id
+        db.session.delete(photo)
+        db.session.flush()
+        release_image(image_asset_id, 'photo')
+        db.session.commit()
+        
+        logger.info("Photo %s supprimée", photo_id)
+        return jsonify({'success': True, 'message': 'Photo supprimée avec succès !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la suppression de photo: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/photos/update-caption/<int:photo_id>', methods=['POST'])
+@admin_required
+def admin_update_caption(photo_id):
+    try:
+        photo = Photo.query.get_or_404(photo_id)
+        photo.caption = request.form.get('caption', '')
+        db.session.commit()
+        
+        return jsonify({'success': True, 'message': 'Légende mise à jour !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la mise à jour de légende: %s", e)
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/photos/update-all', methods=['POST'])
+@admin_required
+def admin_update_all_photos():
+    """Met à jour toutes les photos : légendes et ordre"""
+    try:
+        data = request.get_json()
+        updates = data.get('updates', [])
+        
+        for update in updates:
+            photo = db.session.get(Photo, update['id'])
+            if photo:
+                photo.caption = update.get('caption', '')
+                photo.display_order = update.get('display_order', 0)
+        
+        db.session.commit()
+        
+        logger.info("Photos mises à jour : %s modification(s)", len(updates))
+        return jsonify({'success': True, 'message': f'{len(updates)} photo(s) mise(s) à jour avec succès !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la mise à jour globale: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+# Routes admin pour Wall of Shame
+@bp.route('/admin/wall-of-shame')
+@admin_required
+def admin_wall_of_shame():
+    wall_entries = WallOfShame.query.order_by(WallOfShame.display_order, WallOfShame.created_at.desc()).all()
+    return render_template('admin_wall_of_shame.html', wall_entries=wall_entries, get_image_attrs=get_image_attrs)
+
+@bp.route('/admin/wall-of-shame/upload', methods=['POST'])
+@admin_required
+def admin_upload_wall_entry():
+    try:
+        person_name = request.form.get('person_name', '')
+        if not person_name:
+            return jsonify({'success': False, 'message': 'Le nom de la personne est requis'})
+        
+        if 'photo' not in request.files:
+            return jsonify({'success': False, 'message': 'Aucun fichier sélectionné'})
+        
+        file = request.files['photo']
+        if file and file.filename and allowed_file(file.filename):
+            wall_entry = WallOfShame(
+                person_name=person_name,
+                display_order=WallOfShame.query.count()
+            )
+            image_asset = attach_image(wall_entry, file.stream)
+            
+            db.session.add(wall_entry)
+            warning = duplicate_warning(wall_entry)
+            db.session.commit()
+            
+            logger.info("Entrée Wall of Shame ajoutée pour %s avec l'image token %s...", person_name,
+                        image_asset.token[:10])
+            message = f'Entrée ajoutée pour {person_name} !'
+            return jsonify({'success': True, 'message': f"{message}\n{warning}" if warning else message,
+                            'warning': warning})
+        else:
+            return jsonify({'success': False, 'message': 'Format de fichier non autorisé'})
+            
+    except Exception as e:
+        logger.error("Erreur lors de l'ajout d'entrée Wall of Shame: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/wall-of-shame/delete/<int:entry_id>', methods=['DELETE'])
+@admin_required
+def admin_delete_wall_entry(entry_id):
+    try:
+        entry = WallOfShame.query.get_or_404(entry_id)
+        
+        # Supprimer le fichier physique (local)
+        if entry.image_url:
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], entry.image_url)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        
+        image_asset_id = entry.image_asset_id
+        db.session.delete(entry)
+        db.session.flush()
+        release_image(image_asset_id, 'wall')
+        db.session.commit()
+        
+        logger.info("Entrée Wall of Shame %s supprimée", entry_id)
+        return jsonify({'success': True, 'message': 'Entrée supprimée avec succès !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la suppression: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+# Routes admin pour Leaderboard
+@bp.route('/admin/leaderboard')
+@admin_required
+def admin_leaderboard():
+    leaders = Leaderboard.query.order_by(Leaderboard.rank_position, Leaderboard.visit_count.desc()).all()
+    return render_template('admin_leaderboard.html', leaders=leaders, get_image_attrs=get_image_attrs)
+
+@bp.route('/admin/leaderboard/add', methods=['POST'])
+@admin_required
+def admin_add_leader():
+    try:
+        person_name = request.form.get('person_name', '')
+        visit_count = int(request.form.get('visit_count', 0))
+        
+        if not person_name:
+            return jsonify({'success': False, 'message': 'Le nom de la personne est requis'})
+        
+        leader = Leaderboard(
+            person_name=person_name,
+            visit_count=visit_count,
+            rank_position=Leaderboard.query.count() + 1
+        )
+        
+        # Gérer l'upload de photo (stockage en DB)
+        if 'photo' in request.files:
+            file = request.files['photo']
+            if file and file.filename and allowed_file(file.filename):
+                attach_image(leader, file.stream)
+        
+        db.session.add(leader)
+        warning = duplicate_warning(leader) if leader.image_asset else None
+        db.session.commit()
+        
+        logger.info("Leader ajouté: %s", person_name)
+        message = f'Leader {person_name} ajouté avec succès !'
+        return jsonify({'success': True, 'message': f"{message}\n{warning}" if warning else message,
+                        'warning': warning})
+        
+    except Exception as e:
+        logger.error("Erreur lors de l'ajout de leader: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/leaderboard/update/<int:leader_id>', methods=['POST'])
+@admin_required
+def admin_update_leader(leader_id):
+    try:
+        leader = Leaderboard.query.get_or_404(leader_id)
+        leader.person_name = request.form.get('person_name', leader.person_name)
+        leader.visit_count = int(request.form.get('visit_count', leader.visit_count))
+        
+        # Gérer l'upload de photo (stockage en DB), l'ancienne image est libérée
+        warning = None
+        if 'photo' in request.files:
+            file = request.files['photo']
+            if file and file.filename and allowed_file(file.filename):
+                attach_image(leader, file.stream)
+                warning = duplicate_warning(leader)
+        
+        db.session.commit()
+        
+        logger.info("Leader %s mis à jour", leader_id)
+        message = 'Leader mis à jour avec succès !'
+        return jsonify({'success': True, 'message': f"{message}\n{warning}" if warning else message,
+                        'warning': warning})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la mise à jour: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/leaderboard/delete/<int:leader_id>', methods=['DELETE'])
+@admin_required
+def admin_delete_leader(leader_id):
+    try:
+        leader = Leaderboard.query.get_or_404(leader_id)
+        
+        # Supprimer l'image si elle existe (local)
+        if leader.image_url:
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], leader.image_url)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        
+        image_asset_id = leader.image_asset_id
+        db.session.delete(leader)
+        db.session.flush()
+        release_image(image_asset_id, 'leader')
+        db.session.commit()
+        
+        logger.info("Leader %s supprimé", leader_id)
+        return jsonify({'success': True, 'message': 'Leader supprimé avec succès !'})
+        
+    except Exception as e:
+        logger.error("Erreur lors de la suppression: %s", e)
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+
+@bp.route('/admin/approve/<int:reservation_id>')
+@admin_required
+def admin_approve_reservation(reservation_id):
+    reservation = Reservation.query.get_or_404(reservation_id)
+    reservation.status = 'approved'
+    db.session.commit()
+    flash(f'Réservation de {reservation.guest_name} approuvée !', 'success')
+    return redirect(url_for('admin.dashboard'))
+
+@bp.route('/admin/reject/<int:reservation_id>')
+@admin_required
+def admin_reject_reservation(reservation_id):
+    reservation = Reservation.query.get_or_404(reservation_id)
+    reservation.status = 'rejected'
+    db.session.commit()
+    flash(f'Réservation de {reservation.guest_name} rejetée.', 'info')
+    return redirect(url_for('admin.dashboard'))
+
+# === Routes pour les réservations en attente de validation ===
+
+@bp.route('/admin/pending')
+@admin_required
+def admin_pending_reservations():
+    """Afficher les réservations en attente (première page, la suite via /admin/api/pending)"""
+    pending, next_cursor = keyset_paginate(ReservationPending.query, ReservationPending)
+    pending_total = ReservationPending.query.count()
+    return render_template('admin_pending.html', pending_reservations=pending, next_cursor=next_cursor,
+                           pending_total=pending_total)
+
+@bp.route('/admin/pending/approve/<int:pending_id>', methods=['POST'])
+@admin_required
+def admin_approve_pending(pending_id):
+    """Valider une réservation en attente (statut -> Validée)"""
+    pending = ReservationPending.query.get_or_404(pending_id)
+    
+    try:
+        # Vérifier les conflits
+        conflicting = Reservation.query.filter(
+            Reservation.status == 'approved',
+            Reservation.start_date < pending.end_date,
+            Reservation.end_date > pending.start_date
+        ).first()
+        
+        if conflicting:
+            db.session.delete(pending)
+            db.session.commit()
+            flash(f'Conflit détecté ! Ces dates sont déjà réservées par {conflicting.guest_name}.', 'error')
+        else:
+            # Changer le statut en 'approved' (Validée)
+            pending.status = 'approved'
+            
+            # Créer la réservation dans la table principale
+            token = secrets.token_urlsafe(32)
+            reservation = Reservation(
+                start_date=pending.start_date,
+                end_date=pending.end_date,
+                guest_name=pending.guest_name,
+                status='approved',
+                token=token
+            )
+            db.session.add(reservation)
+            db.session.delete(pending)
+            db.session.commit()
+            flash(f'Réservation de {pending.guest_name} validée !', 'success')
+            logger.info("Réservation validée: %s, %s - %s", pending.guest_name, pending.start_date, pending.end_date)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erreur lors de l\'approbation: {str(e)}', 'error')
+        logger.error("Erreur lors de l'approbation: %s", e)
+    
+    return redirect(url_for('admin.admin_pending_reservations'))
+
+@bp.route('/admin/pending/reject/<int:pending_id>', methods=['POST'])
+@admin_required
+def admin_reject_pending(pending_id):
+    """Rejeter une réservation en attente"""
+    pending = ReservationPending.query.get_or_404(pending_id)
+    guest_name = pending.guest_name
+    db.session.delete(pending)
+    db.session.commit()
+    flash(f'Réservation de {guest_name} rejetée et supprimée.', 'info')
+    logger.info("Réservation rejetée: %s", guest_name)
+    return redirect(url_for('admin.admin_pending_reservations'))
+
+@bp.route('/admin/pending/delete-all', methods=['POST'])
+@admin_required
+def admin_delete_all_pending():
+    """Supprimer toutes les réservations en attente"""
+    try:
+        count = ReservationPending.query.delete()
+        db.session.commit()
+        flash(f'Toutes les réservations en attente ont été supprimées ({count}).', 'info')
+        logger.info("Suppression de toutes les réservations en attente: %s", count)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erreur lors de la suppression: {str(e)}', 'error')
+        logger.error("Erreur lors de la suppression de toutes les réservations: %s", e)
+    
+    return redirect(url_for('admin.admin_pending_reservations'))
+
+@bp.route('/admin/pending/search', methods=['GET', 'POST'])
+@admin_required
+def admin_search_pending():
+    """
+    Rechercher des réservations en attente par nom ou surnom.
+    GET : API JSON paginée pour la recherche instantanée (?q=...&page=1&per_page=20)
+    POST : formulaire classique, rend la page complète
+    """
+    if request.method == 'GET':
+        search_term = request.args.get('q', '').strip()
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+        results = search_pending_reservations(search_term, page=page, per_page=per_page)
+        return jsonify({
+            'success': True,
+            'results': [serialize_pending(p) for p in results.items],
+            'page': results.page,
+            'per_page': results.per_page,
+            'total': results.total,
+            'has_next': results.has_next
+        })
+    
+    search_term = request.form.get('search_term', '').strip()
+    results = search_pending_reservations(search_term, per_page=ADMIN_PAGE_SIZE)
+    
+    return render_template('admin_pending.html', pending_reservations=results.items, pending_total=results.total,
+                           search_term=search_term, next_page=results.next_num)
+
+@bp.route('/admin/reservations/delete-range', methods=['POST'])
+@admin_required
+def admin_delete_reservations_range():
+    """Supprimer toutes les réservations entre deux dates"""
+    try:
+        start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
+        
+        count = Reservation.query.filter(
+            Reservation.start_date >= start_date,
+            Reservation.end_date <= end_date
+        ).delete()
+        
+        db.session.commit()
+        flash(f'Toutes les réservations entre {start_date} et {end_date} ont été supprimées ({count}).', 'info')
+        logger.info("Suppression de réservations entre %s et %s: %s", start_date, end_date, count)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erreur lors de la suppression: {str(e)}', 'error')
+        logger.error("Erreur lors de la suppression des réservations: %s", e)
+    
+    return redirect(url_for('admin.dashboard'))
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        
+        logger.info("Tentative de connexion pour: %s", username)
+        
+        user = User.query.filter_by(username=username).first()
+        
+        if user:
+            logger.info("Utilisateur trouvé: %s, is_admin=%s", user.username, user.is_admin)
+            
+            if check_password_hash(user.password_hash, password):
+                logger.info("✓ Mot de passe correct pour %s", username)
+                regenerate_session()
+                session['user_id'] = user.id
+                session['username'] = user.username
+                session['is_admin'] = user.is_admin
+                flash('Connexion réussie !', 'success')
+                redirect_url = url_for('admin.dashboard') if user.is_admin else url_for('public.index')
+                logger.info("Redirection vers: %s", redirect_url)
+                return redirect(redirect_url)
+            else:
+                logger.warning("✗ Mot de passe incorrect pour %s", username)
+        else:
+            logger.warning("✗ Utilisateur non trouvé: %s", username)
+        
+        flash('Nom d\'utilisateur ou mot de passe incorrect.', 'error')
+    
+    return render_template('admin_login.html')
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Déconnexion réussie !', 'info')
+    return redirect(url_for('public.index'))
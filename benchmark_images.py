@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Script pour mesurer la mémoire et le temps de traitement des images téléversées.
+
+Usage:
+    python benchmark_images.py                           # JPEG générés : 1600x1200, 4000x3000, 6000x4000
+    python benchmark_images.py --sizes 6000x4000 --runs 5
+    python benchmark_images.py --files photo1.jpg photo2.png
+    python benchmark_images.py --max-rss-mb 150          # échoue (code 1) au-delà de 150 Mo de pic (CI)
+
+Chaque cas est mesuré dans un processus neuf, en mode draft (image_utils.prepare_image)
+et en décodage complet (draft désactivé) pour comparaison. Le pic de mémoire d'un
+processus ne redescend jamais et Linux le transmet aux processus fils : les images de
+test sont elles aussi générées dans un processus à part.
+Affiche le pic de RSS, son augmentation pendant le traitement et le temps par mégapixel.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ('draft', 'complet')
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus (ru_maxrss : Ko sous Linux, octets sous macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def generate_jpeg(path, width, height):
+    """JPEG de test avec des dégradés (poids proche d'une photo, pas de bruit incompressible)"""
+    from PIL import Image
+
+    gradient = Image.linear_gradient('L')
+    red = gradient.resize((width, height))
+    green = gradient.rotate(90).resize((width, height))
+    blue = Image.radial_gradient('L').resize((width, height))
+    Image.merge('RGB', (red, green, blue)).save(path, 'JPEG', quality=90)
+
+
+def run_worker(path, mode, runs):
+    """Processus fils : traite l'image runs fois et écrit une ligne JSON de mesures"""
+    from PIL import Image
+
+    from image_utils import prepare_image
+
+    with Image.open(path) as img:
+        megapixels = img.width * img.height / 1_000_000
+        size = f"{img.width}x{img.height}"
+    baseline = peak_rss_mb()
+
+    timings = []
+    for _ in range(runs):
+        with open(path, 'rb') as stream:
+            started = time.perf_counter()
+            data, mime_type, width, height, _, _ = prepare_image(stream, draft=(mode == 'draft'), max_pixels=10 ** 9)
+            timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    print(json.dumps({
+        'file': os.path.basename(path),
+        'size': size,
+        'megapixels': round(megapixels, 1),
+        'file_mb': round(os.path.getsize(path) / (1024 * 1024), 2),
+        'mode': mode,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'rss_increase_mb': round(peak_rss_mb() - baseline, 1),
+        'ms': round(best * 1000, 1),
+        'ms_per_mp': round(best * 1000 / megapixels, 1),
+        'output': f"{width}x{height} {mime_type} {len(data) // 1024} Ko",
+    }))
+
+
+def measure(path, mode, runs):
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', path, '--mode', mode,
+                             '--runs', str(runs)], cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"[ERROR] Échec du traitement de {path} (code {result.returncode})")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire et temps de traitement des images téléversées")
+    parser.add_argument('--sizes', default='1600x1200,4000x3000,6000x4000', help="JPEG générés (LxH,LxH,...)")
+    parser.add_argument('--files', nargs='*', default=[], help="Images à mesurer (remplace --sizes)")
+    parser.add_argument('--runs', type=int, default=3, help="Nombre de traitements (le meilleur temps est retenu)")
+    parser.add_argument('--max-rss-mb', type=float, help="Seuil sur le pic de mémoire en mode draft (Mo)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--generate', nargs=3, help=argparse.SUPPRESS)
+    parser.add_argument('--mode', choices=MODES, default='draft', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.mode, args.runs)
+        return 0
+    if args.generate:
+        path, width, height = args.generate
+        generate_jpeg(path, int(width), int(height))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.abspath(path) for path in args.files]
+        if not paths:
+            for size in args.sizes.split(','):
+                width, height = (int(value) for value in size.lower().split('x'))
+                path = os.path.join(tmp, f"test-{width}x{height}.jpg")
+                subprocess.run([sys.executable, os.path.abspath(__file__), '--generate', path, str(width),
+                                str(height)], check=True)
+                paths.append(path)
+
+        results = [measure(path, mode, args.runs) for path in paths for mode in MODES]
+
+    print(f"{'Fichier':<24} {'Taille':>10} {'Mpx':>5} {'Mo':>5} {'Mode':<8} {'Pic RSS':>8} "
+          f"{'+RSS':>7} {'ms':>7} {'ms/Mpx':>7}  Sortie")
+    for result in results:
+        print(f"{result['file']:<24} {result['size']:>10} {result['megapixels']:>5} {result['file_mb']:>5} "
+              f"{result['mode']:<8} {result['peak_rss_mb']:>6} Mo {result['rss_increase_mb']:>4} Mo "
+              f"{result['ms']:>7} {result['ms_per_mp']:>7}  {result['output']}")
+
+    if args.max_rss_mb is not None:
+        over = [result for result in results if result['mode'] == 'draft' and result['peak_rss_mb'] > args.max_rss_mb]
+        for result in over:
+            print(f"\n[ERROR] {result['file']} : {result['peak_rss_mb']} Mo > seuil de {args.max_rss_mb:.0f} Mo")
+        if over:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
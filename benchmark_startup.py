@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script pour mesurer le temps de démarrage de l'application (import + create_app).
+
+Usage:
+    python benchmark_startup.py                      # application complète
+    python benchmark_startup.py --blueprints api     # seulement le blueprint api
+    python benchmark_startup.py --max-ms 600         # échoue (code 1) au-delà de 600 ms (CI)
+
+Lance `python -X importtime -c "import wsgi"` (import de app puis create_app())
+dans un processus neuf et affiche les modules les plus coûteux, ainsi que les modules lourds chargés alors qu'ils devraient
+l'être à la première utilisation (Pillow, requests).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Modules qui ne doivent pas être importés au démarrage
+LAZY_MODULES = ('PIL', 'requests', 'psycopg2')
+
+
+def parse_importtime(stderr):
+    """Lignes 'import time: self | cumulative | module' -> [(self_us, cumulative_us, module, profondeur)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    return entries
+
+
+def measure(blueprints, runs):
+    env = dict(os.environ)
+    if blueprints:
+        env['APP_BLUEPRINTS'] = blueprints
+    root = os.path.dirname(os.path.abspath(__file__))
+
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import wsgi'],
+                                cwd=root, env=env, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            print(result.stderr[-2000:])
+            raise SystemExit(f"[ERROR] Échec de l'import de l'application (code {result.returncode})")
+        entries = parse_importtime(result.stderr)
+        if best is None or wall_ms < best[0]:
+            best = (wall_ms, entries)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage de l'application")
+    parser.add_argument('--blueprints', default='', help="Blueprints chargés (ex: api,images), défaut : tous")
+    parser.add_argument('--runs', type=int, default=3, help="Nombre de mesures (la meilleure est retenue)")
+    parser.add_argument('--top', type=int, default=15, help="Nombre de modules affichés")
+    parser.add_argument('--max-ms', type=float, help="Seuil sur le temps d'import cumulé (ms)")
+    args = parser.parse_args()
+
+    wall_ms, entries = measure(args.blueprints, args.runs)
+    top_level = [entry for entry in entries if entry[3] == 0]
+    import_ms = sum(entry[1] for entry in top_level) / 1000
+    app_entry = next((entry for entry in entries if entry[2] == 'app'), None)
+
+    print(f"Blueprints : {args.blueprints or 'tous'}")
+    print(f"Processus complet : {wall_ms:.0f} ms (dont démarrage de l'interpréteur)")
+    print(f"Imports cumulés   : {import_ms:.0f} ms")
+    if app_entry:
+        print(f"  dont 'import app' : {app_entry[1] / 1000:.0f} ms (sans create_app)")
+
+    print("\nModules les plus coûteux (cumulé, ms) :")
+    for self_us, cumulative_us, name, depth in sorted(entries, key=lambda entry: entry[1], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}  {name}")
+
+    loaded = {entry[2] for entry in entries}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"\n[WARNING] Chargé(s) au démarrage : {', '.join(eager)}")
+
+    if args.max_ms is not None and import_ms > args.max_ms:
+        print(f"\n[ERROR] {import_ms:.0f} ms > seuil de {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Vérification des tokens hCaptcha.
+
+- Session HTTP réutilisée (keep-alive, pool de connexions) avec des délais
+  de connexion et de lecture courts : un vérificateur lent ne bloque jamais
+  un worker plus de connect_timeout + read_timeout.
+- Cache TTL des empreintes (SHA-256) des tokens déjà validés : un double
+  envoi du formulaire ne refait pas l'aller-retour (et un token hCaptcha
+  n'est valable qu'une fois côté hcaptcha.com).
+- verify_async() lance la vérification dans un pool de threads et retourne
+  un Future : la requête continue son travail (validation, requêtes SQL)
+  pendant l'aller-retour. Avec gevent, les threads sont des greenlets.
+
+Pour les tests, fake_hcaptcha_server.py simule l'API siteverify en local
+(HCAPTCHA_VERIFY_URL=http://127.0.0.1:8765/siteverify).
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERIFY_URL = 'https://hcaptcha.com/siteverify'
+
+
+class CaptchaVerifier:
+    def __init__(self, secret, verify_url=DEFAULT_VERIFY_URL, connect_timeout=1.0, read_timeout=2.0,
+                 cache_ttl=300, cache_size=1024, max_workers=4, fail_open=False):
+        self.secret = secret
+        self.verify_url = verify_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_workers = max_workers
+        self.fail_open = fail_open  # Résultat si hcaptcha.com est injoignable
+        self._cache = OrderedDict()  # empreinte -> expiration
+        self._lock = threading.Lock()
+        self._pid = None
+        self._http = None
+        self._executor = None
+
+    @property
+    def enabled(self):
+        return bool(self.secret)
+
+    def _ensure_process_resources(self):
+        # preload_app : l'objet est créé avant le fork, la session et le pool
+        # de threads doivent être propres à chaque worker
+        if self._pid != os.getpid():
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=0)
+            http.mount('https://', adapter)
+            http.mount('http://', adapter)
+            self._http = http
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hcaptcha')
+            self._pid = os.getpid()
+
+    @staticmethod
+    def _fingerprint(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def _cached(self, fingerprint):
+        with self._lock:
+            expires_at = self._cache.get(fingerprint)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._cache[fingerprint]
+                return False
+            return True
+
+    def _remember(self, fingerprint):
+        with self._lock:
+            self._cache[fingerprint] = time.monotonic() + self.cache_ttl
+            self._cache.move_to_end(fingerprint)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def verify(self, token, remote_ip=None):
+        """Vérification synchrone ; True si le token est valide"""
+        if not self.enabled:
+            return True
+        if not token:
+            logger.warning("Token hCaptcha manquant")
+            return False
+
+        fingerprint = self._fingerprint(token)
+        if self._cached(fingerprint):
+            return True
+
+        with self._lock:
+            self._ensure_process_resources()
+        data = {'secret': self.secret, 'response': token}
+        if remote_ip:
+            data['remoteip'] = remote_ip
+        try:
+            response = self._http.post(self.verify_url, data=data, timeout=self.timeout)
+            response.raise_for_status()
+            success = bool(response.json().get('success', False))
+        except Exception as e:
+            logger.error("Erreur lors de la vérification hCaptcha: %s", e)
+            return self.fail_open
+
+        logger.info("Vérification hCaptcha: %s", 'succès' if success else 'échec')
+        if success:
+            self._remember(fingerprint)
+        return success
+
+    def verify_async(self, token, remote_ip=None):
+        """Lance la vérification en arrière-plan ; retourne un Future[bool]"""
+        if not self.enabled or not token or self._cached(self._fingerprint(token)):
+            future = Future()
+            future.set_result(self.verify(token, remote_ip))
+            return future
+        with self._lock:
+            self._ensure_process_resources()
+        return self._executor.submit(self.verify, token, remote_ip)
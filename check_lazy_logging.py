@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Script pour vérifier que les appels de logging utilisent le formatage paresseux.
+
+Usage:
+    python check_lazy_logging.py            # tous les fichiers .py du projet
+    python check_lazy_logging.py app.py
+
+Refusé : logger.info(f"... {x}"), logger.info("... {}".format(x)), logger.info("... %s" % x)
+Attendu : logger.info("... %s", x) - la chaîne n'est construite que si le message est émis.
+"""
+import ast
+import os
+import sys
+
+LOG_METHODS = {'debug', 'info', 'warning', 'error', 'exception', 'critical', 'log'}
+EXCLUDED_DIRS = {'.git', '__pycache__', 'venv', '.venv', 'instance', 'static', 'templates'}
+
+
+def eager_message(node):
+    """Description du formatage immédiat du message, ou None s'il est paresseux"""
+    if isinstance(node, ast.JoinedStr):
+        return 'f-string'
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'format':
+        return '.format()'
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+        return "opérateur %"
+    return None
+
+
+def check_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    problems = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in LOG_METHODS and isinstance(node.func.value, ast.Name)
+                and node.func.value.id in ('logger', 'logging')):
+            continue
+        # logger.log(niveau, message, ...) : le message est le second argument
+        args = node.args[1:] if node.func.attr == 'log' else node.args
+        if args:
+            kind = eager_message(args[0])
+            if kind:
+                problems.append((node.lineno, kind))
+    return problems
+
+
+def iter_python_files(root):
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in EXCLUDED_DIRS]
+        for filename in sorted(filenames):
+            if filename.endswith('.py'):
+                yield os.path.join(directory, filename)
+
+
+def main():
+    paths = sys.argv[1:] or list(iter_python_files(os.path.dirname(os.path.abspath(__file__))))
+    count = 0
+    for path in paths:
+        for lineno, kind in check_file(path):
+            print(f"{os.path.relpath(path)}:{lineno}: message de log formaté immédiatement ({kind})")
+            count += 1
+
+    if count:
+        print(f"\n[ERROR] {count} appel(s) à convertir en logger.xxx(\"... %s\", valeur)")
+        return 1
+    print("[OK] Tous les appels de logging utilisent le formatage paresseux")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Téléversements par morceaux, reprenables, traités en parallèle.
+
+Chaque fichier est envoyé indépendamment des autres (voir les routes /admin/uploads) :
+création avec sa taille, morceaux envoyés à l'offset des octets déjà reçus, puis
+traitement dans un pool de threads. La limite de taille s'applique par fichier
+(max_file_size) ; chaque requête ne porte qu'un morceau, bien en dessous de
+MAX_CONTENT_LENGTH.
+
+Les morceaux et l'état (JSON) sont écrits dans un répertoire partagé par les workers
+gunicorn de la machine : n'importe quel worker peut recevoir le morceau suivant ou
+répondre à une demande d'état, et un envoi interrompu reprend à l'offset renvoyé.
+Renvoyer un morceau déjà reçu (réponse perdue) est sans effet.
+"""
+import json
+import logging
+import os
+import re
+import secrets
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{22}$')
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Erreur de téléversement, avec le code HTTP à renvoyer"""
+
+    def __init__(self, message, status=400, received=None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+
+class UploadStore:
+    def __init__(self, directory, max_file_size, chunk_size=1024 * 1024, expiry_seconds=86400):
+        self.directory = directory
+        self.max_file_size = max_file_size
+        self.chunk_size = chunk_size
+        self.expiry_seconds = expiry_seconds
+
+    def _path(self, upload_id, suffix):
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise UploadError('Téléversement inconnu', status=404)
+        return os.path.join(self.directory, f"{upload_id}{suffix}")
+
+    def data_path(self, upload_id):
+        return self._path(upload_id, '.part')
+
+    def _write_state(self, upload_id, state):
+        # Écriture atomique : un autre worker ne lit jamais un état à moitié écrit
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path(upload_id, '.json'))
+
+    def _read_state(self, upload_id):
+        try:
+            with open(self._path(upload_id, '.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError('Téléversement inconnu ou expiré', status=404)
+
+    def _received(self, upload_id):
+        try:
+            return os.path.getsize(self.data_path(upload_id))
+        except FileNotFoundError:
+            return 0
+
+    def create(self, filename, size, **fields):
+        """Nouveau téléversement de size octets ; fields est conservé dans l'état (légende, ...)"""
+        if size <= 0:
+            raise UploadError('Fichier vide')
+        if size > self.max_file_size:
+            raise UploadError(f"Fichier trop volumineux (max {self.max_file_size // (1024 * 1024)} Mo)", status=413)
+        os.makedirs(self.directory, exist_ok=True)
+        self.purge()
+
+        upload_id = secrets.token_urlsafe(16)
+        open(self.data_path(upload_id), 'wb').close()
+        state = {'upload_id': upload_id, 'filename': filename, 'size': size, 'status': 'uploading',
+                 'created_at': time.time(), **fields}
+        self._write_state(upload_id, state)
+        return state
+
+    def status(self, upload_id):
+        state = self._read_state(upload_id)
+        state['received'] = state['size'] if state['status'] != 'uploading' else self._received(upload_id)
+        return state
+
+    def append(self, upload_id, offset, stream):
+        """Écrit un morceau à offset ; retourne le nombre d'octets reçus"""
+        state = self._read_state(upload_id)
+        received = self._received(upload_id)
+        if state['status'] != 'uploading':
+            raise UploadError('Téléversement déjà terminé', status=409, received=state['size'])
+        if offset > received:
+            raise UploadError('Morceau hors séquence', status=409, received=received)
+
+        limit = state['size'] - offset
+        with open(self.data_path(upload_id), 'r+b') as f:
+            f.seek(offset)
+            written = 0
+            for block in iter(lambda: stream.read(COPY_BLOCK_SIZE), b''):
+                written += len(block)
+                if written > limit:
+                    raise UploadError('Le fichier dépasse la taille annoncée', status=413, received=received)
+                f.write(block)
+        return max(received, offset + written)
+
+    def complete(self, upload_id, **fields):
+        """Marque le fichier comme reçu en entier, avant son traitement"""
+        state = self.status(upload_id)
+        if state['status'] != 'uploading':
+            raise UploadError('Téléversement déjà terminé', status=409, received=state['size'])
+        if state['received'] != state['size']:
+            raise UploadError('Fichier incomplet', status=409, received=state['received'])
+        state.update(fields, status='processing')
+        self._write_state(upload_id, state)
+        return state
+
+    def finish(self, upload_id, status, **fields):
+        """État final ('done' ou 'error') ; les octets reçus sont supprimés"""
+        state = self._read_state(upload_id)
+        state.update(fields, status=status, finished_at=time.time())
+        self._write_state(upload_id, state)
+        try:
+            os.remove(self.data_path(upload_id))
+        except FileNotFoundError:
+            pass
+        return state
+
+    def purge(self):
+        """Supprime les téléversements (terminés ou abandonnés) plus vieux que expiry_seconds"""
+        cutoff = time.time() - self.expiry_seconds
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info("%s fichier(s) de téléversement expiré(s) supprimé(s)", removed)
+        return removed
+
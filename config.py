@@ -0,0 +1,183 @@
+"""
+Configuration de l'application, lue depuis les variables d'environnement.
+
+load_config(app) est appelée par create_app() après le chargement du fichier .env :
+rien n'est lu à l'import de ce module.
+"""
+import logging
+import os
+
+from captcha import DEFAULT_VERIFY_URL
+from db_pool import pool_options, server_concurrency, server_timeout
+
+logger = logging.getLogger(__name__)
+
+# Configuration pour le téléversement d'images
+UPLOAD_FOLDER = 'static/uploads/images'
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+# Au-delà, une image est refusée avant décodage (6000x4000 = 24 Mpx, soit 72 Mo en RGB)
+MAX_IMAGE_PIXELS = 40_000_000
+
+VERSION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'VERSION')
+
+
+def read_app_version():
+    """Version de l'application (fichier VERSION)"""
+    if os.path.exists(VERSION_FILE):
+        with open(VERSION_FILE, 'r') as f:
+            return f.read().strip()
+    return 'unknown'
+
+
+def parse_sample_rates(value):
+    """'endpoint=taux,endpoint=taux' -> {endpoint: taux}"""
+    rates = {}
+    for item in value.split(','):
+        endpoint, _, rate = item.partition('=')
+        if endpoint.strip() and rate.strip():
+            rates[endpoint.strip()] = float(rate)
+    return rates
+
+
+def load_config(app):
+    app.config['APP_VERSION'] = read_app_version()
+    logger.info("Application version: %s", app.config['APP_VERSION'])
+
+    # Configuration de sécurité
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'chez-meme-super-secret-key-2024-development-only')
+    # Le mot de passe admin doit être défini dans les variables d'environnement
+    # En développement local, voir .env ou utiliser update_admin_password.py
+    app.config['ADMIN_MDP'] = os.environ.get('ADMIN_MDP')
+    if not app.config['ADMIN_MDP']:
+        logger.warning("ADMIN_MDP n'est pas défini. Utilisez update_admin_password.py pour configurer l'admin.")
+
+    # Sessions (server_session.py) : 'database' (table partagée par les workers), 'memory' (un seul
+    # processus) ou 'cookie' (session signée de Flask). Durée : PERMANENT_SESSION_LIFETIME (31 jours)
+    app.config['SESSION_STORE'] = os.environ.get('SESSION_STORE', 'database')
+
+    # Proxy inverse devant l'application (proxy_cache.py) : durée de cache des pages publiques
+    # pour le proxy (0 = désactivé), purges envoyées après chaque commit qui les modifie
+    app.config['PROXY_CACHE_SECONDS'] = int(os.environ.get('PROXY_CACHE_SECONDS', 0))
+    app.config['PROXY_PURGE_URL'] = os.environ.get('PROXY_PURGE_URL', '')
+    app.config['PROXY_PURGE_DIR'] = os.environ.get('PROXY_PURGE_DIR', '')
+    app.config['PROXY_PURGE_HEADER'] = os.environ.get('PROXY_PURGE_HEADER', 'Surrogate-Key')
+    app.config['PROXY_PURGE_TIMEOUT'] = float(os.environ.get('PROXY_PURGE_TIMEOUT', 2))
+
+    # Proxys inverses de confiance devant l'application (Render : 1). Leur X-Forwarded-For donne
+    # l'IP réelle du visiteur (limiteur de débit, hCaptcha, ip_address des demandes).
+    # 0 par défaut (accès direct) : sans proxy, un client choisirait son IP et changerait de seau à volonté
+    app.config['PROXY_FIX_X_FOR'] = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    app.config['PROXY_FIX_X_PROTO'] = int(os.environ.get('PROXY_FIX_X_PROTO', 0))
+
+    # Configuration de la base de données
+    # Supporte SQLite en local et PostgreSQL en production
+    database_url = os.environ.get('DATABASE_URL', 'sqlite:///chez_meme.db')
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Réplica en lecture seule (voir db_routing.py) : lectures des pages publiques
+    # Un admin qui vient d'écrire reste sur la base principale REPLICA_STICKY_SECONDS secondes
+    app.config['SQLALCHEMY_BINDS'] = {}
+    replica_url = os.environ.get('DATABASE_REPLICA_URL', '')
+    if replica_url:
+        if replica_url.startswith('postgres://'):
+            replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+        app.config['SQLALCHEMY_BINDS']['replica'] = replica_url
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 30))
+
+    # Pool de connexions dimensionné d'après GUNICORN_WORKERS / GUNICORN_THREADS (voir db_pool.py)
+    workers, threads = server_concurrency()
+    max_connections = int(os.environ.get('DB_MAX_CONNECTIONS', 0)) or None
+    engine_options = pool_options(workers, threads, max_connections)
+    if database_url in ('sqlite://', 'sqlite:///:memory:'):
+        # Base en mémoire : une seule connexion partagée, pas de QueuePool
+        engine_options = {}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+    if engine_options:
+        logger.info("Pool de connexions (%s worker(s) x %s thread(s)): pool_size=%s, max_overflow=%s, "
+                    "timeout=%s s, pre_ping=%s", workers, threads, engine_options['pool_size'],
+                    engine_options['max_overflow'], engine_options['pool_timeout'], engine_options['pool_pre_ping'])
+
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+    # Images refusées au-delà de ce nombre de pixels (lu dans l'en-tête, avant décodage)
+    app.config['IMAGE_MAX_PIXELS'] = int(os.environ.get('IMAGE_MAX_PIXELS', MAX_IMAGE_PIXELS))
+    # Images signalées comme doublons jusqu'à ce nombre de bits différents sur 128 (dHash, 0 = identiques).
+    # Ré-encodage ou redimensionnement : <= 11 ; images différentes : > 40
+    app.config['IMAGE_DUPLICATE_DISTANCE'] = int(os.environ.get('IMAGE_DUPLICATE_DISTANCE', 12))
+    # Cache partagé (proxy, CDN) des images publiques : l'URL /image/<token>/<type> d'une ImageAsset
+    # désigne toujours le même contenu, servi avec Cache-Control: public, immutable.
+    # Le Wall of Shame reste en cache privé ; les URLs supprimées sont listées dans ImagePurge
+    app.config['IMAGE_PUBLIC_CACHE'] = os.environ.get('IMAGE_PUBLIC_CACHE', 'false').lower() == 'true'
+    app.config['IMAGE_PUBLIC_TYPES'] = {
+        image_type.strip() for image_type in os.environ.get('IMAGE_PUBLIC_TYPES', 'photo,leader').split(',')
+        if image_type.strip() and image_type.strip() != 'wall'
+    }
+    app.config['IMAGE_PURGE_RETENTION_DAYS'] = int(os.environ.get('IMAGE_PURGE_RETENTION_DAYS', 30))
+
+    # Téléversement des photos par morceaux (voir chunked_upload.py) : limite par fichier,
+    # chaque requête ne porte qu'un morceau. Répertoire partagé par les workers d'une machine
+    app.config['UPLOAD_TMP_DIR'] = os.environ.get('UPLOAD_TMP_DIR', os.path.join(app.instance_path, 'uploads'))
+    app.config['UPLOAD_MAX_FILE_MB'] = int(os.environ.get('UPLOAD_MAX_FILE_MB', 20))
+    app.config['UPLOAD_CHUNK_KB'] = int(os.environ.get('UPLOAD_CHUNK_KB', 1024))
+    app.config['UPLOAD_WORKERS'] = int(os.environ.get('UPLOAD_WORKERS', 2))  # Threads de traitement par worker
+    app.config['UPLOAD_EXPIRY_HOURS'] = int(os.environ.get('UPLOAD_EXPIRY_HOURS', 24))
+
+    # Configuration hCaptcha
+    app.config['HCAPTCHA_SITE_KEY'] = os.environ.get('HCAPTCHA_SITE_KEY', '')
+    app.config['HCAPTCHA_SECRET_KEY'] = os.environ.get('HCAPTCHA_SECRET_KEY', '')
+    # Délais courts : la vérification ne bloque jamais une requête plus de connect + read secondes
+    app.config['HCAPTCHA_VERIFY_URL'] = os.environ.get('HCAPTCHA_VERIFY_URL', DEFAULT_VERIFY_URL)
+    app.config['HCAPTCHA_CONNECT_TIMEOUT'] = float(os.environ.get('HCAPTCHA_CONNECT_TIMEOUT', 1))
+    app.config['HCAPTCHA_READ_TIMEOUT'] = float(os.environ.get('HCAPTCHA_READ_TIMEOUT', 2))
+    # Accepter la demande si hcaptcha.com est injoignable (elle reste soumise à validation admin)
+    app.config['HCAPTCHA_FAIL_OPEN'] = os.environ.get('HCAPTCHA_FAIL_OPEN', 'false').lower() == 'true'
+
+    # Flux iCalendar (/calendar.ics?token=...) - désactivé si aucun token n'est défini
+    app.config['CALENDAR_FEED_TOKEN'] = os.environ.get('CALENDAR_FEED_TOKEN', '')
+    app.config['CALENDAR_FEED_PAST_DAYS'] = int(os.environ.get('CALENDAR_FEED_PAST_DAYS', 180))
+
+    # Cache local des tuiles de carte (/tiles/<z>/<x>/<y>.png)
+    app.config['TILE_UPSTREAM_URL'] = os.environ.get('TILE_UPSTREAM_URL', 'https://tile.openstreetmap.org/{z}/{x}/{y}.png')
+    app.config['TILE_CACHE_DIR'] = os.environ.get('TILE_CACHE_DIR', 'tile_cache')
+    app.config['TILE_CACHE_MAX_MB'] = int(os.environ.get('TILE_CACHE_MAX_MB', 200))
+
+    # Flux temps réel de l'admin (/admin/events, Server-Sent Events)
+    # Durée max d'une connexion : le navigateur se reconnecte ensuite automatiquement. Toujours
+    # inférieure au timeout gunicorn, qui tue un worker sync occupé à envoyer le flux
+    app.config['ADMIN_EVENTS_POLL_SECONDS'] = float(os.environ.get('ADMIN_EVENTS_POLL_SECONDS', 2))
+    app.config['ADMIN_EVENTS_MAX_SECONDS'] = min(int(os.environ.get('ADMIN_EVENTS_MAX_SECONDS', 300)),
+                                                 max(5, server_timeout() - 15))
+    # 'sse' : flux /admin/events ; 'poll' : le navigateur interroge /admin/api/changes toutes les
+    # ADMIN_CHANGES_POLL_SECONDS. Par défaut 'poll' avec des workers sync (un flux bloquerait un worker)
+    gunicorn_sync = threads <= 1 and os.environ.get('GUNICORN_WORKER_CLASS', 'sync') == 'sync'
+    app.config['ADMIN_EVENTS_MODE'] = os.environ.get('ADMIN_EVENTS_MODE', 'poll' if gunicorn_sync else 'sse')
+    app.config['ADMIN_CHANGES_POLL_SECONDS'] = int(os.environ.get('ADMIN_CHANGES_POLL_SECONDS', 15))
+    app.config['CHANGE_LOG_RETENTION_HOURS'] = int(os.environ.get('CHANGE_LOG_RETENTION_HOURS', 24))
+
+    # Limitation des demandes de réservation (seaux à jetons par IP et par sous-réseau /24 ou /64)
+    # RATE_LIMIT_STORE : 'database' (partagé entre workers) ou 'memory' (un seul processus)
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATE_LIMIT_STORE'] = os.environ.get('RATE_LIMIT_STORE', 'database')
+    app.config['RATE_LIMIT_IP_BURST'] = int(os.environ.get('RATE_LIMIT_IP_BURST', 5))
+    app.config['RATE_LIMIT_IP_PER_HOUR'] = float(os.environ.get('RATE_LIMIT_IP_PER_HOUR', 10))
+    app.config['RATE_LIMIT_SUBNET_BURST'] = int(os.environ.get('RATE_LIMIT_SUBNET_BURST', 20))
+    app.config['RATE_LIMIT_SUBNET_PER_HOUR'] = float(os.environ.get('RATE_LIMIT_SUBNET_PER_HOUR', 40))
+
+    # Échantillonnage des logs de requêtes réussies (< 400) : taux par endpoint, défaut LOG_SAMPLE_RATE
+    # Les erreurs sont toujours journalisées
+    app.config['LOG_SAMPLE_RATE'] = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+    app.config['LOG_SAMPLE_RATES'] = {
+        'api.map_tile': 0.01,
+        'images.get_image_from_db': 0.05,
+        'api.api_spots_geojson': 0.1,
+        'api.api_reservations': 0.1,
+        **parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES', '')),
+    }
+
+    # Blueprints chargés (public, admin, api, images) ; tous par défaut
+    app.config['APP_BLUEPRINTS'] = os.environ.get('APP_BLUEPRINTS', '')
@@ -6,7 +6,8 @@ Usage: python create_admin.py
 
 import os
 import sys
-from app import app, db, User
+from app import create_app, db, User
+app = create_app()
 from werkzeug.security import generate_password_hash
 
 def create_admin():
@@ -10,7 +10,8 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 # Importer app et db seulement si nécessaire
 try:
-    from app import app, db, User
+    from app import create_app, db, User
+    app = create_app()
 except ImportError:
     print("ERREUR: Impossible d'importer app")
     sys.exit(1)
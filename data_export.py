@@ -0,0 +1,97 @@
+"""
+Export en flux (JSON Lines, CSV, ZIP) pour les sauvegardes.
+
+Les fonctions de ce module produisent des générateurs de morceaux d'octets :
+rien n'est matérialisé en entier, la mémoire reste constante quelle que soit
+la taille des données. Ce module ne dépend ni de Flask ni des modèles.
+"""
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime
+
+MIME_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def iter_jsonl(rows):
+    """Une ligne JSON par enregistrement (rows : itérable de dicts)"""
+    for row in rows:
+        yield (json.dumps(row, ensure_ascii=False, default=_json_default) + '\n').encode('utf-8')
+
+
+def iter_csv(rows, fields):
+    """CSV avec en-tête ; les dates sont écrites au format ISO"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, (date, datetime)) else value
+            for value in (row.get(field) for field in fields)
+        ])
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Tampon non-seekable : zipfile y écrit, le générateur le vide au fil de l'eau"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(entries):
+    """
+    Écrit une archive ZIP de façon incrémentale.
+
+    entries : itérable de (nom, morceaux, compresser) où morceaux est un itérable
+    d'octets. Les images déjà compressées sont stockées sans recompression.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, chunks, compress in entries:
+            info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with archive.open(info, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    yield buffer.drain()
+
+
+def image_entry_name(dataset, row_id, mime_type):
+    """Chemin d'une image dans l'archive : images/<dataset>/<id>.<ext>"""
+    return f"images/{dataset}/{row_id}{MIME_EXTENSIONS.get(mime_type, '.bin')}"
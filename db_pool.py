@@ -0,0 +1,180 @@
+"""
+Pool de connexions : dimensionnement au démarrage et métriques.
+
+Dimensionnement (pool_options) : chaque worker gunicorn traite au plus GUNICORN_THREADS
+requêtes à la fois, chacune avec une connexion. pool_size = threads + 1 (limiteur de
+débit, flux SSE), max_overflow = threads. Avec DB_MAX_CONNECTIONS (limite du serveur),
+le total workers x (pool_size + max_overflow) est plafonné à cette limite.
+Les variables DB_POOL_SIZE, DB_MAX_OVERFLOW, ... remplacent les valeurs calculées.
+
+Pré-ping : DB_POOL_PRE_PING=false supprime l'aller-retour de vérification à chaque
+emprunt. Une connexion coupée est alors détectée à la première erreur : SQLAlchemy
+invalide tout le pool (les autres connexions, ouvertes avant la coupure, sont
+remplacées à leur prochain emprunt) et la requête concernée échoue.
+
+Métriques (par processus, par moteur) : emprunts, attentes (pool épuisé), temps
+d'attente, délais dépassés, connexions créées, invalidations, échecs de pré-ping,
+erreurs de déconnexion. Voir /admin/api/db-pool.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+SLOW_CHECKOUT_SECONDS = 1.0  # Emprunt journalisé au-delà
+
+
+def server_concurrency():
+    """(workers, threads) tels que configurés pour gunicorn (voir gunicorn_config.py)"""
+    workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+    return workers, threads
+
+
+def server_timeout():
+    """Délai (secondes) au-delà duquel gunicorn tue un worker sync silencieux (voir gunicorn_config.py)"""
+    return int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def pool_options(workers, threads, max_connections=None):
+    """Paramètres du pool pour un worker, avant remplacement par les variables DB_*"""
+    pool_size = threads + 1
+    max_overflow = threads
+    if max_connections:
+        per_worker = max(1, max_connections // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = max(0, min(max_overflow, per_worker - pool_size))
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 300)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'poolclass': InstrumentedQueuePool,
+    }
+
+
+class PoolMetrics:
+    """Compteurs d'un pool (un processus)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0  # Emprunts faits alors que le pool était épuisé
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        self.disconnect_errors = 0
+
+    def record_checkout(self, seconds, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_seconds_total': round(self.wait_seconds, 3),
+                'wait_seconds_max': round(self.max_wait_seconds, 3),
+                'wait_seconds_avg': round(self.wait_seconds / self.waits, 3) if self.waits else 0,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'pre_ping_failures': self.pre_ping_failures,
+                'disconnect_errors': self.disconnect_errors,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure les emprunts ; les métriques survivent à recreate() (engine.dispose())"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        # Pool épuisé : aucune connexion libre et plus de débordement possible, l'emprunt va attendre
+        waited = self.checkedin() == 0 and -1 < self._max_overflow <= self.overflow()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except sa_exc.TimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - started, waited, timed_out=True)
+            logger.warning("Pool de connexions épuisé (%s), délai de %.1f s dépassé", self.status(), self._timeout)
+            raise
+        elapsed = time.perf_counter() - started
+        self.metrics.record_checkout(elapsed, waited)
+        if waited and elapsed > SLOW_CHECKOUT_SECONDS:
+            logger.warning("Attente de %.2f s pour une connexion (%s)", elapsed, self.status())
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_engine(engine):
+    """Écoute les événements du pool et du moteur pour compléter les métriques"""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        engine.pool.metrics.increment('connects')
+
+    @event.listens_for(engine, 'invalidate')
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        engine.pool.metrics.increment('invalidations')
+        # Le pré-ping échoué lève InvalidatePoolError avant d'invalider la connexion
+        if isinstance(exception, sa_exc.InvalidatePoolError):
+            engine.pool.metrics.increment('pre_ping_failures')
+
+    @event.listens_for(engine, 'handle_error')
+    def _on_error(context):
+        if context.is_disconnect:
+            engine.pool.metrics.increment('disconnect_errors')
+            logger.warning("Connexion à la base perdue, pool invalidé: %s", context.original_exception)
+
+
+def pool_stats(engine):
+    """État courant et compteurs du pool d'un moteur"""
+    pool = engine.pool
+    stats = {
+        'status': pool.status(),
+        'pre_ping': bool(pool._pre_ping),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(0, pool.overflow()),
+            'timeout': pool.timeout(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats['metrics'] = pool.metrics.snapshot()
+    return stats
@@ -0,0 +1,81 @@
+"""
+Routage des lectures vers un réplica en lecture seule.
+
+Avec DATABASE_REPLICA_URL, le réplica est déclaré dans SQLALCHEMY_BINDS sous la clé
+'replica'. Les vues marquées @replica_reads envoient leurs SELECT au réplica pour les
+requêtes GET/HEAD ; tout le reste (écritures, SELECT ... FOR UPDATE, vues non marquées,
+hooks before_request) reste sur la base principale.
+
+Lecture de ses propres écritures : après une écriture, un admin reste sur la base
+principale pendant REPLICA_STICKY_SECONDS (retard de réplication toléré), y compris
+sur les pages publiques.
+
+Sans réplica configuré, RoutingSession se comporte comme la session de Flask-SQLAlchemy.
+"""
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+REPLICA_BIND = 'replica'
+PRIMARY_UNTIL_KEY = 'db_primary_until'
+
+
+class RoutingSession(FlaskSession):
+    """Session qui envoie les SELECT des vues @replica_reads au bind 'replica'"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _reads_from_replica(clause):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _reads_from_replica(clause):
+    if not has_request_context() or not g.get('use_replica'):
+        return False
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def replica_reads(view):
+    """Décorateur : les lectures de la vue peuvent être servies par le réplica"""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        # Sans réplica, la session n'est pas lue (chargement paresseux, voir server_session.py)
+        if (REPLICA_BIND in current_app.config['SQLALCHEMY_BINDS'] and request.method in ('GET', 'HEAD')
+                and not _sticky_to_primary()):
+            g.use_replica = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop('use_replica', None)
+    return decorated_function
+
+
+def _sticky_to_primary():
+    return session.get(PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush_write(session_, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_write(orm_execute_state):
+    if has_request_context() and (orm_execute_state.is_insert or orm_execute_state.is_update
+                                  or orm_execute_state.is_delete):
+        g.db_wrote = True
+
+
+def stick_to_primary_after_write(response):
+    """after_request : un admin qui vient d'écrire relit la base principale pendant quelques secondes"""
+    if g.get('db_wrote') and session.get('is_admin') and REPLICA_BIND in current_app.config['SQLALCHEMY_BINDS']:
+        session[PRIMARY_UNTIL_KEY] = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+    return response
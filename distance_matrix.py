@@ -0,0 +1,90 @@
+"""
+Matrice des distances routières origines × spots.
+
+Les itinéraires sont calculés via un serveur OSRM (configurable, un serveur
+local de test convient) et mis en cache par couple de coordonnées dans
+distance_matrix.json. Au démarrage, l'application charge ce fichier :
+chaque recherche est ensuite une simple lecture de dictionnaire.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OSRM_URL = 'http://router.project-osrm.org'
+MATRIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distance_matrix.json')
+
+
+def coord_key(origin, destination):
+    """Clé de cache d'un trajet : coordonnées arrondies à 6 décimales (~10 cm)"""
+    return f"{origin['lat']:.6f},{origin['lng']:.6f};{destination['lat']:.6f},{destination['lng']:.6f}"
+
+
+def load_matrix(path=MATRIX_FILE):
+    """Itinéraires en cache {clé: {'distance_km', 'temps_minutes'}} ; vide si le fichier n'existe pas"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('routes', {})
+    except FileNotFoundError:
+        logger.warning("Matrice de distances absente (%s), lancez calculate_distances.py", path)
+        return {}
+
+
+def save_matrix(routes, osrm_url, path=MATRIX_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'osrm_url': osrm_url, 'routes': dict(sorted(routes.items()))}, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def fetch_route(http, osrm_url, origin, destination, timeout=10):
+    """Distance (km, 1 décimale) et durée (minutes) par la route via l'API OSRM /route"""
+    url = (f"{osrm_url.rstrip('/')}/route/v1/driving/"
+           f"{origin['lng']},{origin['lat']};{destination['lng']},{destination['lat']}")
+    response = http.get(url, params={'overview': 'false', 'alternatives': 'false', 'steps': 'false'},
+                        timeout=timeout)
+    response.raise_for_status()
+    routes = response.json().get('routes') or []
+    if not routes:
+        raise ValueError("Pas de route trouvée dans la réponse")
+    return {
+        'distance_km': round(routes[0]['distance'] / 1000, 1),
+        'temps_minutes': int(routes[0]['duration'] / 60),
+    }
+
+
+def compute_matrix(origins, destinations, osrm_url=DEFAULT_OSRM_URL, routes=None, max_workers=4):
+    """
+    Complète la matrice pour tous les couples origine × destination absents du cache,
+    en parallèle. Retourne (itinéraires, erreurs) ; les erreurs sont des (clé, message).
+    """
+    import requests
+
+    routes = dict(routes or {})
+    missing = {}
+    for origin in origins:
+        for destination in destinations:
+            key = coord_key(origin, destination)
+            if key not in routes:
+                missing[key] = (origin, destination)
+
+    errors = []
+    if not missing:
+        return routes, errors
+
+    with requests.Session() as http, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {key: pool.submit(fetch_route, http, osrm_url, origin, destination)
+                   for key, (origin, destination) in missing.items()}
+        for key, future in futures.items():
+            try:
+                routes[key] = future.result()
+            except Exception as e:
+                errors.append((key, str(e)))
+    return routes, errors
+
+
+def trip_cost(distance_km, toll_round_trip, pricing):
+    """Coût aller-retour : carburant (distance × 2) + péages aller-retour, en euros"""
+    fuel = distance_km * 2 / 100 * pricing['consommation_l_100km'] * pricing['prix_carburant_l']
+    return round(fuel + toll_round_trip, 2)
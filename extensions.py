@@ -0,0 +1,87 @@
+"""
+Extensions et services partagés, créés sans application puis liés par create_app().
+
+Les services sont rangés dans app.extensions et lus via current_app.extensions[...] :
+- 'hcaptcha_verifier' : CaptchaVerifier (captcha.py)
+- 'tile_cache' : TileCache (tile_cache.py)
+- 'reservation_limiter' : RateLimiter de /reserver (rate_limit.py)
+- 'upload_store' : UploadStore des téléversements par morceaux (chunked_upload.py)
+- 'upload_executor' : pool de threads qui traite les fichiers reçus
+- 'image_hash_index' : ImageHashIndex des empreintes d'images (image_similarity.py)
+- 'gallery_manifest' : manifeste JSON de la galerie de la page d'accueil (gallery_manifest.py)
+- 'session_store' : magasin des sessions côté serveur (server_session.py), absent avec SESSION_STORE=cookie
+- 'proxy_purger' : ProxyPurger des pages en cache dans le proxy inverse (proxy_cache.py), si configuré
+"""
+from flask_sqlalchemy import SQLAlchemy
+
+from db_routing import RoutingSession
+
+# Session qui peut envoyer les lectures des pages publiques au réplica (db_routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def init_services(app):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from captcha import CaptchaVerifier
+    from chunked_upload import UploadStore
+    from gallery_manifest import GalleryManifest
+    from image_similarity import ImageHashIndex
+    from models import RateLimitBucket, ServerSession
+    from proxy_cache import ProxyPurger
+    from rate_limit import DatabaseBucketStore, MemoryBucketStore, RateLimiter
+    from server_session import DatabaseSessionStore, MemorySessionStore, ServerSessionInterface
+    from tile_cache import TileCache
+
+    app.extensions['hcaptcha_verifier'] = CaptchaVerifier(
+        app.config['HCAPTCHA_SECRET_KEY'],
+        verify_url=app.config['HCAPTCHA_VERIFY_URL'],
+        connect_timeout=app.config['HCAPTCHA_CONNECT_TIMEOUT'],
+        read_timeout=app.config['HCAPTCHA_READ_TIMEOUT'],
+        fail_open=app.config['HCAPTCHA_FAIL_OPEN']
+    )
+
+    app.extensions['tile_cache'] = TileCache(
+        app.config['TILE_CACHE_DIR'],
+        app.config['TILE_UPSTREAM_URL'],
+        max_bytes=app.config['TILE_CACHE_MAX_MB'] * 1024 * 1024,
+        user_agent=f"ChezMeme/{app.config['APP_VERSION']}"
+    )
+
+    if app.config['RATE_LIMIT_STORE'] == 'memory':
+        rate_limit_store = MemoryBucketStore()
+    else:
+        rate_limit_store = DatabaseBucketStore(lambda: db.engine, RateLimitBucket.__table__)
+
+    app.extensions['reservation_limiter'] = RateLimiter(rate_limit_store, {
+        'ip': (app.config['RATE_LIMIT_IP_BURST'], app.config['RATE_LIMIT_IP_PER_HOUR'] / 3600),
+        'net': (app.config['RATE_LIMIT_SUBNET_BURST'], app.config['RATE_LIMIT_SUBNET_PER_HOUR'] / 3600),
+    }, name='reserver')
+
+    app.extensions['upload_store'] = UploadStore(
+        app.config['UPLOAD_TMP_DIR'],
+        max_file_size=app.config['UPLOAD_MAX_FILE_MB'] * 1024 * 1024,
+        chunk_size=app.config['UPLOAD_CHUNK_KB'] * 1024,
+        expiry_seconds=app.config['UPLOAD_EXPIRY_HOURS'] * 3600
+    )
+    # Threads créés à la première soumission, donc après le fork des workers gunicorn (preload_app)
+    app.extensions['upload_executor'] = ThreadPoolExecutor(max_workers=app.config['UPLOAD_WORKERS'],
+                                                           thread_name_prefix='upload')
+    # Rempli à la première recherche puis complété au fil des téléversements (image_assets.py)
+    app.extensions['image_hash_index'] = ImageHashIndex()
+    app.extensions['gallery_manifest'] = GalleryManifest()
+
+    if app.config['SESSION_STORE'] == 'memory':
+        app.extensions['session_store'] = MemorySessionStore()
+    elif app.config['SESSION_STORE'] != 'cookie':
+        app.extensions['session_store'] = DatabaseSessionStore(lambda: db.engine, ServerSession.__table__)
+    if 'session_store' in app.extensions:
+        app.session_interface = ServerSessionInterface(app.extensions['session_store'])
+
+    if app.config['PROXY_PURGE_URL'] or app.config['PROXY_PURGE_DIR']:
+        app.extensions['proxy_purger'] = ProxyPurger(
+            app.config['PROXY_PURGE_URL'],
+            app.config['PROXY_PURGE_DIR'],
+            key_header=app.config['PROXY_PURGE_HEADER'],
+            timeout=app.config['PROXY_PURGE_TIMEOUT']
+        )
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Faux proxy inverse avec cache (façon Varnish/nginx) pour tester proxy_cache.py en local.
+
+Usage:
+    python fake_cache_proxy.py [--port 6081] [--backend http://127.0.0.1:5000] [--purge-dir DIR]
+
+Puis lancer l'application avec :
+    PROXY_CACHE_SECONDS=3600 PROXY_PURGE_URL=http://127.0.0.1:6081
+(ou PROXY_PURGE_DIR=DIR) et ouvrir http://127.0.0.1:6081/.
+
+Comportement :
+    GET/HEAD sans cookie -> servi depuis le cache si présent (X-Cache: HIT), sinon depuis
+                            l'application (MISS), gardé si Surrogate-Control: max-age ou
+                            Cache-Control: s-maxage (jamais private / no-store)
+    avec cookie, Range   -> transmis sans cache (PASS)
+    PURGE + Surrogate-Key -> retire les réponses portant une de ces clés
+    PURGE <chemin>       -> retire cette URL (404 si absente)
+    --purge-dir          -> fichiers de purge ('key <clé>' / 'url <url>') lus puis supprimés
+Les en-têtes Surrogate-* ne sont pas renvoyés au navigateur, comme sur un CDN.
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+HOP_BY_HOP = {'connection', 'keep-alive', 'transfer-encoding', 'te', 'trailer', 'upgrade',
+              'proxy-authorization', 'proxy-authenticate'}
+SURROGATE_HEADERS = {'surrogate-key', 'surrogate-control'}
+
+
+class ResponseCache:
+    """URL -> (statut, en-têtes, corps, expiration, clés)"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry and entry[3] > time.time():
+                return entry
+            self.entries.pop(url, None)
+            return None
+
+    def put(self, url, status, headers, body, ttl, keys):
+        with self.lock:
+            self.entries[url] = (status, headers, body, time.time() + ttl, set(keys))
+
+    def purge_keys(self, keys):
+        with self.lock:
+            urls = [url for url, entry in self.entries.items() if entry[4] & set(keys)]
+            for url in urls:
+                del self.entries[url]
+        return len(urls)
+
+    def purge_url(self, url):
+        with self.lock:
+            return 1 if self.entries.pop(url, None) else 0
+
+
+def cache_ttl(headers):
+    """Durée de cache pour le proxy (0 : ne pas garder)"""
+    cache_control = headers.get('cache-control', '').lower()
+    if 'private' in cache_control or 'no-store' in cache_control:
+        return 0
+    match = (re.search(r'max-age=(\d+)', headers.get('surrogate-control', '').lower())
+             or re.search(r's-maxage=(\d+)', cache_control))
+    return int(match.group(1)) if match else 0
+
+
+class CachingProxyHandler(BaseHTTPRequestHandler):
+    cache = ResponseCache()
+    backend = urlsplit('http://127.0.0.1:5000')
+
+    def do_GET(self):
+        if self.headers.get('Cookie') or self.headers.get('Range'):
+            self._forward('PASS')
+            return
+        entry = self.cache.get(self.path)
+        if entry is None:
+            self._forward('MISS', store=True)
+            return
+        status, headers, body, _, _ = entry
+        self._reply(status, headers, body, 'HIT')
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        self._forward('PASS')
+
+    do_PUT = do_DELETE = do_PATCH = do_POST
+
+    def do_PURGE(self):
+        keys = self.headers.get('Surrogate-Key') or self.headers.get('xkey-purge')
+        if keys:
+            purged = self.cache.purge_keys(keys.split())
+        else:
+            purged = self.cache.purge_url(self.path)
+        payload = json.dumps({'purged': purged}).encode('utf-8')
+        self.send_response(200 if purged or keys else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _forward(self, cache_status, store=False):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else None
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+        connection = http.client.HTTPConnection(self.backend.hostname, self.backend.port or 80, timeout=30)
+        try:
+            connection.request(self.command, self.path, body=body, headers=headers)
+            upstream = connection.getresponse()
+            payload = upstream.read()
+            response_headers = [(name, value) for name, value in upstream.getheaders()
+                                if name.lower() not in HOP_BY_HOP and name.lower() != 'content-length']
+            status = upstream.status
+        finally:
+            connection.close()
+
+        if store and status == 200 and self.command == 'GET':
+            lowered = {name.lower(): value for name, value in response_headers}
+            ttl = cache_ttl(lowered)
+            if ttl > 0 and 'set-cookie' not in lowered:
+                self.cache.put(self.path, status, response_headers, payload, ttl,
+                               lowered.get('surrogate-key', '').split())
+        self._reply(status, response_headers, payload, cache_status)
+
+    def _reply(self, status, headers, body, cache_status):
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in SURROGATE_HEADERS:
+                self.send_header(name, value)
+        self.send_header('X-Cache', cache_status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"[fake-proxy] {format % args}")
+
+
+def watch_purge_dir(purge_dir, cache, interval=0.5):
+    """Applique puis supprime les fichiers de purge écrits par l'application"""
+    while True:
+        for name in sorted(os.listdir(purge_dir)):
+            if not name.endswith('.purge'):
+                continue
+            path = os.path.join(purge_dir, name)
+            with open(path) as f:
+                for line in f:
+                    kind, _, value = line.strip().partition(' ')
+                    purged = cache.purge_keys([value]) if kind == 'key' else cache.purge_url(value)
+                    print(f"[fake-proxy] purge {kind} {value}: {purged} réponse(s)")
+            os.remove(path)
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux proxy inverse avec cache et purges")
+    parser.add_argument('--port', type=int, default=6081)
+    parser.add_argument('--backend', default='http://127.0.0.1:5000', help="URL de l'application")
+    parser.add_argument('--purge-dir', help="Répertoire des fichiers de purge (PROXY_PURGE_DIR)")
+    args = parser.parse_args()
+
+    CachingProxyHandler.backend = urlsplit(args.backend)
+    if args.purge_dir:
+        os.makedirs(args.purge_dir, exist_ok=True)
+        threading.Thread(target=watch_purge_dir, args=(args.purge_dir, CachingProxyHandler.cache),
+                         daemon=True).start()
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), CachingProxyHandler)
+    print(f"Faux proxy sur http://127.0.0.1:{args.port}/ -> {args.backend}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Faux serveur hCaptcha siteverify pour les tests locaux.
+
+Usage:
+    python fake_hcaptcha_server.py [--port 8765] [--delay 0]
+
+Puis lancer l'application avec :
+    HCAPTCHA_SECRET_KEY=test HCAPTCHA_VERIFY_URL=http://127.0.0.1:8765/siteverify
+
+Réponses selon le token envoyé :
+    pass...  -> success: true
+    slow...  -> success: true après 10 secondes (test des délais d'attente)
+    error... -> HTTP 500
+    autre    -> success: false
+Chaque token n'est accepté qu'une fois, comme sur hcaptcha.com.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class SiteVerifyHandler(BaseHTTPRequestHandler):
+    used_tokens = set()
+    lock = threading.Lock()
+    delay = 0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        token = form.get('response', [''])[0]
+
+        if self.delay:
+            time.sleep(self.delay)
+        if token.startswith('error'):
+            self.send_error(500)
+            return
+        if token.startswith('slow'):
+            time.sleep(10)
+
+        with self.lock:
+            reused = token in self.used_tokens
+            self.used_tokens.add(token)
+        success = token.startswith(('pass', 'slow')) and not reused and bool(form.get('secret'))
+        body = {'success': success}
+        if not success:
+            body['error-codes'] = ['already-seen-response' if reused else 'invalid-input-response']
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        print(f"[fake-hcaptcha] {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux serveur hCaptcha siteverify")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0, help="Latence ajoutée à chaque réponse (secondes)")
+    args = parser.parse_args()
+
+    SiteVerifyHandler.delay = args.delay
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), SiteVerifyHandler)
+    print(f"Faux hCaptcha sur http://127.0.0.1:{args.port}/siteverify")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Script pour lister les images identiques ou visuellement proches (photos, Wall of Shame, leaderboard).
+
+Usage:
+    python find_duplicate_images.py                 # distance IMAGE_DUPLICATE_DISTANCE (12 bits sur 128)
+    python find_duplicate_images.py --distance 24   # plus tolérant (recadrages, retouches)
+
+Même rapport que /admin/api/image-duplicates (JSON). Les empreintes manquantes (images
+stockées avant leur introduction) sont d'abord calculées, comme au démarrage de l'application.
+"""
+import argparse
+import sys
+
+from app import create_app
+from image_assets import backfill_image_previews, find_duplicate_clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Images identiques ou proches")
+    parser.add_argument('--distance', type=int, help="Nombre maximal de bits différents entre empreintes")
+    args = parser.parse_args()
+    app = create_app()
+
+    with app.app_context():
+        backfill_image_previews()
+        clusters = find_duplicate_clusters(args.distance)
+
+    if not clusters:
+        print("Aucun doublon trouvé.")
+        return 0
+    for number, cluster in enumerate(clusters, start=1):
+        print(f"Groupe {number}")
+        for image in cluster['images']:
+            for owner in image['owners']:
+                print(f"  image {image['id']:<6} {image['width']}x{image['height']:<6} "
+                      f"{owner['type']:<7} {owner['id']:<6} {owner['label']}")
+    print(f"\n{len(clusters)} groupe(s) d'images identiques ou proches.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
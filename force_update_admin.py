@@ -16,7 +16,8 @@ def force_update_admin():
     
     # Importer app et db
     try:
-        from app import app, db, User
+        from app import create_app, db, User
+        app = create_app()
     except ImportError as e:
         print(f"ERREUR: Impossible d'importer app: {e}")
         sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+Manifeste JSON de la galerie de la page d'accueil (/gallery.json).
+
+La liste des photos (ordre, légendes, dimensions, URLs et aperçus) est calculée
+une fois puis gardée en mémoire par le processus, avec son ETag. Elle n'est
+recalculée que lorsque la version des tables photo ou image_asset change
+(DataVersion, incrémentée à chaque téléversement, réordonnancement, modification
+ou suppression) : une requête ordinaire ne lit que deux compteurs.
+La page d'accueil ne contient plus la liste : static/js/gallery.js l'affiche
+à partir du manifeste.
+"""
+import hashlib
+import json
+import threading
+
+from extensions import db
+from image_utils import get_image_url
+from models import DataVersion, Photo
+
+MANIFEST_TABLES = ('photo', 'image_asset')
+
+
+def current_versions():
+    """Versions des tables dont dépend le manifeste (0 si jamais modifiées)"""
+    rows = dict(db.session.query(DataVersion.name, DataVersion.version).filter(
+        DataVersion.name.in_(MANIFEST_TABLES)))
+    return tuple(rows.get(name, 0) for name in MANIFEST_TABLES)
+
+
+def build_manifest():
+    """Corps JSON (octets) du manifeste, photos dans l'ordre d'affichage"""
+    photos = []
+    for photo in Photo.query.order_by(Photo.display_order, Photo.created_at):
+        asset = photo.image_asset
+        photos.append({
+            'id': photo.id,
+            'src': get_image_url(image_token=photo.public_image_token, image_type='photo')
+                   or get_image_url(image_filename=photo.filename),
+            'caption': photo.caption or '',
+            'width': asset.width if asset else None,
+            'height': asset.height if asset else None,
+            'placeholder': (asset.placeholder or None) if asset else None,
+        })
+    return json.dumps({'photos': photos}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class GalleryManifest:
+    """Manifeste en mémoire, recalculé quand les versions des tables changent"""
+
+    def __init__(self):
+        self.versions = None
+        self.manifest = (b'', '')
+        self.lock = threading.Lock()
+
+    def get(self):
+        """(corps JSON, ETag) à jour"""
+        versions = current_versions()
+        if versions != self.versions:
+            with self.lock:
+                if versions != self.versions:
+                    body = build_manifest()
+                    # ETag tiré du contenu : identique d'un worker à l'autre
+                    self.manifest = (body, hashlib.sha256(body).hexdigest()[:32])
+                    self.versions = versions
+        return self.manifest
@@ -4,9 +4,13 @@ import os
 
 # Nombre de workers optimisé
 workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
-worker_class = 'sync'
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+# Threads par worker : au-delà de 1, gunicorn passe en gthread et l'admin reçoit le flux SSE
+# /admin/events. Avec des workers sync (1 thread), l'admin interroge /admin/api/changes :
+# un flux occuperait un worker entier par onglet ouvert (voir config.py, ADMIN_EVENTS_MODE)
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
 worker_connections = 1000
-timeout = 120
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
 keepalive = 5
 max_requests = 1000
 max_requests_jitter = 50
@@ -0,0 +1,404 @@
+"""
+Images stockées en base : un seul chemin de téléversement et de lecture.
+
+Une image est stockée une fois dans ImageAsset, quel que soit le nombre d'entrées
+(photos, Wall of Shame, leaderboard) qui l'utilisent : elles pointent vers elle
+par image_asset_id. Le fichier téléversé est haché (SHA-256) avant tout décodage ;
+un doublon réutilise l'image existante sans être décodé ni ré-encodé.
+
+Nouvelle image : un seul décodage (image_utils.prepare_image), orientation EXIF
+appliquée, variante d'affichage à DISPLAY_WIDTH px, type MIME déduit du format réel.
+Le fichier est lu par blocs depuis le flux de la requête (haché puis décodé au fil de
+l'eau, en mode draft pour les JPEG) et refusé au-delà de IMAGE_MAX_PIXELS.
+Dimensions et aperçu flou (placeholder, data URI de ~100 octets) sont stockés avec
+l'image : les pages réservent la place de l'image et l'affichent floue pendant le
+chargement différé (image_utils.get_image_attrs).
+Chaque image a aussi une empreinte perceptuelle (phash, dHash 128 bits) : les images
+visuellement proches déjà stockées (distance de Hamming <= IMAGE_DUPLICATE_DISTANCE)
+sont signalées au téléversement, via l'index en mémoire 'image_hash_index'
+(image_similarity.py), et regroupées par find_duplicate_clusters pour l'admin.
+Le token public est tiré au hasard (384 bits) : pas de requête de vérification,
+la contrainte d'unicité suffit.
+
+Lecture (/image/<token>/<type>) : une requête sur ImageAsset.token pour les
+métadonnées, puis les octets par morceaux de STREAM_CHUNK_SIZE (substr côté base)
+via BlobReader, qui sait aussi se positionner pour les requêtes Range.
+
+Une ImageAsset n'est jamais modifiée (une nouvelle image a un nouveau token) : son URL
+désigne toujours le même contenu. Avec IMAGE_PUBLIC_CACHE, les types IMAGE_PUBLIC_TYPES
+(photo, leader) sont servis en cache public immuable (proxy, CDN) ; les URLs qui cessent
+d'être valides (image supprimée ou remplacée) sont enregistrées dans ImagePurge, dans la
+même transaction, pour être purgées de ces caches.
+"""
+import hashlib
+import io
+import logging
+import secrets
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, inspect, select, text
+
+from extensions import db
+from image_similarity import ImageHashIndex, hamming
+from image_utils import get_image_url, image_info, image_previews, prepare_image
+from models import IMAGE_OWNERS, ImageAsset, ImagePurge
+
+logger = logging.getLogger(__name__)
+
+DISPLAY_WIDTH = 800
+HASH_CHUNK_SIZE = 64 * 1024
+STREAM_CHUNK_SIZE = 256 * 1024  # Une requête par morceau ; la plupart des images tiennent en un seul
+
+
+def new_token():
+    """Token d'URL de 64 caractères"""
+    return secrets.token_urlsafe(48)
+
+
+def hash_stream(stream):
+    """SHA-256 d'un fichier ouvert, lu par blocs"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_image(stream):
+    """
+    ImageAsset pour ce fichier : existante si le même fichier a déjà été téléversé,
+    sinon créée (insérée dans la transaction en cours, non validée).
+    Lève ValueError si ce n'est pas une image ou si elle dépasse IMAGE_MAX_PIXELS.
+    """
+    content_hash = hash_stream(stream)
+    asset = ImageAsset.query.filter_by(content_hash=content_hash).first()
+    if asset:
+        logger.info("Image déjà stockée (%s...), réutilisée", content_hash[:10])
+        return asset
+
+    try:
+        data, mime_type, width, height, phash, preview = prepare_image(stream, fixed_width=DISPLAY_WIDTH,
+                                                                       max_pixels=current_app.config['IMAGE_MAX_PIXELS'])
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Fichier image illisible ({e.__class__.__name__})") from e
+    # Même fichier téléversé en parallèle par un autre worker : ON CONFLICT garde le sien
+    # (pas de SAVEPOINT, peu fiable avec pysqlite), relu ensuite dans les deux cas
+    stmt = _insert(ImageAsset).values(token=new_token(), content_hash=content_hash, mime_type=mime_type,
+                                      width=width, height=height, byte_size=len(data), phash=phash,
+                                      placeholder=preview, data=data, created_at=datetime.utcnow())
+    db.session.execute(stmt.on_conflict_do_nothing(index_elements=[ImageAsset.content_hash]))
+    return ImageAsset.query.filter_by(content_hash=content_hash).one()
+
+
+def _insert(model):
+    """INSERT ... ON CONFLICT du dialecte de la base (SQLite >= 3.24 ou PostgreSQL)"""
+    if db.session.get_bind(mapper=inspect(model)).dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def attach_image(owner, stream):
+    """Associe un fichier ouvert à une entrée ; l'ancienne image est supprimée si plus personne ne l'utilise"""
+    previous_id = owner.image_asset_id
+    owner.image_asset = store_image(stream)
+    db.session.flush()
+    if previous_id and previous_id != owner.image_asset_id:
+        release_image(previous_id, owner_type(owner))
+    return owner.image_asset
+
+
+def owner_type(owner):
+    """Type d'image ('photo', 'wall', 'leader') d'une entrée illustrée"""
+    return next(image_type for image_type, model in IMAGE_OWNERS.items() if isinstance(owner, model))
+
+
+def release_image(asset_id, image_type):
+    """
+    Supprime une ImageAsset qui n'est plus référencée (à appeler après le flush de la suppression).
+    image_type : type de l'entrée qui vient de la quitter. Si plus aucune entrée de ce type ne
+    l'utilise, son URL publique /image/<token>/<type> est ajoutée à la liste de purge.
+    """
+    if asset_id is None:
+        return False
+    used_by = {used_type for used_type, model in IMAGE_OWNERS.items()
+               if db.session.query(model.id).filter(model.image_asset_id == asset_id).first()}
+    record_image_purges(asset_id, ({image_type} - used_by) & public_cache_types())
+    if used_by:
+        return False
+    db.session.query(ImageAsset).filter(ImageAsset.id == asset_id).delete()
+    return True
+
+
+def public_cache_types():
+    """Types d'images servis en cache public (vide si IMAGE_PUBLIC_CACHE est désactivé)"""
+    if not current_app.config['IMAGE_PUBLIC_CACHE']:
+        return set()
+    return set(current_app.config['IMAGE_PUBLIC_TYPES']) & set(IMAGE_OWNERS)
+
+
+def is_public_image(image, token, image_type):
+    """
+    Image trouvée par find_image cacheable par un proxy ou CDN : type public, token de l'ImageAsset
+    (les anciens tokens suivent l'entrée, leur contenu peut changer) et utilisée par une entrée de ce type
+    (une image du Wall of Shame ne devient pas publique avec une URL /photo).
+    """
+    if image_type not in public_cache_types() or image.token != token:
+        return False
+    owner = IMAGE_OWNERS[image_type]
+    return db.session.query(owner.id).filter(owner.image_asset_id == image.id).first() is not None
+
+
+def record_image_purges(asset_id, image_types):
+    """Ajoute à la session les URLs /image/<token>/<type> de cette image à purger des caches partagés"""
+    if not image_types:
+        return []
+    token = db.session.query(ImageAsset.token).filter(ImageAsset.id == asset_id).scalar()
+    if token is None:
+        return []
+    purges = [ImagePurge(url=get_image_url(image_token=token, image_type=image_type))
+              for image_type in sorted(image_types)]
+    db.session.add_all(purges)
+    return purges
+
+
+def owner_label(owner):
+    """Nom lisible d'une entrée illustrée (avertissements et rapport de doublons)"""
+    return getattr(owner, 'person_name', None) or getattr(owner, 'caption', None) or getattr(owner, 'filename', '')
+
+
+def image_owners(asset_ids):
+    """{id d'image: [{'type', 'id', 'label'}, ...]} des entrées qui utilisent ces images"""
+    owners = {}
+    if not asset_ids:
+        return owners
+    for image_type, model in IMAGE_OWNERS.items():
+        for owner in model.query.filter(model.image_asset_id.in_(asset_ids)).order_by(model.id):
+            owners.setdefault(owner.image_asset_id, []).append(
+                {'type': image_type, 'id': owner.id, 'label': owner_label(owner)})
+    return owners
+
+
+def refresh_hash_index():
+    """Index des empreintes de ce processus, complété avec les images ajoutées depuis la dernière fois"""
+    index = current_app.extensions['image_hash_index']
+    rows = db.session.query(ImageAsset.id, ImageAsset.phash).filter(
+        ImageAsset.id > index.last_id).order_by(ImageAsset.id).all()
+    index.update(rows)
+    return index
+
+
+def find_similar_images(asset, exclude=None, max_distance=None):
+    """
+    Entrées dont l'image est identique ou proche de asset (même image réutilisée comprise),
+    de la plus proche à la plus éloignée : [{'type', 'id', 'label', 'distance'}, ...].
+    exclude : entrée à ne pas signaler (celle qui vient de recevoir l'image).
+    """
+    if not asset.phash:
+        return []
+    if max_distance is None:
+        max_distance = current_app.config['IMAGE_DUPLICATE_DISTANCE']
+    candidate_ids = {row_id for _, row_id in refresh_hash_index().search(asset.phash, max_distance)}
+    candidate_ids.add(asset.id)
+
+    # L'index n'oublie rien : revérifier en base (images supprimées entre-temps)
+    value = int(asset.phash, 16)
+    distances = {}
+    for row_id, phash in db.session.query(ImageAsset.id, ImageAsset.phash).filter(ImageAsset.id.in_(candidate_ids)):
+        distance = hamming(int(phash, 16), value) if phash else max_distance + 1
+        if distance <= max_distance:
+            distances[row_id] = distance
+
+    excluded = (type(exclude), exclude.id) if exclude is not None else None
+    matches = []
+    for asset_id, owners in image_owners(list(distances)).items():
+        for owner in owners:
+            if (IMAGE_OWNERS[owner['type']], owner['id']) != excluded:
+                matches.append({**owner, 'distance': distances[asset_id]})
+    matches.sort(key=lambda match: (match['distance'], match['type'], match['id']))
+    return matches
+
+
+def duplicate_warning(owner, limit=3):
+    """
+    Avertissement pour une entrée qui vient de recevoir son image (déjà ajoutée à la session),
+    ou None si aucune autre entrée n'a d'image identique ou proche.
+    """
+    db.session.flush()
+    matches = find_similar_images(owner.image_asset, exclude=owner)
+    if not matches:
+        return None
+    labels = ', '.join(f"{match['label'] or match['type']} ({match['type']} {match['id']})" for match in matches[:limit])
+    more = f" et {len(matches) - limit} autre(s)" if len(matches) > limit else ''
+    return f"Image identique ou très proche déjà présente : {labels}{more}"
+
+
+def find_duplicate_clusters(max_distance=None):
+    """
+    Groupes d'images proches (toutes tables confondues), recalculés depuis la base :
+    [{'images': [{'id', 'token', 'width', 'height', 'owners': [...]}, ...]}, ...], les plus gros d'abord.
+    Seuls les groupes utilisés par au moins deux entrées sont retournés : une image partagée
+    par plusieurs entrées (doublon exact dédupliqué) forme un groupe à elle seule.
+    """
+    if max_distance is None:
+        max_distance = current_app.config['IMAGE_DUPLICATE_DISTANCE']
+    index = ImageHashIndex()
+    index.update(db.session.query(ImageAsset.id, ImageAsset.phash).order_by(ImageAsset.id).all())
+    groups = index.clusters(max_distance, min_size=1)
+    owners = image_owners([asset_id for group in groups for asset_id in group])
+    groups = [group for group in groups if sum(len(owners.get(asset_id, ())) for asset_id in group) > 1]
+
+    assets = {asset.id: asset for asset in ImageAsset.query.filter(
+        ImageAsset.id.in_([asset_id for group in groups for asset_id in group]))}
+    clusters = [{'images': [{'id': asset_id, 'token': assets[asset_id].token, 'width': assets[asset_id].width,
+                             'height': assets[asset_id].height, 'owners': owners.get(asset_id, [])}
+                            for asset_id in group]}
+                for group in groups]
+    clusters.sort(key=lambda cluster: -sum(len(image['owners']) for image in cluster['images']))
+    return clusters
+
+
+def backfill_image_previews():
+    """
+    Calcule l'empreinte et l'aperçu des images stockées avant leur introduction ;
+    retourne le nombre d'images traitées
+    """
+    asset_ids = db.session.query(ImageAsset.id).filter(
+        (ImageAsset.phash.is_(None)) | (ImageAsset.placeholder.is_(None))).order_by(ImageAsset.id).all()
+    updated = 0
+    for (asset_id,) in asset_ids:
+        # Une image en mémoire à la fois
+        data = db.session.query(ImageAsset.data).filter(ImageAsset.id == asset_id).scalar()
+        try:
+            phash, preview = image_previews(data)
+        except Exception as e:
+            logger.warning("Empreinte impossible pour l'image %s: %s", asset_id, e)
+            continue
+        db.session.query(ImageAsset).filter(ImageAsset.id == asset_id).update({'phash': phash,
+                                                                               'placeholder': preview})
+        updated += 1
+        if updated % 50 == 0:
+            db.session.commit()
+    db.session.commit()
+    if updated:
+        logger.info("Empreinte et aperçu calculés pour %s image(s)", updated)
+    return updated
+
+
+class BlobReader(io.RawIOBase):
+    """
+    Fichier en lecture seule sur la colonne data d'une ImageAsset, lu morceau par morceau.
+    Chaque lecture emprunte une connexion le temps d'une requête : un client lent ne
+    monopolise pas le pool pendant tout le transfert.
+    """
+
+    def __init__(self, engine, asset_id, length):
+        super().__init__()
+        self.engine = engine
+        self.asset_id = asset_id
+        self.length = length
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}[whence]
+        self.position = max(0, base + offset)
+        return self.position
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.length - self.position)
+        if size <= 0:
+            return 0
+        # substr : indices à partir de 1, en octets pour un BLOB (SQLite) comme un bytea (PostgreSQL)
+        with self.engine.connect() as connection:
+            chunk = connection.execute(
+                select(func.substr(ImageAsset.data, self.position + 1, size)).where(ImageAsset.id == self.asset_id)
+            ).scalar() or b''
+        buffer[:len(chunk)] = chunk
+        self.position += len(chunk)
+        return len(chunk)
+
+
+def find_image(token, image_type):
+    """
+    (id, token, type MIME, taille, hash) de l'image d'un token, ou None ; les octets ne sont pas chargés.
+    Les anciens tokens (colonne image_token des entrées) restent valides après migration.
+    """
+    columns = (ImageAsset.id, ImageAsset.token, ImageAsset.mime_type, ImageAsset.byte_size, ImageAsset.content_hash)
+    image = db.session.query(*columns).filter(ImageAsset.token == token).first()
+    if image is None and image_type in IMAGE_OWNERS:
+        owner = IMAGE_OWNERS[image_type]
+        image = db.session.query(*columns).join(
+            owner, owner.image_asset_id == ImageAsset.id
+        ).filter(owner.image_token == token).first()
+    return image
+
+
+def open_image(image):
+    """BlobReader sur les octets d'une image trouvée par find_image (même base : principale ou réplica)"""
+    engine = db.session.get_bind(clause=select(ImageAsset.data))
+    return BlobReader(engine, image.id, image.byte_size)
+
+
+def iter_image_chunks(asset_id, length, chunk_size=STREAM_CHUNK_SIZE):
+    """Octets d'une image par morceaux (sauvegardes)"""
+    reader = BlobReader(db.engine, asset_id, length)
+    return iter(lambda: reader.read(chunk_size), b'')
+
+
+def migrate_inline_images():
+    """
+    Déplace les images stockées dans les colonnes image_data des entrées vers ImageAsset
+    (doublons fusionnés), puis vide ces colonnes. Retourne le nombre d'entrées migrées.
+    """
+    inspector = inspect(db.engine)
+    migrated = 0
+    for model in IMAGE_OWNERS.values():
+        table_name = model.__table__.name
+        columns = {col['name'] for col in inspector.get_columns(table_name)}
+        if 'image_data' not in columns:
+            continue
+        row_ids = db.session.execute(text(
+            f"SELECT id FROM {table_name} WHERE image_data IS NOT NULL AND image_asset_id IS NULL"
+        )).scalars().all()
+        for row_id in row_ids:
+            # Une image en mémoire à la fois
+            image_token, image_data = db.session.execute(text(
+                f"SELECT image_token, image_data FROM {table_name} WHERE id = :id"
+            ), {'id': row_id}).one()
+            content_hash = hashlib.sha256(image_data).hexdigest()
+            asset = ImageAsset.query.filter_by(content_hash=content_hash).first()
+            if asset is None:
+                # Images déjà redimensionnées au téléversement : stockées telles quelles
+                # L'ancien token devient celui de l'image, les URLs déjà publiées restent valides
+                try:
+                    mime_type, width, height = image_info(image_data)
+                except Exception as e:
+                    logger.warning("Image illisible (%s %s), ignorée: %s", table_name, row_id, e)
+                    continue
+                asset = ImageAsset(token=image_token or new_token(), content_hash=content_hash,
+                                   mime_type=mime_type, width=width, height=height,
+                                   byte_size=len(image_data), data=image_data)
+                db.session.add(asset)
+                db.session.flush()
+            db.session.execute(text(
+                f"UPDATE {table_name} SET image_asset_id = :asset_id, image_data = NULL WHERE id = :id"
+            ), {'asset_id': asset.id, 'id': row_id})
+            migrated += 1
+        db.session.commit()
+    if migrated:
+        logger.info("%s image(s) déplacée(s) vers image_asset", migrated)
+    return migrated
+
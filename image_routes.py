@@ -0,0 +1,79 @@
+"""
+Blueprint 'images' : images stockées en base, servies par token.
+
+Les octets sont envoyés par morceaux depuis la base (mémoire bornée par requête),
+avec Content-Length, Accept-Ranges et réponses partielles 206.
+Cache privé par défaut ; avec IMAGE_PUBLIC_CACHE, les photos et le leaderboard sont
+servis en cache public immuable, pour qu'un proxy ou un CDN les serve à la place de
+l'application (voir image_assets.py, ImagePurge pour les suppressions).
+"""
+import logging
+
+from flask import Blueprint, Response, request
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.wsgi import wrap_file
+
+from db_routing import replica_reads
+from image_assets import STREAM_CHUNK_SIZE, find_image, is_public_image, open_image
+from models import IMAGE_OWNERS
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('images', __name__)
+
+PRIVATE_CACHE_CONTROL = 'private, max-age=3600'
+# Une URL d'ImageAsset désigne toujours le même contenu : cache d'un an sans revalidation
+PUBLIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+@bp.route('/image/<token>/<image_type>')
+@replica_reads
+def get_image_from_db(token, image_type):
+    """
+    Route sécurisée pour servir les images depuis la base de données.
+    Utilise des tokens aléatoires de 64 caractères pour éviter l'indexation.
+    """
+    try:
+        # Vérification de base du token (protection contre brute force)
+        if len(token) != 64:
+            logger.warning("Tentative d'accès avec token de longueur invalide: %s", len(token))
+            return '', 404
+        
+        # Vérification optionnelle du Referer (log pour sécurité, mais pas de blocage strict)
+        referer = request.headers.get('Referer', '')
+        host = request.headers.get('Host', '')
+        if referer and host and not referer.startswith(f'https://{host}') and not referer.startswith(f'http://{host}'):
+            logger.warning("Tentative d'accès image depuis un domaine externe: %s (token: %s...)", referer, token[:10])
+            # On ne bloque pas complètement pour compatibilité navigateurs/mode développement
+            # mais on log pour monitoring
+        
+        if image_type not in IMAGE_OWNERS:
+            logger.warning("Type d'image invalide: %s", image_type)
+            return '', 404
+        
+        # Métadonnées seulement : les octets sont lus par morceaux pendant l'envoi
+        image = find_image(token, image_type)
+        if image is None:
+            return '', 404
+        
+        # Headers de sécurité pour empêcher l'indexation
+        response = Response(wrap_file(request.environ, open_image(image), buffer_size=STREAM_CHUNK_SIZE),
+                            mimetype=image.mime_type, direct_passthrough=True)
+        response.content_length = image.byte_size
+        response.headers['X-Robots-Tag'] = 'noindex, nofollow, noimageindex, noarchive, nosnippet'
+        if is_public_image(image, token, image_type):
+            response.headers['Cache-Control'] = PUBLIC_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = PRIVATE_CACHE_CONTROL  # Cache privé seulement
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        response.headers['Referrer-Policy'] = 'no-referrer-when-downgrade'
+        
+        # Range (206, reprise d'un téléchargement interrompu), ETag et If-None-Match (304)
+        response.set_etag(image.content_hash)
+        response.accept_ranges = 'bytes'  # Werkzeug ne l'annonce que sur les réponses 206
+        return response.make_conditional(request, accept_ranges=True, complete_length=image.byte_size)
+        
+    except RequestedRangeNotSatisfiable:
+        raise
+    except Exception as e:
+        logger.error("Erreur lors de la récupération de l'image: %s", e)
+        return '', 404
@@ -0,0 +1,124 @@
+"""
+Index des empreintes perceptuelles (dHash 128 bits) des images stockées.
+
+Deux images dont les empreintes diffèrent de peu de bits (distance de Hamming)
+sont visuellement proches : même photo ré-encodée, redimensionnée, recadrée
+légèrement ou retouchée. Les empreintes sont rangées dans un BK-tree : une
+recherche à distance d donne les mêmes résultats qu'un parcours complet, mais
+l'inégalité triangulaire écarte les sous-arbres trop éloignés, ce qui la garde
+rapide quand la collection grandit.
+
+Ce module ne dépend ni de Flask ni de Pillow (empreintes calculées par
+image_utils.dhash) : ImageHashIndex est construit une fois par processus et
+complété au fil des téléversements, voir image_assets.py.
+"""
+import threading
+
+
+def hamming(a, b):
+    """Nombre de bits qui diffèrent entre deux empreintes entières"""
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK-tree sur la distance de Hamming : nœud = [empreinte, éléments, {distance: enfant}]"""
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value, item):
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """Liste de (distance, empreinte, élément) à au plus max_distance de value"""
+        if self._root is None:
+            return []
+        matches = []
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance:
+                matches.extend((distance, node_value, item) for item in items)
+            # Seuls les enfants dans [distance - d, distance + d] peuvent contenir des résultats
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def items(self):
+        """(empreinte, élément) de tout l'arbre"""
+        stack = [self._root] if self._root else []
+        while stack:
+            value, items, children = stack.pop()
+            for item in items:
+                yield value, item
+            stack.extend(children.values())
+
+
+class ImageHashIndex:
+    """
+    BK-tree des empreintes, complété par ordre d'id croissant : update() ne reçoit que
+    les lignes postérieures à last_id. Les entrées ne sont jamais retirées ; l'appelant
+    revérifie les résultats en base (image supprimée entre-temps).
+    """
+
+    def __init__(self):
+        self.tree = BKTree()
+        self.last_id = 0
+        self.lock = threading.Lock()
+
+    def update(self, rows):
+        """rows : (id, empreinte hexadécimale) triés par id, tous > last_id"""
+        with self.lock:
+            for row_id, phash in rows:
+                if phash:
+                    self.tree.add(int(phash, 16), row_id)
+                self.last_id = max(self.last_id, row_id)
+
+    def search(self, phash, max_distance):
+        """(distance, id) des images à au plus max_distance de l'empreinte hexadécimale phash"""
+        with self.lock:
+            return [(distance, row_id) for distance, _, row_id in self.tree.search(int(phash, 16), max_distance)]
+
+    def clusters(self, max_distance, min_size=2):
+        """Groupes d'ids (au moins min_size) reliés de proche en proche par une distance <= max_distance"""
+        with self.lock:
+            parent = {}
+
+            def find(row_id):
+                parent.setdefault(row_id, row_id)
+                while parent[row_id] != row_id:
+                    parent[row_id] = parent[parent[row_id]]
+                    row_id = parent[row_id]
+                return row_id
+
+            for value, row_id in self.tree.items():
+                find(row_id)
+                for _, _, other_id in self.tree.search(value, max_distance):
+                    if other_id != row_id:
+                        parent[find(other_id)] = find(row_id)
+
+        groups = {}
+        for row_id in parent:
+            groups.setdefault(find(row_id), []).append(row_id)
+        return [sorted(group) for group in groups.values() if len(group) >= min_size]
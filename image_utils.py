@@ -0,0 +1,194 @@
+"""
+Fonctions utilitaires pour les images.
+
+Pillow n'est importé qu'au premier redimensionnement (téléversements admin) :
+les workers qui ne servent que les pages publiques ne le chargent jamais.
+Mesures de mémoire et de temps de décodage : python benchmark_images.py
+"""
+import base64
+import logging
+import math
+from io import BytesIO
+
+from markupsafe import Markup, escape
+
+from config import ALLOWED_EXTENSIONS, MAX_IMAGE_PIXELS
+
+logger = logging.getLogger(__name__)
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def get_image_url(image_filename=None, image_token=None, image_type=None):
+    """
+    Retourne l'URL de l'image.
+    Priorité : token DB > fichier local
+    """
+    if image_token and image_type:
+        return f"/image/{image_token}/{image_type}"
+    elif image_filename:
+        return f"/static/uploads/images/{image_filename}"
+    return None
+
+def get_image_attrs(entry, image_type, image_filename=None, lazy=True):
+    """
+    Attributs d'une balise <img> pour l'image d'une entrée (photo, wall, leader) : src, et pour
+    les images stockées en base width/height (pas de décalage de mise en page) et l'aperçu flou
+    en fond, affiché jusqu'au chargement. lazy=False pour les images visibles dès l'ouverture.
+    Usage : <img {{ get_image_attrs(photo, 'photo', photo.filename) }} alt="...">
+    """
+    attrs = {'src': get_image_url(image_token=entry.public_image_token, image_type=image_type)
+                    or get_image_url(image_filename=image_filename)}
+    asset = entry.image_asset
+    if asset is not None and asset.width and asset.height:
+        attrs['width'] = asset.width
+        attrs['height'] = asset.height
+    if asset is not None and asset.placeholder:
+        attrs['style'] = f"background: center / cover no-repeat url({asset.placeholder})"
+    attrs['loading'] = 'lazy' if lazy else 'eager'
+    attrs['decoding'] = 'async'
+    return Markup(' '.join(f'{name}="{escape(value)}"' for name, value in attrs.items()))
+
+EXIF_ORIENTATION = 0x0112
+# Réduction entière (reduce) tant que l'image dépasse 3x la taille visée, puis LANCZOS
+REDUCING_GAP = 3.0
+# Empreinte perceptuelle : 2 x HASH_SIZE x HASH_SIZE bits (128), voir image_similarity.py
+HASH_SIZE = 8
+# Aperçu flou affiché pendant le chargement : WebP de PLACEHOLDER_SIZE px au plus (~100 octets en base64)
+PLACEHOLDER_SIZE = 16
+
+def _as_stream(source):
+    return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+def image_info(source):
+    """(type MIME, largeur, hauteur) lus dans l'en-tête, sans décoder les pixels"""
+    from PIL import Image
+    
+    with Image.open(_as_stream(source)) as img:
+        return Image.MIME.get(img.format, 'image/jpeg'), img.width, img.height
+
+def dhash(img):
+    """
+    Empreinte perceptuelle (dHash) d'une image Pillow, en 32 caractères hexadécimaux :
+    image en niveaux de gris réduite à 9x8 puis 8x9 (moyenne exacte par zone, stable d'une
+    taille ou d'un encodage à l'autre), un bit par pixel plus clair que son voisin de droite,
+    puis que son voisin du dessous. Le sens vertical distingue les images en dégradé (ciel, mer).
+    """
+    from PIL import Image
+    
+    gray = img.convert('L')
+    horizontal = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX).tobytes()
+    vertical = gray.resize((HASH_SIZE, HASH_SIZE + 1), Image.Resampling.BOX).tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + col
+            value = (value << 1) | (horizontal[offset] > horizontal[offset + 1])
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * HASH_SIZE + col
+            value = (value << 1) | (vertical[offset] > vertical[offset + HASH_SIZE])
+    return f"{value:0{HASH_SIZE * HASH_SIZE // 2}x}"
+
+def placeholder(img):
+    """
+    Aperçu flou d'une image Pillow en data URI (WebP de quelques pixels, agrandi par le navigateur).
+    Chaîne vide pour les images transparentes : l'aperçu resterait visible sous la transparence.
+    """
+    from PIL import Image
+    
+    if 'A' in img.mode or 'transparency' in img.info:
+        return ''
+    small = img.convert('RGB')
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    output = BytesIO()
+    small.save(output, format='WEBP', quality=40)
+    return 'data:image/webp;base64,' + base64.b64encode(output.getvalue()).decode('ascii')
+
+def image_previews(source):
+    """(dHash, aperçu) d'une image déjà stockée (octets ou fichier ouvert), orientation EXIF appliquée"""
+    from PIL import Image, ImageOps
+    
+    with Image.open(_as_stream(source)) as img:
+        img.draft('RGB', (HASH_SIZE * 16, HASH_SIZE * 16))
+        img = ImageOps.exif_transpose(img)
+        return dhash(img), placeholder(img)
+
+def prepare_image(source, fixed_width=800, max_pixels=MAX_IMAGE_PIXELS, draft=True):
+    """
+    Décode une image une seule fois : orientation EXIF appliquée, largeur ramenée à fixed_width px.
+    source : octets ou fichier ouvert (lu au fil du décodage, jamais chargé en entier).
+    Retourne (octets, type MIME, largeur, hauteur, dHash, aperçu). L'original est gardé tel quel s'il est déjà
+    assez petit et bien orienté, ou s'il est animé.
+    Lève ValueError au-delà de max_pixels (lu dans l'en-tête, avant décodage), une autre
+    exception si ce n'est pas une image.
+    
+    Mémoire : un JPEG est décodé directement à l'échelle 1/2, 1/4 ou 1/8 (draft, dans le
+    domaine DCT) la plus proche au-dessus de la taille visée, puis réduit d'un facteur
+    entier avant le LANCZOS final (reducing_gap).
+    """
+    from PIL import Image, ImageOps
+    
+    stream = _as_stream(source)
+    stream.seek(0)
+    with Image.open(stream) as img:
+        format_name = img.format
+        if img.width * img.height > max_pixels:
+            raise ValueError(f"Image trop grande ({img.width}x{img.height}, "
+                             f"maximum {max_pixels / 1_000_000:.0f} mégapixels)")
+        
+        orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+        if getattr(img, 'is_animated', False) or (img.width <= fixed_width and orientation == 1):
+            phash, preview = dhash(img), placeholder(img)
+            stream.seek(0)
+            return stream.read(), Image.MIME.get(format_name, 'image/jpeg'), img.width, img.height, phash, preview
+        
+        # Largeur finale = hauteur source si l'orientation EXIF tourne l'image d'un quart de tour
+        rotated = orientation in (5, 6, 7, 8)
+        final_width = img.height if rotated else img.width
+        if draft and format_name == 'JPEG' and final_width > fixed_width:
+            scale = fixed_width / final_width
+            img.draft(img.mode, (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+        
+        img = ImageOps.exif_transpose(img)
+        if img.width > fixed_width:
+            new_height = max(1, round(img.height * fixed_width / img.width))
+            img = img.resize((fixed_width, new_height), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+        
+        # PNG conservé (et transparence), le reste en JPEG
+        output = BytesIO()
+        if format_name == 'PNG' or 'A' in img.mode or 'transparency' in img.info:
+            img.save(output, format='PNG', optimize=True)
+            mime_type = 'image/png'
+        else:
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.save(output, format='JPEG', quality=85, optimize=True)
+            mime_type = 'image/jpeg'
+        return output.getvalue(), mime_type, img.width, img.height, dhash(img), placeholder(img)
+
+def resize_image(image_path, fixed_width=800):
+    """Redimensionne une image à une largeur fixe de 800px en gardant les proportions"""
+    from PIL import Image
+    
+    try:
+        with Image.open(image_path) as img:
+            # Si l'image est déjà plus petite ou égale à 800px, on la laisse telle quelle
+            if img.width <= fixed_width:
+                return True
+            
+            # Calculer la nouvelle hauteur en gardant les proportions
+            ratio = fixed_width / img.width
+            new_height = int(img.height * ratio)
+            new_size = (fixed_width, new_height)
+            
+            # Redimensionner
+            resized_img = img.resize(new_size, Image.Resampling.LANCZOS)
+            
+            # Sauvegarder en écrasant l'original
+            resized_img.save(image_path, optimize=True, quality=85)
+            return True
+    except Exception as e:
+        logger.error("Erreur lors du redimensionnement: %s", e)
+        return False
+
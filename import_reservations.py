@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Script pour importer des réservations historiques depuis un fichier CSV ou iCalendar.
+
+Usage:
+    python import_reservations.py reservations.csv
+    python import_reservations.py calendrier.ics --dry-run
+
+CSV attendu (séparateur , ou ;) :
+    guest_name,start_date,end_date,status
+    Mémé,2024-07-01,2024-07-15,approved
+"""
+import argparse
+import sys
+
+from app import create_app, db
+from admin_routes import import_reservations, decode_upload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importer des réservations (CSV ou ICS)")
+    parser.add_argument('fichier', help="Fichier .csv ou .ics à importer")
+    parser.add_argument('--dry-run', action='store_true', help="Vérifier le fichier sans rien enregistrer")
+    args = parser.parse_args()
+    app = create_app()
+
+    with open(args.fichier, 'rb') as f:
+        content = decode_upload(f.read())
+
+    with app.app_context():
+        db.create_all()
+        report = import_reservations(args.fichier, content, dry_run=args.dry_run)
+
+    verb = "importables" if report['dry_run'] else "importées"
+    print(f"{report['imported']} réservation(s) {verb}")
+    for error in report['rejected']:
+        print(f"  [REJET] ligne {error['line']} ({error['guest_name']}): {error['reason']}")
+
+    return 1 if report['rejected'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
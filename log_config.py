@@ -0,0 +1,137 @@
+"""
+Configuration du logging de l'application.
+
+Les threads de requête ne font que déposer les enregistrements dans une file
+(QueueHandler) ; un thread dédié (QueueListener) les formate et les écrit sur
+la sortie standard. Le formatage et les écritures bloquantes sortent ainsi du
+chemin des requêtes.
+
+Formats :
+- text : lisible dans un terminal (développement)
+- json : un objet JSON par ligne avec l'identifiant de requête (production)
+
+Les messages utilisent le formatage paresseux de logging (logger.info("... %s", valeur)) :
+la chaîne n'est construite que si l'enregistrement est réellement émis.
+Vérification : python check_lazy_logging.py
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+TEXT_FORMAT = '%(asctime)s | %(levelname)-8s | %(name)s | %(request_id)s | %(message)s'
+TEXT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# Attributs standards d'un LogRecord : tout le reste vient de extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+_listener = None
+_queue_handler = None
+
+
+def _current_request_id():
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return '-'
+    if has_request_context():
+        return g.get('request_id', '-')
+    return '-'
+
+
+class RequestIdFilter(logging.Filter):
+    """Ajoute request_id à l'enregistrement, dans le thread de la requête (avant la file)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = _current_request_id()
+        return True
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    File en mémoire du processus : rien à sérialiser. Seule l'interpolation des
+    arguments est faite dans le thread appelant (ils pourraient changer ensuite) ;
+    horodatage, JSON et traceback sont formatés par le thread d'écriture.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne ; les champs passés via extra={...} sont inclus"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _start_listener(log_queue, handler):
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging(level='INFO', log_format='text'):
+    """
+    Installe le QueueHandler sur le logger racine et démarre le thread d'écriture.
+    Idempotent : un second appel remplace la configuration précédente.
+    """
+    global _queue_handler
+    _stop_listener()
+
+    if log_format == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATEFMT)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _LocalQueueHandler(log_queue)
+    _queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(level)
+
+    _start_listener(log_queue, stream_handler)
+
+
+def _restart_after_fork():
+    # gunicorn (preload_app) : le thread d'écriture ne survit pas au fork des workers,
+    # et la file (dont le verrou a pu être pris par ce thread) est recréée
+    if _listener is not None:
+        _queue_handler.queue = queue.SimpleQueue()
+        _start_listener(_queue_handler.queue, *_listener.handlers)
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+atexit.register(_stop_listener)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Script de migration pour ajouter la colonne status à reservation_pending"""
-from app import app, db, ReservationPending
+from app import create_app, db, ReservationPending
+app = create_app()
 
 with app.app_context():
     # Créer toutes les tables si elles n'existent pas
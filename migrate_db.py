@@ -7,7 +7,8 @@ Version: 2.0.0
 
 import os
 import sys
-from app import app, db
+from app import create_app, db
+app = create_app()
 from sqlalchemy import inspect
 import logging
 
@@ -26,7 +27,7 @@ def migrate_database():
             inspector = inspect(db.engine)
             existing_tables = inspector.get_table_names()
             
-            logger.info(f"Tables existantes: {existing_tables}")
+            logger.info("Tables existantes: %s", existing_tables)
             
             # Créer toutes les tables si elles n'existent pas
             logger.info("\n1. Verification/creation des tables principales...")
@@ -69,7 +70,7 @@ def migrate_database():
             return True
             
         except Exception as e:
-            logger.error(f"\nErreur lors de la migration: {e}")
+            logger.error("\nErreur lors de la migration: %s", e)
             import traceback
             traceback.print_exc()
             db.session.rollback()
@@ -82,7 +83,7 @@ if __name__ == '__main__':
         logger.info("\n\nMigration annulee.")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"\n[ERREUR] {e}")
+        logger.error("\n[ERREUR] %s", e)
         import traceback
         traceback.print_exc()
         sys.exit(1)
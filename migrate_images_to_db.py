@@ -7,7 +7,8 @@ Script de migration pour ajouter les colonnes nécessaires au stockage d'images
 import os
 import sys
 from sqlalchemy import text
-from app import app, db, Photo, WallOfShame, Leaderboard
+from app import create_app, db, Photo, WallOfShame, Leaderboard
+app = create_app()
 
 def migrate_database():
     """Ajoute les colonnes nécessaires pour le stockage d'images en DB"""
@@ -50,7 +51,7 @@ def migrate_database():
                         logger.warning("SQLite ne supporte pas ALTER TABLE ADD COLUMN")
                         
             except Exception as e:
-                logger.warning(f"Erreur lors de la migration de la table photo: {e}")
+                logger.warning("Erreur lors de la migration de la table photo: %s", e)
             
             # Migration pour la table wall_of_shame
             try:
@@ -74,7 +75,7 @@ def migrate_database():
                         logger.info("✓ Colonne mime_type ajoutée à la table wall_of_shame")
                         
             except Exception as e:
-                logger.warning(f"Erreur lors de la migration de la table wall_of_shame: {e}")
+                logger.warning("Erreur lors de la migration de la table wall_of_shame: %s", e)
             
             # Migration pour la table leaderboard
             try:
@@ -98,7 +99,7 @@ def migrate_database():
                         logger.info("✓ Colonne mime_type ajoutée à la table leaderboard")
                         
             except Exception as e:
-                logger.warning(f"Erreur lors de la migration de la table leaderboard: {e}")
+                logger.warning("Erreur lors de la migration de la table leaderboard: %s", e)
             
             db.session.commit()
             logger.info("=" * 60)
@@ -108,7 +109,7 @@ def migrate_database():
             logger.info("Les anciennes images (si elles existent) continueront de fonctionner via le système de fichiers.")
             
         except Exception as e:
-            logger.error(f"Erreur lors de la migration: {e}")
+            logger.error("Erreur lors de la migration: %s", e)
             db.session.rollback()
             sys.exit(1)
 
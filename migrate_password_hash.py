@@ -6,7 +6,8 @@ Usage: python migrate_password_hash.py
 
 import os
 import sys
-from app import app, db
+from app import create_app, db
+app = create_app()
 
 def migrate_password_hash_column():
     """Migre la colonne password_hash de String(120) vers String(256)"""
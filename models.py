@@ -0,0 +1,345 @@
+"""
+Modèles de base de données et requêtes partagées entre les blueprints.
+
+- Suivi des écritures (DataVersion, ChangeLog) via les événements de Session
+- Recherche indexée des réservations en attente (FTS5 sur SQLite, pg_trgm sur PostgreSQL)
+- Images partagées (ImageAsset) référencées par les photos, le Wall of Shame et le leaderboard
+"""
+import logging
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, literal_column, or_, select, table
+from sqlalchemy.orm import Session, declared_attr
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Modèles de base de données
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
+    is_admin = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Reservation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    guest_name = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    token = db.Column(db.String(100), unique=True, nullable=False)
+    
+    # Index pour la pagination par clé (created_at, id) dans l'admin
+    __table_args__ = (
+        db.Index('ix_reservation_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reservation_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+
+class Activity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    distance = db.Column(db.String(50))
+    difficulty = db.Column(db.String(20))
+    activity_type = db.Column(db.String(50))  # surf, vtt, randonnee, escalade
+    image_url = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ImageAsset(db.Model):
+    """Image stockée une seule fois (dédupliquée par hash du fichier téléversé), voir image_assets.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    token = db.Column(db.String(64), unique=True, nullable=False)  # Token aléatoire de l'URL /image/<token>/...
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)  # SHA-256 du fichier d'origine
+    mime_type = db.Column(db.String(50), nullable=False)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    byte_size = db.Column(db.Integer)
+    phash = db.Column(db.String(32), index=True)  # Empreinte perceptuelle (dHash), voir image_similarity.py
+    placeholder = db.Column(db.Text)  # Aperçu flou (data URI) affiché pendant le chargement, '' si aucun
+    data = db.deferred(db.Column(db.LargeBinary, nullable=False))  # Chargé seulement par la route /image
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ImageOwnerMixin:
+    """Entrée illustrée : l'image est une ImageAsset, éventuellement partagée avec d'autres entrées"""
+
+    @declared_attr
+    def image_asset_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('image_asset.id'), index=True)
+
+    @declared_attr
+    def image_asset(cls):
+        return db.relationship(ImageAsset, lazy='joined')
+
+    @property
+    def public_image_token(self):
+        """Token de l'URL de l'image : celui de l'ImageAsset, sinon l'ancien token de la ligne"""
+        return self.image_asset.token if self.image_asset else self.image_token
+
+class Photo(ImageOwnerMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(200), nullable=False)  # Gardé pour compatibilité
+    image_token = db.Column(db.String(64), unique=True, index=True)  # Ancien token (avant ImageAsset)
+    caption = db.Column(db.String(200))
+    display_order = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class WallOfShame(ImageOwnerMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    person_name = db.Column(db.String(100), nullable=False)
+    image_token = db.Column(db.String(64), unique=True, index=True)  # Ancien token (avant ImageAsset)
+    image_url = db.Column(db.String(200))  # Gardé pour rétrocompatibilité
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    display_order = db.Column(db.Integer, default=0)
+
+class ReservationPending(db.Model):
+    """Réservations en attente de validation par l'admin"""
+    id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    guest_name = db.Column(db.String(100), nullable=False)
+    nickname = db.Column(db.String(100))
+    status = db.Column(db.String(20), default='pending')  # pending, approved, expired
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    ip_address = db.Column(db.String(50))
+    user_agent = db.Column(db.String(200))
+    search_text = db.Column(db.String(210))  # guest_name + nickname normalisés (sans accents) pour la recherche
+    
+    # Index pour la pagination par clé (created_at, id) dans l'admin
+    __table_args__ = (
+        db.Index('ix_reservation_pending_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reservation_pending_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+
+class Leaderboard(ImageOwnerMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    person_name = db.Column(db.String(100), nullable=False)
+    visit_count = db.Column(db.Integer, default=0)
+    rank_position = db.Column(db.Integer, default=0)
+    last_visit = db.Column(db.Date)
+    image_token = db.Column(db.String(64), unique=True, index=True)  # Ancien token (avant ImageAsset)
+    image_url = db.Column(db.String(200))  # Gardé pour rétrocompatibilité
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DataVersion(db.Model):
+    """Compteur de version par table, incrémenté à chaque écriture (ETag, invalidation de caches)"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ChangeLog(db.Model):
+    """Journal des écritures sur les réservations, lu par le flux /admin/events"""
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    row_id = db.Column(db.Integer)  # None pour les écritures groupées
+    action = db.Column(db.String(10), nullable=False)  # insert, update, delete, bulk
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class ImagePurge(db.Model):
+    """URL d'image à retirer des caches partagés (proxy, CDN), voir image_assets.record_image_purges"""
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class ServerSession(db.Model):
+    """Session côté serveur (voir server_session.py), une ligne par session non vide"""
+    key = db.Column(db.String(64), primary_key=True)  # SHA-256 de l'identifiant du cookie
+    data = db.Column(db.Text, nullable=False)  # Données de la session (JSON étiqueté de Flask)
+    expires_at = db.Column(db.Float, nullable=False, index=True)  # Timestamp Unix
+
+class RateLimitBucket(db.Model):
+    """Seau à jetons du limiteur de débit (voir rate_limit.py), une ligne par IP ou sous-réseau"""
+    key = db.Column(db.String(100), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)  # Timestamp Unix
+    allowed = db.Column(db.Boolean, nullable=False, default=True)  # Résultat de la dernière vérification
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+
+# Entrées qui référencent une ImageAsset, par type d'image de l'URL /image/<token>/<type>
+IMAGE_OWNERS = {'photo': Photo, 'wall': WallOfShame, 'leader': Leaderboard}
+
+# Tables dont les écritures incrémentent DataVersion (photo, image_asset : manifeste de la galerie)
+VERSIONED_TABLES = {'reservation', 'reservation_pending', 'photo', 'image_asset'}
+# Tables dont les écritures sont journalisées dans ChangeLog
+CHANGE_LOG_TABLES = {'reservation', 'reservation_pending'}
+# Canal PostgreSQL LISTEN/NOTIFY pour réveiller les flux SSE des autres workers
+CHANGE_NOTIFY_CHANNEL = 'chez_meme_changes'
+
+def _bump_data_versions(connection, names):
+    """Incrémente les versions dans la transaction en cours"""
+    data_version = DataVersion.__table__
+    now = datetime.utcnow()
+    for name in sorted(names):
+        result = connection.execute(
+            data_version.update().where(data_version.c.name == name)
+            .values(version=data_version.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(data_version.insert().values(name=name, version=1, updated_at=now))
+
+def _record_writes(connection, changes):
+    """
+    Enregistre des écritures (table, id, action) dans la transaction en cours :
+    versions, journal des changements et notification PostgreSQL (envoyée au commit)
+    """
+    names = {table_name for table_name, _, _ in changes if table_name in VERSIONED_TABLES}
+    if names:
+        _bump_data_versions(connection, names)
+    
+    logged = [{'table_name': table_name, 'row_id': row_id, 'action': action}
+              for table_name, row_id, action in changes if table_name in CHANGE_LOG_TABLES]
+    if logged:
+        connection.execute(ChangeLog.__table__.insert(), logged)
+        if connection.dialect.name == 'postgresql':
+            connection.execute(db.text(f"NOTIFY {CHANGE_NOTIFY_CHANNEL}"))
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush_writes(session, flush_context):
+    changes = []
+    for objects, action in ((session.new, 'insert'), (session.dirty, 'update'), (session.deleted, 'delete')):
+        for obj in objects:
+            table_name = getattr(getattr(obj, '__table__', None), 'name', None)
+            if table_name in VERSIONED_TABLES or table_name in CHANGE_LOG_TABLES:
+                changes.append((table_name, getattr(obj, 'id', None), action))
+    if changes:
+        _record_writes(session.connection(), changes)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_writes(orm_execute_state):
+    """Les INSERT/UPDATE/DELETE groupés (query.delete(), insert(Model)) ne passent pas par le flush"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    table_name = mapper.local_table.name if mapper is not None else None
+    if table_name not in VERSIONED_TABLES and table_name not in CHANGE_LOG_TABLES:
+        return None
+    result = orm_execute_state.invoke_statement()
+    # Les INSERT groupés renvoient un résultat sans rowcount : toujours compter comme une écriture
+    if orm_execute_state.is_insert or getattr(result, 'rowcount', 0):
+        _record_writes(orm_execute_state.session.connection(), [(table_name, None, 'bulk')])
+    return result
+
+def purge_change_log(retention_hours):
+    """Supprime les entrées du journal plus anciennes que retention_hours (non validé) ; retourne leur nombre"""
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    return ChangeLog.query.filter(ChangeLog.created_at < cutoff).delete()
+
+def get_data_version(name):
+    """Version courante d'une table (0 si elle n'a jamais été modifiée)"""
+    version = db.session.query(DataVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+# Recherche indexée des réservations en attente
+# PostgreSQL : index GIN pg_trgm sur search_text
+# SQLite : table virtuelle FTS5 synchronisée par triggers
+PENDING_FTS_TABLE = 'reservation_pending_fts'
+_pending_fts_available = False
+
+def normalize_search_text(*values):
+    """Normalise un texte pour la recherche : minuscules, sans accents ni ponctuation (Hélène -> helene)"""
+    raw = ' '.join(value for value in values if value)
+    decomposed = unicodedata.normalize('NFKD', raw)
+    without_accents = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(re.sub(r'[\W_]+', ' ', without_accents.lower()).split())
+
+@event.listens_for(ReservationPending, 'before_insert')
+@event.listens_for(ReservationPending, 'before_update')
+def _update_pending_search_text(mapper, connection, target):
+    target.search_text = normalize_search_text(target.guest_name, target.nickname)
+
+def ensure_pending_search_index():
+    """Crée l'index de recherche adapté au moteur de base de données et remplit search_text"""
+    global _pending_fts_available
+    dialect = db.engine.dialect.name
+    
+    # Remplir search_text pour les lignes créées avant l'ajout de la colonne
+    missing = ReservationPending.query.filter(ReservationPending.search_text.is_(None)).all()
+    for pending in missing:
+        pending.search_text = normalize_search_text(pending.guest_name, pending.nickname)
+    if missing:
+        db.session.commit()
+        logger.info("search_text rempli pour %s réservation(s) en attente", len(missing))
+    
+    if dialect == 'postgresql':
+        db.session.execute(db.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.session.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_reservation_pending_search_trgm "
+            "ON reservation_pending USING gin (search_text gin_trgm_ops)"
+        ))
+        db.session.commit()
+    elif dialect == 'sqlite':
+        exists = db.session.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {'name': PENDING_FTS_TABLE}).first()
+        db.session.execute(db.text(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {PENDING_FTS_TABLE} USING fts5(
+                search_text, content='reservation_pending', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """))
+        db.session.execute(db.text(f"""
+            CREATE TRIGGER IF NOT EXISTS {PENDING_FTS_TABLE}_ai AFTER INSERT ON reservation_pending BEGIN
+                INSERT INTO {PENDING_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+            END
+        """))
+        db.session.execute(db.text(f"""
+            CREATE TRIGGER IF NOT EXISTS {PENDING_FTS_TABLE}_ad AFTER DELETE ON reservation_pending BEGIN
+                INSERT INTO {PENDING_FTS_TABLE}({PENDING_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+            END
+        """))
+        db.session.execute(db.text(f"""
+            CREATE TRIGGER IF NOT EXISTS {PENDING_FTS_TABLE}_au AFTER UPDATE OF search_text ON reservation_pending BEGIN
+                INSERT INTO {PENDING_FTS_TABLE}({PENDING_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+                INSERT INTO {PENDING_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+            END
+        """))
+        if not exists:
+            # Indexer les lignes déjà présentes
+            db.session.execute(db.text(f"INSERT INTO {PENDING_FTS_TABLE}({PENDING_FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+        _pending_fts_available = True
+
+def search_pending_reservations(search_term, page=1, per_page=20):
+    """
+    Recherche par préfixe de mots sur le nom et le surnom, insensible aux accents.
+    Retourne un objet Pagination de Flask-SQLAlchemy.
+    """
+    query = ReservationPending.query
+    tokens = normalize_search_text(search_term).split()
+    
+    if tokens and _pending_fts_available:
+        # "jean"* "dup"* : chaque mot doit correspondre en préfixe
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        fts_ids = select(literal_column('rowid')).select_from(table(PENDING_FTS_TABLE)).where(
+            db.text(f"{PENDING_FTS_TABLE} MATCH :match").bindparams(match=match)
+        )
+        query = query.filter(ReservationPending.id.in_(fts_ids))
+    else:
+        # Les tokens ne contiennent que des caractères alphanumériques : pas d'échappement LIKE nécessaire
+        for token in tokens:
+            query = query.filter(or_(
+                ReservationPending.search_text.like(f'{token}%'),
+                ReservationPending.search_text.like(f'% {token}%')
+            ))
+    
+    query = query.order_by(ReservationPending.created_at.desc(), ReservationPending.id.desc())
+    return query.paginate(page=page, per_page=per_page, max_per_page=100, error_out=False)
+
+def serialize_pending(pending):
+    """Représentation JSON d'une réservation en attente"""
+    return {
+        'id': pending.id,
+        'guest_name': pending.guest_name,
+        'nickname': pending.nickname,
+        'start_date': pending.start_date.isoformat(),
+        'end_date': pending.end_date.isoformat(),
+        'status': pending.status,
+        'created_at': pending.created_at.isoformat() if pending.created_at else None,
+        'ip_address': pending.ip_address
+    }
+
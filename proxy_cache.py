@@ -0,0 +1,188 @@
+"""
+Cache du proxy inverse (Varnish, nginx, CDN) pour les pages publiques.
+
+Réponses : les vues décorées par @surrogate_keys(...) (/, /gallery.json, /calendrier,
+/leaderboard, /wall-of-shame, /api/reservations) portent, pour un visiteur anonyme
+(sans cookie de session, voir server_session.py) :
+- Surrogate-Key : une clé par modèle affiché (reservations, photos, leaderboard, wall-of-shame)
+- Cache-Control: s-maxage=PROXY_CACHE_SECONDS (et Surrogate-Control) pour le proxy, le
+  navigateur gardant son propre max-age (0 par défaut : revalidation)
+Un visiteur avec un cookie (admin) reçoit Cache-Control: private : le proxy ne garde pas sa page.
+
+Purges : les écritures d'une transaction sont relevées au flush (tables -> clés, URLs
+d'images de ImagePurge) et envoyées après le commit seulement, hors de la requête
+(un thread par worker) :
+- PROXY_PURGE_URL : requête PURGE avec l'en-tête PROXY_PURGE_HEADER (clés), et PURGE <url> par image
+- PROXY_PURGE_DIR : fichier de purge (une ligne 'key <clé>' ou 'url <url>'), lu par le proxy
+Avec des purges, PROXY_CACHE_SECONDS peut être long ; sans, garder un micro-cache de quelques secondes.
+Test local : python fake_cache_proxy.py (proxy en mémoire qui respecte ces en-têtes).
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from flask import current_app, has_app_context, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Table modifiée -> clés des pages qui l'affichent
+TABLE_SURROGATE_KEYS = {
+    'reservation': ('reservations',),
+    'photo': ('photos',),
+    'leaderboard': ('leaderboard',),
+    'wall_of_shame': ('wall-of-shame',),
+    'image_asset': ('photos', 'leaderboard', 'wall-of-shame'),  # Dimensions et aperçus des images
+}
+IMAGE_PURGE_TABLE = 'image_purge'
+PENDING_KEYS = 'proxy_purge_keys'
+PENDING_URLS = 'proxy_purge_urls'
+
+
+def is_anonymous():
+    """Requête sans cookie de session : même réponse pour tous les visiteurs"""
+    return current_app.session_interface.get_cookie_name(current_app) not in request.cookies
+
+
+def surrogate_keys(*keys):
+    """Décorateur : réponse publique mise en cache par le proxy, purgée quand ces clés changent"""
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            seconds = current_app.config['PROXY_CACHE_SECONDS']
+            if not seconds or request.method not in ('GET', 'HEAD') or response.status_code != 200:
+                return response
+            if not is_anonymous():
+                response.cache_control.public = False
+                response.cache_control.private = True
+                response.cache_control.s_maxage = None
+                response.vary.add('Cookie')
+                return response
+            if response.cache_control.private or response.cache_control.no_store:
+                return response
+            response.cache_control.public = True
+            if response.cache_control.max_age is None:
+                response.cache_control.max_age = 0
+            response.cache_control.s_maxage = seconds
+            response.headers['Surrogate-Control'] = f'max-age={seconds}'
+            response.headers['Surrogate-Key'] = ' '.join(keys)
+            # Le proxy ne doit servir la copie anonyme qu'aux requêtes sans cookie
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
+
+
+def _pending(session):
+    return session.info.setdefault(PENDING_KEYS, set()), session.info.setdefault(PENDING_URLS, [])
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flush_purges(session, flush_context):
+    keys, urls = _pending(session)
+    for objects in (session.new, session.dirty, session.deleted):
+        for obj in objects:
+            table_name = getattr(getattr(obj, '__table__', None), 'name', None)
+            keys.update(TABLE_SURROGATE_KEYS.get(table_name, ()))
+            if table_name == IMAGE_PURGE_TABLE and obj in session.new:
+                urls.append(obj.url)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_purges(orm_execute_state):
+    """Les INSERT/UPDATE/DELETE groupés (query.delete(), query.update()) ne passent pas par le flush"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table_name = mapper.local_table.name if mapper is not None else None
+    if table_name in TABLE_SURROGATE_KEYS:
+        _pending(orm_execute_state.session)[0].update(TABLE_SURROGATE_KEYS[table_name])
+
+
+@event.listens_for(Session, 'after_commit')
+def _send_purges(session):
+    keys = session.info.pop(PENDING_KEYS, None)
+    urls = session.info.pop(PENDING_URLS, None)
+    if not (keys or urls) or not has_app_context():
+        return
+    purger = current_app.extensions.get('proxy_purger')
+    if purger is not None:
+        purger.purge(sorted(keys or ()), urls or [])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_purges(session):
+    session.info.pop(PENDING_KEYS, None)
+    session.info.pop(PENDING_URLS, None)
+
+
+class ProxyPurger:
+    """
+    Envoie les purges au proxy (PURGE HTTP) et/ou les écrit dans un répertoire,
+    dans un thread : le commit n'attend pas le proxy.
+    """
+
+    def __init__(self, purge_url='', purge_dir='', key_header='Surrogate-Key', timeout=2.0):
+        self.purge_url = purge_url.rstrip('/')
+        self.purge_dir = purge_dir
+        self.key_header = key_header
+        self.timeout = timeout
+        self.counters = Counter()  # Compteurs du processus : keys, urls, errors
+        # Thread créé à la première purge, donc après le fork des workers gunicorn (preload_app)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='proxy-purge')
+        self._http = None
+        self._lock = threading.Lock()
+
+    def purge(self, keys, urls):
+        """Purge en arrière-plan des clés et des URLs (chemins) données"""
+        if keys or urls:
+            return self._executor.submit(self._purge, list(keys), list(urls))
+        return None
+
+    def _purge(self, keys, urls):
+        try:
+            if self.purge_dir:
+                self._write_purge_file(keys, urls)
+            if self.purge_url:
+                self._send_purges(keys, urls)
+            with self._lock:
+                self.counters['keys'] += len(keys)
+                self.counters['urls'] += len(urls)
+            logger.info("Purge du proxy: clés %s, %s URL(s)", ' '.join(keys) or '-', len(urls))
+        except Exception as e:
+            with self._lock:
+                self.counters['errors'] += 1
+            logger.warning("Purge du proxy impossible: %s", e)
+
+    def _session(self):
+        if self._http is None:
+            import requests
+            self._http = requests.Session()
+        return self._http
+
+    def _send_purges(self, keys, urls):
+        http = self._session()
+        if keys:
+            response = http.request('PURGE', f"{self.purge_url}/", headers={self.key_header: ' '.join(keys)},
+                                    timeout=self.timeout)
+            response.raise_for_status()
+        for url in urls:
+            response = http.request('PURGE', f"{self.purge_url}{url}", timeout=self.timeout)
+            if response.status_code != 404:  # Absente du cache : rien à purger
+                response.raise_for_status()
+
+    def _write_purge_file(self, keys, urls):
+        """Fichier écrit sous un nom temporaire puis renommé : le proxy ne lit jamais un fichier partiel"""
+        os.makedirs(self.purge_dir, exist_ok=True)
+        lines = [f"key {key}\n" for key in keys] + [f"url {url}\n" for url in urls]
+        fd, tmp_path = tempfile.mkstemp(dir=self.purge_dir, prefix='.purge-')
+        with os.fdopen(fd, 'w') as f:
+            f.writelines(lines)
+        os.replace(tmp_path, os.path.join(self.purge_dir, f"{time.time_ns()}-{os.getpid()}.purge"))
@@ -0,0 +1,249 @@
+"""
+Blueprint 'public' : pages du site, demande de réservation et flux iCalendar.
+"""
+import logging
+import secrets
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, stream_with_context
+
+from db_routing import replica_reads
+from extensions import db
+from image_utils import get_image_attrs
+from models import Leaderboard, Reservation, ReservationPending, WallOfShame, get_data_version
+from proxy_cache import surrogate_keys
+from surf_spots import CHEZ_MEME_COORDS, SURF_SPOTS
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('public', __name__)
+
+@bp.route('/robots.txt')
+def robots_txt():
+    """Sert le fichier robots.txt pour empêcher l'indexation des images du wall of shame"""
+    return current_app.send_static_file('robots.txt')
+
+@bp.route('/')
+@surrogate_keys('photos')
+def index():
+    # Les photos sont affichées à partir de /gallery.json (static/js/gallery.js) : aucune requête ici
+    return render_template('index.html')
+
+@bp.route('/gallery.json')
+@replica_reads
+@surrogate_keys('photos')
+def gallery_json():
+    """Manifeste de la galerie (gallery_manifest.py), recalculé seulement après un changement des photos"""
+    body, etag = current_app.extensions['gallery_manifest'].get()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response.make_conditional(request)
+
+@bp.route('/calendrier')
+@replica_reads
+@surrogate_keys('reservations')
+def calendrier():
+    # Récupérer les réservations approuvées pour le calendrier
+    approved_reservations = Reservation.query.filter_by(status='approved').all()
+    
+    # Créer un dictionnaire pour faciliter l'affichage
+    reservations_dict = {}
+    for res in approved_reservations:
+        current_date = res.start_date
+        while current_date <= res.end_date:
+            reservations_dict[str(current_date)] = {
+                'guest_name': res.guest_name
+            }
+            current_date += timedelta(days=1)
+    
+    return render_template('calendrier.html', reservations=reservations_dict)
+
+@bp.route('/appartement')
+def appartement():
+    return render_template('appartement.html')
+
+@bp.route('/activites')
+def activites():
+    # Catalogue des spots chargé une seule fois (voir surf_spots.py)
+    return render_template('activites.html', surf_spots=SURF_SPOTS, chez_meme=CHEZ_MEME_COORDS)
+
+@bp.route('/wall-of-shame')
+@replica_reads
+@surrogate_keys('wall-of-shame')
+def wall_of_shame():
+    wall_entries = WallOfShame.query.order_by(WallOfShame.display_order, WallOfShame.created_at.desc()).all()
+    return render_template('wall_of_shame.html', wall_entries=wall_entries, get_image_attrs=get_image_attrs)
+
+@bp.route('/leaderboard')
+@replica_reads
+@surrogate_keys('leaderboard')
+def leaderboard():
+    leaders = Leaderboard.query.order_by(Leaderboard.rank_position, Leaderboard.visit_count.desc()).all()
+    return render_template('leaderboard.html', leaders=leaders, get_image_attrs=get_image_attrs)
+
+@bp.route('/reserver', methods=['GET', 'POST'])
+def reserver():
+    if request.method == 'POST':
+        # Limiteur vérifié avant toute requête ORM : un flood ne touche pas la table des demandes
+        if current_app.config['RATE_LIMIT_ENABLED']:
+            allowed, retry_after = current_app.extensions['reservation_limiter'].check(request.remote_addr)
+            if not allowed:
+                logger.warning("Demande de réservation refusée par le limiteur (IP: %s)", request.remote_addr)
+                response = jsonify({'success': False,
+                                    'message': 'Trop de demandes envoyées, réessayez plus tard.'})
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+        
+        # Vérification hCaptcha lancée en arrière-plan pendant la validation et la recherche de conflits
+        hcaptcha_verifier = current_app.extensions['hcaptcha_verifier']
+        captcha_check = hcaptcha_verifier.verify_async(request.form.get('h-captcha-response'), request.remote_addr)
+        
+        try:
+            # Créer une nouvelle réservation en attente
+            start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
+            
+            # Vérifier que les dates sont valides
+            if start_date >= end_date:
+                return jsonify({'success': False, 'message': 'Le jour de départ doit être après le jour d\'arrivée !'})
+            
+            if start_date < date.today():
+                return jsonify({'success': False, 'message': 'Impossible de réserver dans le passé !'})
+            
+            # Vérifier les conflits avec les réservations approuvées
+            conflicting = Reservation.query.filter(
+                Reservation.status == 'approved',
+                Reservation.start_date < end_date,
+                Reservation.end_date > start_date
+            ).first()
+            
+            if conflicting:
+                return jsonify({'success': False, 'message': f'Ces dates sont déjà réservées par {conflicting.guest_name} !'})
+            
+            if not captcha_check.result():
+                return jsonify({'success': False, 'message': 'Vérification anti-robot échouée, veuillez réessayer.'})
+            
+            # Récupérer l'IP et le user agent pour la sécurité
+            ip_address = request.remote_addr
+            user_agent = request.headers.get('User-Agent', 'Unknown')
+            
+            # Créer la réservation en attente
+            pending_reservation = ReservationPending(
+                start_date=start_date,
+                end_date=end_date,
+                guest_name=request.form['guest_name'],
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+            
+            db.session.add(pending_reservation)
+            db.session.commit()
+            
+            logger.info("Nouvelle réservation en attente créée par %s (IP: %s)", request.form['guest_name'], ip_address)
+            return jsonify({'success': True, 'message': 'Votre demande a bien été envoyée pour approbation.'})
+                
+        except Exception as e:
+            logger.error("Erreur lors de la réservation: %s", e)
+            return jsonify({'success': False, 'message': f'Erreur: {str(e)}'})
+    
+    # Récupérer les paramètres pour pré-remplir le formulaire
+    prefilled_data = {
+        'guest_name': request.args.get('guest_name', ''),
+        'start_date': request.args.get('start_date', ''),
+        'end_date': request.args.get('end_date', '')
+    }
+    
+    return render_template('reserver.html', prefilled_data=prefilled_data,
+                           hcaptcha_site_key=current_app.config['HCAPTCHA_SITE_KEY'])
+
+# Flux iCalendar des réservations validées
+def ics_escape(value):
+    """Échappe un texte pour une propriété iCalendar (RFC 5545 §3.3.11)"""
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def ics_line(content):
+    """Plie une ligne iCalendar à 75 octets et ajoute CRLF"""
+    encoded = content.encode('utf-8')
+    if len(encoded) <= 75:
+        return content + '\r\n'
+    parts, current, size = [], '', 0
+    for char in content:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > (75 if not parts else 74):
+            parts.append(current)
+            current, size = '', 0
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+def reservation_to_vevent(reservation_id, start_date, end_date, guest_name, created_at):
+    """
+    VEVENT journée entière. DTEND (exclusif) est le jour de départ : séjour [arrivée, départ)
+    comme dans reserver() et l'import ICS (reservation_import.parse_ics), qui relit ce flux sans décalage
+    """
+    stamp = (created_at or datetime.utcnow()).strftime('%Y%m%dT%H%M%SZ')
+    return ''.join([
+        ics_line('BEGIN:VEVENT'),
+        ics_line(f'UID:reservation-{reservation_id}@chez-meme'),
+        ics_line(f'DTSTAMP:{stamp}'),
+        ics_line(f"DTSTART;VALUE=DATE:{start_date.strftime('%Y%m%d')}"),
+        ics_line(f"DTEND;VALUE=DATE:{end_date.strftime('%Y%m%d')}"),
+        ics_line(f'SUMMARY:{ics_escape(guest_name)}'),
+        ics_line('TRANSP:OPAQUE'),
+        ics_line('END:VEVENT'),
+    ])
+
+@bp.route('/calendar.ics')
+def calendar_feed():
+    """
+    Flux iCalendar des réservations validées pour les applications de calendrier.
+    Accès par token (CALENDAR_FEED_TOKEN), fenêtre from/to optionnelle (YYYY-MM-DD),
+    ETag basé sur la version des réservations : les interrogations répétées reçoivent un 304.
+    """
+    expected_token = current_app.config['CALENDAR_FEED_TOKEN']
+    if not expected_token or not secrets.compare_digest(request.args.get('token', ''), expected_token):
+        return '', 404
+    
+    try:
+        date_from = request.args.get('from')
+        date_from = (datetime.strptime(date_from, '%Y-%m-%d').date() if date_from
+                     else date.today() - timedelta(days=current_app.config['CALENDAR_FEED_PAST_DAYS']))
+        date_to = request.args.get('to')
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    except ValueError:
+        return 'Date invalide', 400
+    
+    etag = f"reservations-{get_data_version('reservation')}-{date_from.isoformat()}-{date_to.isoformat() if date_to else ''}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, max-age=300'
+        return response
+    
+    query = db.session.query(
+        Reservation.id, Reservation.start_date, Reservation.end_date, Reservation.guest_name, Reservation.created_at
+    ).filter(Reservation.status == 'approved', Reservation.end_date >= date_from)
+    if date_to:
+        query = query.filter(Reservation.start_date <= date_to)
+    # Curseur côté serveur : les lignes sont lues par lots pendant l'envoi
+    query = query.order_by(Reservation.start_date).execution_options(yield_per=200)
+    
+    def generate():
+        yield ''.join([
+            ics_line('BEGIN:VCALENDAR'),
+            ics_line('VERSION:2.0'),
+            ics_line('PRODID:-//Chez Meme//Reservations//FR'),
+            ics_line('CALSCALE:GREGORIAN'),
+            ics_line('X-WR-CALNAME:Chez Mémé'),
+        ])
+        for row in query:
+            yield reservation_to_vevent(*row)
+        yield ics_line('END:VCALENDAR')
+    
+    response = Response(stream_with_context(generate()), mimetype='text/calendar')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=300'
+    response.headers['X-Robots-Tag'] = 'noindex, nofollow'
+    return response
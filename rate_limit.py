@@ -0,0 +1,194 @@
+"""
+Limitation de débit par seau à jetons (token bucket), par IP et par sous-réseau.
+
+Chaque clé (ip:..., net:...) possède un seau de `capacity` jetons qui se
+remplit de `refill_per_second` jetons par seconde ; une requête consomme un
+jeton. L'état d'un seau tient dans une ligne : la vérification est une seule
+requête INSERT ... ON CONFLICT DO UPDATE ... RETURNING, en temps constant et
+atomique entre les workers (SQLite >= 3.35 ou PostgreSQL).
+
+MemoryBucketStore est l'équivalent en mémoire (un seul processus : tests,
+développement local).
+"""
+import ipaddress
+import logging
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import Float, case, literal
+
+logger = logging.getLogger(__name__)
+
+
+def subnet_key(ip_address):
+    """Sous-réseau d'une adresse : /24 en IPv4, /64 en IPv6 (None si l'adresse est invalide)"""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class DatabaseBucketStore:
+    """
+    Seaux stockés dans une table (key, tokens, updated_at, allowed, rejected).
+    get_engine : fonction retournant le moteur SQLAlchemy (résolu à l'usage, db.engine
+    n'étant disponible que dans un contexte d'application Flask).
+    """
+
+    def __init__(self, get_engine, table):
+        self.get_engine = get_engine
+        self.table = table
+
+    @property
+    def engine(self):
+        return self.get_engine()
+
+    def _insert(self):
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(self.table)
+
+    def consume(self, key, capacity, refill_per_second, now):
+        """Consomme un jeton si possible ; retourne (autorisé, jetons restants)"""
+        t = self.table
+        now_value = literal(now, Float)
+        # Les expressions du SET lisent les valeurs avant mise à jour
+        refilled = t.c.tokens + (now_value - t.c.updated_at) * refill_per_second
+        refilled = case((refilled > capacity, literal(float(capacity), Float)), else_=refilled)
+        allowed = refilled >= 1
+
+        stmt = self._insert().values(key=key, tokens=capacity - 1, updated_at=now, allowed=True, rejected=0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.key],
+            set_={
+                'tokens': case((allowed, refilled - 1), else_=refilled),
+                'updated_at': now_value,
+                'allowed': allowed,
+                'rejected': t.c.rejected + case((allowed, 0), else_=1),
+            },
+        ).returning(t.c.allowed, t.c.tokens)
+
+        with self.engine.begin() as connection:
+            row = connection.execute(stmt).one()
+        return bool(row.allowed), row.tokens
+
+    def refund(self, key, capacity):
+        """Rend le jeton consommé par une requête finalement refusée par un autre seau"""
+        t = self.table
+        refunded = case((t.c.tokens + 1 > capacity, literal(float(capacity), Float)), else_=t.c.tokens + 1)
+        with self.engine.begin() as connection:
+            connection.execute(t.update().where(t.c.key == key).values(tokens=refunded))
+
+    def purge(self, older_than):
+        """Supprime les seaux inactifs (pleins depuis longtemps)"""
+        with self.engine.begin() as connection:
+            connection.execute(self.table.delete().where(self.table.c.updated_at < older_than))
+
+    def top_rejected(self, limit=10):
+        t = self.table
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                t.select().where(t.c.rejected > 0).order_by(t.c.rejected.desc()).limit(limit)
+            ).all()
+        return [{'key': row.key, 'rejected': row.rejected, 'tokens': round(row.tokens, 2)} for row in rows]
+
+
+class MemoryBucketStore:
+    """Seaux en mémoire du processus"""
+
+    def __init__(self):
+        self._buckets = {}  # clé -> [jetons, horodatage, rejets]
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_per_second, now):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = [capacity - 1, now, 0]
+                return True, capacity - 1
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, bucket[0]
+            bucket[2] += 1
+            return False, bucket[0]
+
+    def refund(self, key, capacity):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(capacity, bucket[0] + 1)
+
+    def purge(self, older_than):
+        with self._lock:
+            for key in [key for key, bucket in self._buckets.items() if bucket[1] < older_than]:
+                del self._buckets[key]
+
+    def top_rejected(self, limit=10):
+        with self._lock:
+            rows = sorted(((bucket[2], key, bucket[0]) for key, bucket in self._buckets.items() if bucket[2]),
+                          reverse=True)[:limit]
+        return [{'key': key, 'rejected': rejected, 'tokens': round(tokens, 2)} for rejected, key, tokens in rows]
+
+
+class RateLimiter:
+    """
+    Vérifie les seaux IP puis sous-réseau d'un client.
+    rules : {'ip': (capacité, jetons/seconde), 'net': (capacité, jetons/seconde)}
+    """
+
+    def __init__(self, store, rules, name='default'):
+        self.store = store
+        self.rules = rules
+        self.name = name
+        self.counters = Counter()  # Compteurs du processus : allowed, rejected_ip, rejected_net, errors
+        self._lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def check(self, ip_address):
+        """
+        Retourne (autorisé, secondes avant le prochain jeton).
+        Une requête refusée par le seau du sous-réseau rend le jeton pris au seau de l'IP.
+        En cas d'erreur du stockage, la requête est autorisée (fail open).
+        """
+        keys = [('ip', ip_address or 'unknown')]
+        subnet = subnet_key(ip_address)
+        if subnet:
+            keys.append(('net', subnet))
+
+        now = time.time()
+        consumed = []  # (clé, capacité) des seaux qui ont déjà donné un jeton
+        for scope, value in keys:
+            if scope not in self.rules:
+                continue
+            capacity, refill_per_second = self.rules[scope]
+            key = f"{self.name}:{scope}:{value}"
+            try:
+                allowed, tokens = self.store.consume(key, capacity, refill_per_second, now)
+                if not allowed:
+                    for consumed_key, consumed_capacity in consumed:
+                        self.store.refund(consumed_key, consumed_capacity)
+            except Exception as e:
+                self._count('errors')
+                logger.warning("Limiteur %s indisponible, requête autorisée: %s", self.name, e)
+                return True, 0
+            if not allowed:
+                self._count(f'rejected_{scope}')
+                return False, max(1, int((1 - tokens) / refill_per_second) + 1)
+            consumed.append((key, capacity))
+        self._count('allowed')
+        return True, 0
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {'name': self.name, 'counters': counters, 'top_rejected': self.store.top_rejected()}
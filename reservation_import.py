@@ -0,0 +1,203 @@
+"""
+Import en masse de réservations (CSV ou iCalendar).
+
+Le fichier est analysé en une seule passe, puis les conflits sont détectés
+en un seul balayage des intervalles triés par arrivée, avec les réservations
+approuvées existantes (prioritaires) et entre lignes du fichier.
+
+Ce module ne dépend pas de Flask : il est utilisé par la route
+/admin/import et par le script import_reservations.py.
+"""
+import csv
+import io
+from datetime import datetime
+
+VALID_STATUSES = {'approved', 'rejected'}
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+
+# Colonnes CSV acceptées (anglais ou français)
+CSV_COLUMNS = {
+    'guest_name': ('guest_name', 'nom', 'name'),
+    'start_date': ('start_date', 'arrivee', 'arrivée', 'debut', 'début'),
+    'end_date': ('end_date', 'depart', 'départ', 'fin'),
+    'status': ('status', 'statut'),
+}
+
+
+def parse_date(value):
+    """Analyse une date au format YYYY-MM-DD ou DD/MM/YYYY"""
+    value = (value or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Date invalide: '{value}'")
+
+
+def _build_row(line, guest_name, start_value, end_value, status):
+    """Valide une ligne et retourne (ligne, erreur)"""
+    guest_name = (guest_name or '').strip()
+    status = (status or 'approved').strip().lower()
+    try:
+        start_date = parse_date(start_value)
+        end_date = parse_date(end_value)
+    except ValueError as e:
+        return None, {'line': line, 'guest_name': guest_name, 'reason': str(e)}
+
+    if not guest_name:
+        return None, {'line': line, 'guest_name': guest_name, 'reason': 'Nom manquant'}
+    if start_date >= end_date:
+        return None, {'line': line, 'guest_name': guest_name,
+                      'reason': "Le jour de départ doit être après le jour d'arrivée"}
+    if status not in VALID_STATUSES:
+        return None, {'line': line, 'guest_name': guest_name, 'reason': f"Statut invalide: '{status}'"}
+
+    return {
+        'line': line,
+        'guest_name': guest_name[:100],
+        'start_date': start_date,
+        'end_date': end_date,
+        'status': status,
+    }, None
+
+
+def parse_csv(content):
+    """
+    Analyse un CSV avec en-tête (guest_name, start_date, end_date, status optionnel).
+    Le séparateur (virgule ou point-virgule) est détecté automatiquement.
+    Retourne (lignes valides, erreurs).
+    """
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(content), dialect=dialect)
+
+    header = {(name or '').strip().lower(): name for name in (reader.fieldnames or [])}
+    columns = {}
+    for key, aliases in CSV_COLUMNS.items():
+        columns[key] = next((header[alias] for alias in aliases if alias in header), None)
+    missing = [key for key in ('guest_name', 'start_date', 'end_date') if not columns[key]]
+    if missing:
+        return [], [{'line': 1, 'guest_name': '', 'reason': f"Colonnes manquantes: {', '.join(missing)}"}]
+
+    rows, errors = [], []
+    for record in reader:
+        row, error = _build_row(
+            reader.line_num,
+            record.get(columns['guest_name']),
+            record.get(columns['start_date']),
+            record.get(columns['end_date']),
+            record.get(columns['status']) if columns['status'] else None,
+        )
+        if error:
+            errors.append(error)
+        else:
+            rows.append(row)
+    return rows, errors
+
+
+def _unfold_ics_lines(content):
+    """Déplie les lignes iCalendar (RFC 5545 §3.1) en gardant le numéro de ligne d'origine"""
+    unfolded = []
+    for number, line in enumerate(content.splitlines(), start=1):
+        if line[:1] in (' ', '\t') and unfolded:
+            unfolded[-1] = (unfolded[-1][0], unfolded[-1][1] + line[1:])
+        elif line:
+            unfolded.append((number, line))
+    return unfolded
+
+
+def _unescape_ics_text(value):
+    return (value.replace('\\n', ' ').replace('\\N', ' ')
+            .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def _ics_date(value):
+    """DTSTART/DTEND : 20250101 ou 20250101T140000[Z] -> date"""
+    return datetime.strptime(value.strip()[:8], '%Y%m%d').strftime('%Y-%m-%d')
+
+
+def parse_ics(content):
+    """
+    Analyse les VEVENT d'un fichier iCalendar (SUMMARY, DTSTART, DTEND, STATUS).
+    Un événement annulé (STATUS:CANCELLED) est importé comme réservation rejetée.
+    Retourne (lignes valides, erreurs).
+    """
+    rows, errors = [], []
+    event = None
+    for number, line in _unfold_ics_lines(content):
+        name, _, value = line.partition(':')
+        prop = name.split(';', 1)[0].upper()
+
+        if prop == 'BEGIN' and value.strip().upper() == 'VEVENT':
+            event = {'line': number}
+        elif prop == 'END' and value.strip().upper() == 'VEVENT' and event is not None:
+            try:
+                start_value = _ics_date(event.get('DTSTART', ''))
+                end_value = _ics_date(event.get('DTEND', ''))
+            except ValueError:
+                errors.append({'line': event['line'], 'guest_name': event.get('SUMMARY', ''),
+                               'reason': 'DTSTART/DTEND invalide'})
+            else:
+                status = 'rejected' if event.get('STATUS', '').upper() == 'CANCELLED' else 'approved'
+                row, error = _build_row(event['line'], event.get('SUMMARY'), start_value, end_value, status)
+                if error:
+                    errors.append(error)
+                else:
+                    rows.append(row)
+            event = None
+        elif event is not None and prop in ('SUMMARY', 'DTSTART', 'DTEND', 'STATUS'):
+            event[prop] = _unescape_ics_text(value) if prop == 'SUMMARY' else value
+    return rows, errors
+
+
+def parse_import_file(filename, content):
+    """Choisit l'analyseur selon l'extension ou le contenu du fichier"""
+    if filename.lower().endswith(('.ics', '.ical')) or content.lstrip().startswith('BEGIN:VCALENDAR'):
+        return parse_ics(content)
+    return parse_csv(content)
+
+
+def resolve_conflicts(rows, existing):
+    """
+    Détecte les chevauchements avec les réservations existantes et entre lignes du fichier.
+
+    rows : lignes importées (dicts avec start_date, end_date, status, line)
+    existing : tuples (start_date, end_date, guest_name) des réservations approuvées
+
+    Les intervalles sont semi-ouverts [arrivée, départ) comme dans reserver().
+    Un seul balayage des lignes triées par arrivée, fusionné avec les réservations
+    existantes triées de la même façon :
+    - les réservations existantes sont prioritaires : une ligne qui en chevauche une est
+      rejetée et ne bloque aucune autre ligne ;
+    - entre lignes du fichier, la première arrivée est retenue (ordre du fichier à
+      arrivée égale) et celles qui la chevauchent sont rejetées.
+    Retourne (lignes acceptées dans l'ordre du fichier, erreurs).
+    """
+    existing = sorted(existing, key=lambda item: item[0])
+    candidates = sorted((row for row in rows if row['status'] == 'approved'), key=lambda row: row['start_date'])
+    rejected = {}
+    next_existing = 0
+    latest_existing = None  # Réservation existante déjà passée qui finit le plus tard
+    latest_kept = None  # Dernière ligne retenue : les retenues sont disjointes, c'est elle qui finit le plus tard
+    for row in candidates:
+        start, end = row['start_date'], row['end_date']
+        while next_existing < len(existing) and existing[next_existing][0] < start:
+            if latest_existing is None or existing[next_existing][1] > latest_existing[1]:
+                latest_existing = existing[next_existing]
+            next_existing += 1
+        if latest_existing is not None and latest_existing[1] > start:
+            rejected[id(row)] = f"Conflit avec {latest_existing[2]}"
+        elif next_existing < len(existing) and existing[next_existing][0] < end:
+            rejected[id(row)] = f"Conflit avec {existing[next_existing][2]}"
+        elif latest_kept is not None and latest_kept['end_date'] > start:
+            rejected[id(row)] = f"Conflit avec ligne {latest_kept['line']}"
+        else:
+            latest_kept = row
+
+    accepted = [row for row in rows if id(row) not in rejected]
+    errors = [{'line': row['line'], 'guest_name': row['guest_name'], 'reason': rejected[id(row)]}
+              for row in rows if id(row) in rejected]
+    return accepted, errors
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script pour restaurer une sauvegarde créée par /admin/export/archive.zip.
+
+Usage:
+    python restore_backup.py chez-meme-backup-2025-01-01.zip
+    python restore_backup.py chez-meme-backup-2025-01-01.zip --replace
+
+Les lignes sont insérées par lots (INSERT groupés) et les images sont relues
+une par une depuis l'archive. Sans --replace, les tables doivent être vides.
+"""
+import argparse
+import json
+import sys
+import zipfile
+from datetime import date, datetime
+
+from app import create_app, db, ensure_pending_search_index
+from admin_routes import EXPORT_DATASETS, IMAGE_DATASETS
+from data_export import image_entry_name
+
+BATCH_SIZE = 500
+
+
+def convert_row(model, row):
+    """Reconvertit les dates ISO du JSON selon le type des colonnes"""
+    for column in model.__table__.columns:
+        value = row.get(column.name)
+        if value is None:
+            continue
+        if isinstance(column.type, db.DateTime):
+            row[column.name] = datetime.fromisoformat(value)
+        elif isinstance(column.type, db.Date):
+            row[column.name] = date.fromisoformat(value)
+    return row
+
+
+def restore_dataset(archive, dataset):
+    """Insère un dataset par lots ; retourne le nombre de lignes restaurées"""
+    model = EXPORT_DATASETS[dataset][0]
+    entry = f'data/{dataset}.jsonl'
+    if entry not in archive.namelist():
+        print(f"  [WARNING] {entry} absent de l'archive")
+        return 0
+
+    names = set(archive.namelist())
+    count = 0
+    batch = []
+    with archive.open(entry) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = convert_row(model, json.loads(line))
+            if dataset in IMAGE_DATASETS:
+                image_name = image_entry_name(dataset, row['id'], row.get('mime_type'))
+                if image_name in names:
+                    row['data'] = archive.read(image_name)
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                db.session.execute(db.insert(model), batch)
+                count += len(batch)
+                batch = []
+    if batch:
+        db.session.execute(db.insert(model), batch)
+        count += len(batch)
+    return count
+
+
+def reset_sequences():
+    """PostgreSQL : recaler les séquences d'id après insertion d'ids explicites"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model, _ in EXPORT_DATASETS.values():
+        table_name = model.__table__.name
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table_name}\"', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM \"{table_name}\"), 1))"
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restaurer une sauvegarde Chez Mémé")
+    parser.add_argument('archive', help="Fichier ZIP produit par /admin/export/archive.zip")
+    parser.add_argument('--replace', action='store_true', help="Vider les tables avant la restauration")
+    args = parser.parse_args()
+    app = create_app()
+
+    with app.app_context(), zipfile.ZipFile(args.archive) as archive:
+        db.create_all()
+        manifest = json.loads(archive.read('manifest.json'))
+        print(f"Sauvegarde du {manifest['created_at']} (version {manifest['app_version']})")
+
+        try:
+            # Entrées avant image_assets (clé étrangère image_asset_id)
+            for dataset, (model, _) in reversed(EXPORT_DATASETS.items()):
+                if args.replace:
+                    model.query.delete()
+                elif model.query.first() is not None:
+                    print(f"[ERROR] La table {model.__table__.name} n'est pas vide (utilisez --replace)")
+                    db.session.rollback()
+                    return 1
+
+            for dataset in EXPORT_DATASETS:
+                count = restore_dataset(archive, dataset)
+                print(f"  {dataset}: {count} ligne(s) restaurée(s)")
+
+            reset_sequences()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] Restauration annulée: {e}")
+            return 1
+
+        # Les insertions groupées ne passent pas par les événements ORM : remplir search_text
+        ensure_pending_search_index()
+        print("Restauration terminée !")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
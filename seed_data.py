@@ -4,7 +4,8 @@ Usage: python seed_data.py
 """
 import os
 import sys
-from app import app, db, Photo, Activity, User
+from app import create_app, db, Photo, Activity, User
+app = create_app()
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
@@ -0,0 +1,248 @@
+"""
+Sessions côté serveur : le cookie ne porte qu'un identifiant aléatoire, les données
+(is_admin, messages flash...) sont dans un magasin partagé par les workers.
+
+- Chargement paresseux : le magasin n'est lu qu'au premier accès à la session, et
+  jamais pour un visiteur sans cookie. Une requête anonyme ne lit ni n'écrit rien,
+  et ne reçoit pas de Set-Cookie : les pages publiques restent cacheables par un proxy.
+- Écriture seulement si la session a changé (ou pour prolonger une session à mi-vie).
+- Session vidée (déconnexion, dernier message flash lu) : ligne supprimée et cookie
+  effacé, le visiteur redevient anonyme.
+- Pas de signature HMAC : l'identifiant (256 bits) est imprévisible, et seul son
+  SHA-256 est stocké (une copie de la base ne donne pas les cookies des admins).
+
+DatabaseSessionStore (table server_session, SQLite ou PostgreSQL) est partagé entre
+workers ; MemorySessionStore est l'équivalent en mémoire (un seul processus : tests,
+développement local). SESSION_STORE=cookie garde la session signée de Flask.
+"""
+import hashlib
+import logging
+import secrets
+import threading
+import time
+
+from flask import session
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+
+logger = logging.getLogger(__name__)
+
+
+def session_key(sid):
+    """Clé de stockage d'un identifiant de session"""
+    return hashlib.sha256(sid.encode('utf-8')).hexdigest()
+
+
+class DatabaseSessionStore:
+    """
+    Sessions stockées dans une table (key, data, expires_at).
+    get_engine : fonction retournant le moteur SQLAlchemy (résolu à l'usage, db.engine
+    n'étant disponible que dans un contexte d'application Flask).
+    """
+
+    def __init__(self, get_engine, table):
+        self.get_engine = get_engine
+        self.table = table
+
+    @property
+    def engine(self):
+        return self.get_engine()
+
+    def _insert(self):
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(self.table)
+
+    def load(self, key, now):
+        """(données sérialisées, expiration) d'une session non expirée, ou None"""
+        t = self.table
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                t.select().where(t.c.key == key, t.c.expires_at > now)
+            ).first()
+        return (row.data, row.expires_at) if row else None
+
+    def save(self, key, data, expires_at):
+        stmt = self._insert().values(key=key, data=data, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(index_elements=[self.table.c.key],
+                                          set_={'data': data, 'expires_at': expires_at})
+        with self.engine.begin() as connection:
+            connection.execute(stmt)
+
+    def delete(self, key):
+        with self.engine.begin() as connection:
+            connection.execute(self.table.delete().where(self.table.c.key == key))
+
+    def purge(self, now):
+        """Supprime les sessions expirées"""
+        with self.engine.begin() as connection:
+            connection.execute(self.table.delete().where(self.table.c.expires_at <= now))
+
+
+class MemorySessionStore:
+    """Sessions en mémoire du processus"""
+
+    def __init__(self):
+        self._sessions = {}  # clé -> (données, expiration)
+        self._lock = threading.Lock()
+
+    def load(self, key, now):
+        with self._lock:
+            entry = self._sessions.get(key)
+        return entry if entry and entry[1] > now else None
+
+    def save(self, key, data, expires_at):
+        with self._lock:
+            self._sessions[key] = (data, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def purge(self, now):
+        with self._lock:
+            for key in [key for key, entry in self._sessions.items() if entry[1] <= now]:
+                del self._sessions[key]
+
+
+def _reads(method):
+    def wrapper(self, *args, **kwargs):
+        self.accessed = True
+        self.load()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _writes(method):
+    def wrapper(self, *args, **kwargs):
+        self.accessed = True
+        self.load()
+        self.modified = True
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class LazySession(dict, SessionMixin):
+    """
+    Session dont les données ne sont lues dans le magasin qu'au premier accès.
+    sid : identifiant du cookie (None pour un visiteur sans cookie : rien à lire).
+    """
+
+    def __init__(self, sid=None, store=None):
+        super().__init__()
+        self.sid = sid
+        self.store = store
+        self.loaded = sid is None
+        self.found = False  # Le cookie désignait une session valide
+        self.expires_at = None
+        self.regenerated = False
+        self.modified = False
+        self.accessed = False
+
+    @property
+    def new(self):
+        return self.sid is None
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            entry = self.store.load(session_key(self.sid), time.time())
+        except Exception as e:
+            logger.warning("Lecture de la session impossible: %s", e)
+            entry = None
+        if entry is None:
+            return
+        data, self.expires_at = entry
+        try:
+            dict.update(self, session_json_serializer.loads(data))
+            self.found = True
+        except Exception as e:
+            logger.warning("Session illisible ignorée: %s", e)
+
+    def regenerate(self):
+        """Nouvel identifiant au prochain enregistrement (connexion : pas de fixation de session)"""
+        self.load()
+        self.regenerated = True
+        self.modified = True
+
+    __getitem__ = _reads(dict.__getitem__)
+    __contains__ = _reads(dict.__contains__)
+    __iter__ = _reads(dict.__iter__)
+    __len__ = _reads(dict.__len__)
+    get = _reads(dict.get)
+    keys = _reads(dict.keys)
+    values = _reads(dict.values)
+    items = _reads(dict.items)
+    copy = _reads(dict.copy)
+
+    __setitem__ = _writes(dict.__setitem__)
+    __delitem__ = _writes(dict.__delitem__)
+    clear = _writes(dict.clear)
+    pop = _writes(dict.pop)
+    popitem = _writes(dict.popitem)
+    setdefault = _writes(dict.setdefault)
+    update = _writes(dict.update)
+
+    def __repr__(self):
+        return f"<LazySession loaded={self.loaded} {dict.__repr__(self) if self.loaded else ''}>"
+
+
+class ServerSessionInterface(SessionInterface):
+    """Sessions Flask stockées dans un DatabaseSessionStore ou un MemorySessionStore"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app)) or None
+        return LazySession(sid, self.store)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+        # Session jamais lue : rien à écrire (visiteur sans cookie, images, fichiers statiques)
+        if not session.accessed or not session.loaded:
+            return
+
+        now = time.time()
+        if not dict.__len__(session):
+            # Session vide : le visiteur redevient anonyme (cookie périmé ou d'un autre format compris)
+            if session.sid is not None and (session.modified or not session.found):
+                if session.found:
+                    self.store.delete(session_key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        # Session inchangée : prolongée seulement quand plus de la moitié de sa durée est écoulée
+        if not session.modified and session.found and session.expires_at - now > lifetime / 2:
+            return
+
+        sid = session.sid
+        if sid is None or not session.found or session.regenerated:
+            if session.found:
+                self.store.delete(session_key(sid))
+            sid = secrets.token_urlsafe(32)
+        self.store.save(session_key(sid), session_json_serializer.dumps(dict(session)), now + lifetime)
+
+        if sid != session.sid or (session.permanent and app.config['SESSION_REFRESH_EACH_REQUEST']):
+            response.set_cookie(name, sid, expires=self.get_expiration_time(app, session), httponly=httponly,
+                                domain=domain, path=path, secure=secure, samesite=samesite)
+
+
+def regenerate_session():
+    """À appeler à la connexion : nouvel identifiant de session (sans effet avec SESSION_STORE=cookie)"""
+    regenerate = getattr(session, 'regenerate', None)
+    if regenerate is not None:
+        regenerate()
@@ -0,0 +1,86 @@
+"""
+Index spatial en mémoire des spots de surf.
+
+Les spots sont répartis dans une grille de cellules de taille fixe (en
+degrés, à la manière d'un geohash) : une recherche dans un rayon ne
+parcourt que les cellules qui recoupent la zone au lieu du catalogue
+entier. Les candidats sont ensuite classés par distance à vol d'oiseau
+(haversine), avec les sinus/cosinus des spots précalculés à la construction.
+
+Ce module ne dépend pas de Flask : l'index est construit une fois au
+démarrage à partir de SURF_SPOTS.
+"""
+import heapq
+import math
+from collections import defaultdict
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Détour moyen de la route par rapport au vol d'oiseau sur la côte basque
+# (rapport médian distance OSRM / haversine du catalogue actuel : 1.45)
+ROAD_DETOUR_FACTOR = 1.45
+
+
+class SpotIndex:
+    def __init__(self, spots, cell_degrees=0.25):
+        self.spots = list(spots)
+        self.cell_degrees = cell_degrees
+        self._cells = defaultdict(list)
+        # (lat rad, cos lat, lng rad) précalculés pour chaque spot
+        self._points = []
+        for index, spot in enumerate(self.spots):
+            lat = math.radians(spot['lat'])
+            self._points.append((lat, math.cos(lat), math.radians(spot['lng'])))
+            self._cells[self._cell(spot['lat'], spot['lng'])].append(index)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lng / self.cell_degrees))
+
+    def _candidates(self, lat, lng, radius_km):
+        """Indices des spots des cellules qui recoupent le carré englobant du cercle"""
+        delta_lat = radius_km / KM_PER_DEGREE_LAT
+        cos_lat = max(math.cos(math.radians(lat)), 0.01)
+        delta_lng = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+        min_row, min_col = self._cell(lat - delta_lat, lng - delta_lng)
+        max_row, max_col = self._cell(lat + delta_lat, lng + delta_lng)
+
+        if (max_row - min_row + 1) * (max_col - min_col + 1) >= len(self._cells):
+            # Rayon plus large que la grille occupée : parcourir les cellules existantes
+            return [index for indices in self._cells.values() for index in indices]
+
+        candidates = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                candidates.extend(self._cells.get((row, col), ()))
+        return candidates
+
+    def distances(self, lat, lng, indices):
+        """Distances haversine (km) depuis (lat, lng) vers les spots donnés"""
+        lat1 = math.radians(lat)
+        cos_lat1 = math.cos(lat1)
+        lng1 = math.radians(lng)
+        result = []
+        for index in indices:
+            lat2, cos_lat2, lng2 = self._points[index]
+            a = (math.sin((lat2 - lat1) / 2) ** 2
+                 + cos_lat1 * cos_lat2 * math.sin((lng2 - lng1) / 2) ** 2)
+            result.append(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))))
+        return result
+
+    def nearby(self, lat, lng, radius_km, limit=10, predicate=None):
+        """
+        Spots à moins de radius_km de (lat, lng), du plus proche au plus éloigné.
+        predicate(spot, distance_km) permet d'écarter des spots (note, coût...).
+        Retourne une liste de (distance_km, spot).
+        """
+        indices = self._candidates(lat, lng, radius_km)
+        matches = []
+        for index, distance in zip(indices, self.distances(lat, lng, indices)):
+            if distance > radius_km:
+                continue
+            spot = self.spots[index]
+            if predicate is not None and not predicate(spot, distance):
+                continue
+            matches.append((distance, index))
+        return [(distance, self.spots[index]) for distance, index in heapq.nsmallest(limit, matches)]
@@ -255,6 +255,7 @@ class AdminDashboard {
 
     animateStatCard(card) {
         const numberElement = card.querySelector('.stat-info h3');
+        if (!numberElement) return;
         const number = parseInt(numberElement.textContent);
         
         if (!isNaN(number)) {
@@ -276,35 +277,77 @@ class AdminDashboard {
     }
 
     initAutoRefresh() {
-        // Actualisation automatique des données toutes les 30 secondes
-        setInterval(() => {
-            this.refreshData();
-        }, 30000);
-    }
-
-    refreshData() {
-        // Recharger la page pour avoir les dernières données
-        // En production, on ferait un appel AJAX
-        const refreshIndicator = document.createElement('div');
-        refreshIndicator.innerHTML = '<i class="fas fa-sync-alt fa-spin"></i> Actualisation...';
-        refreshIndicator.style.cssText = `
-            position: fixed;
-            top: 100px;
-            right: 20px;
-            background: var(--primary-color);
-            color: white;
-            padding: 0.5rem 1rem;
-            border-radius: 20px;
-            font-size: 0.9rem;
-            z-index: 1000;
-        `;
-        
-        document.body.appendChild(refreshIndicator);
-        
-        setTimeout(() => {
-            document.body.removeChild(refreshIndicator);
-            window.location.reload();
-        }, 1000);
+        // Les mises à jour arrivent par le flux /admin/events (voir AdminLiveUpdates) :
+        // plus de rechargement complet de la page toutes les 30 secondes
+        document.addEventListener('admin:change', (e) => this.refreshData(e.detail));
+    }
+
+    refreshData(change) {
+        // Mettre à jour le compteur de réservations en attente sans recharger la page
+        if (change.pending_count == null) return;
+        document.querySelectorAll('[data-pending-count]').forEach(element => {
+            element.textContent = change.pending_count;
+        });
+    }
+}
+
+// Mises à jour en direct de l'admin : flux Server-Sent Events, ou interrogation de
+// /admin/api/changes (workers sync, navigateur sans EventSource, flux inaccessible)
+class AdminLiveUpdates {
+    constructor(url, changesUrl, mode, pollSeconds) {
+        this.url = url;
+        this.changesUrl = changesUrl;
+        this.pollSeconds = pollSeconds || 15;
+        this.source = null;
+        this.failures = 0;
+        this.init(mode);
+    }
+
+    init(mode) {
+        if (mode === 'poll' || !window.EventSource) {
+            this.startPolling();
+            return;
+        }
+        // EventSource se reconnecte seul et renvoie Last-Event-ID : aucun événement perdu
+        this.source = new EventSource(this.url);
+        this.source.addEventListener('open', () => { this.failures = 0; });
+        this.source.addEventListener('change', (e) => {
+            this.lastId = Number(e.lastEventId) || this.lastId;
+            this.dispatch(JSON.parse(e.data));
+        });
+        this.source.addEventListener('error', () => {
+            // Plusieurs échecs d'affilée (proxy qui coupe le flux...) : passer à l'interrogation
+            this.failures += 1;
+            if (this.failures >= 3) {
+                this.source.close();
+                this.source = null;
+                this.startPolling();
+            }
+        });
+        // Fermer proprement la connexion quand l'onglet se ferme
+        window.addEventListener('beforeunload', () => this.source && this.source.close());
+    }
+
+    dispatch(change) {
+        document.dispatchEvent(new CustomEvent('admin:change', { detail: change }));
+    }
+
+    startPolling() {
+        if (!this.changesUrl || this.timer) return;
+        this.poll();
+        this.timer = setInterval(() => this.poll(), this.pollSeconds * 1000);
+    }
+
+    poll() {
+        const url = this.lastId == null ? this.changesUrl : `${this.changesUrl}?after=${this.lastId}`;
+        fetch(url, { credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) return;
+                (data.events || []).forEach(change => this.dispatch(change));
+                this.lastId = data.last_id;
+            })
+            .catch(error => console.error('Erreur lors de la récupération des changements:', error));
     }
 }
 
@@ -321,22 +364,17 @@ class AdminNotifications {
 
     bindEvents() {
         // Gestion des notifications en temps réel
-        this.initWebSocket();
-    }
-
-    initWebSocket() {
-        // Simulation de WebSocket pour les notifications en temps réel
-        // En production, on utiliserait une vraie connexion WebSocket
-        setInterval(() => {
-            this.simulateNewReservation();
-        }, 60000); // Toutes les minutes
+        this.initLiveNotifications();
     }
 
-    simulateNewReservation() {
-        // Simulation d'une nouvelle réservation (à supprimer en production)
-        if (Math.random() < 0.1) { // 10% de chance
-            this.showNewReservationNotification();
-        }
+    initLiveNotifications() {
+        // Nouvelle demande de réservation publiée par le flux /admin/events
+        document.addEventListener('admin:change', (e) => {
+            const change = e.detail;
+            if (change.table === 'reservation_pending' && change.action === 'insert') {
+                this.showNewReservationNotification();
+            }
+        });
     }
 
     showNewReservationNotification() {
@@ -421,8 +459,15 @@ class AdminNotifications {
 
 // Initialisation des composants admin
 document.addEventListener('DOMContentLoaded', () => {
+    const liveRoot = document.querySelector('[data-admin-events]');
+    if (liveRoot) {
+        new AdminLiveUpdates(liveRoot.getAttribute('data-admin-events'),
+                             liveRoot.getAttribute('data-admin-changes'),
+                             liveRoot.getAttribute('data-admin-events-mode'),
+                             Number(liveRoot.getAttribute('data-admin-poll-seconds')));
+        new AdminNotifications();
+    }
     if (document.querySelector('.admin-dashboard')) {
         new AdminDashboard();
-        new AdminNotifications();
     }
 });
@@ -0,0 +1,61 @@
+// Galerie de la page d'accueil, affichée à partir du manifeste /gallery.json (voir gallery_manifest.py)
+document.addEventListener('DOMContentLoaded', function() {
+    const grid = document.querySelector('.photos-grid[data-manifest]');
+
+    if (!grid) return;
+
+    fetch(grid.dataset.manifest)
+        .then(response => response.json())
+        .then(manifest => {
+            displayGallery(grid, manifest.photos || []);
+        })
+        .catch(error => {
+            console.error('Erreur lors du chargement de la galerie:', error);
+            displayGallery(grid, []);
+        });
+});
+
+function displayGallery(grid, photos) {
+    grid.textContent = '';
+
+    if (photos.length === 0) {
+        grid.innerHTML = `
+            <div class="no-photos-message">
+                <i class="fas fa-camera"></i>
+                <p>Photos à venir...</p>
+            </div>
+        `;
+        return;
+    }
+
+    photos.forEach(photo => {
+        const item = document.createElement('div');
+        item.className = 'photo-item';
+
+        // Mêmes attributs que image_utils.get_image_attrs : place réservée, aperçu flou, chargement différé
+        const img = document.createElement('img');
+        img.src = photo.src;
+        img.alt = photo.caption || 'Photo de la maison';
+        if (photo.width && photo.height) {
+            img.width = photo.width;
+            img.height = photo.height;
+        }
+        if (photo.placeholder) {
+            img.style.background = `center / cover no-repeat url(${photo.placeholder})`;
+        }
+        img.loading = 'lazy';
+        img.decoding = 'async';
+        item.appendChild(img);
+
+        if (photo.caption) {
+            const caption = document.createElement('div');
+            caption.className = 'photo-caption';
+            const text = document.createElement('p');
+            text.textContent = photo.caption;
+            caption.appendChild(text);
+            item.appendChild(caption);
+        }
+
+        grid.appendChild(item);
+    });
+}
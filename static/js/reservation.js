@@ -234,6 +234,10 @@ class ReservationForm {
                 this.loadAvailability();
                 // Reset du formulaire
                 form.reset();
+                // Un token hCaptcha ne sert qu'une fois (en cas d'erreur il reste valide côté serveur, en cache)
+                if (window.hcaptcha && form.querySelector('.h-captcha')) {
+                    window.hcaptcha.reset();
+                }
             } else {
                 window.ChezMemeUtils.showNotification(data.message || 'Erreur lors de l\'envoi de la réservation', 'error');
             }
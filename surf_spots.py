@@ -0,0 +1,231 @@
+"""
+Catalogue des spots de surf autour de Chez Mémé.
+
+Chargé une seule fois à l'import : la page /activites et l'API GeoJSON
+réutilisent les mêmes objets, et la représentation GeoJSON est
+précalculée (avec son ETag) au lieu d'être reconstruite à chaque requête.
+Les distances, temps et coûts de trajet viennent de la matrice précalculée
+(distance_matrix.json) : ajouter un spot ou une origine est un changement
+de données suivi de python calculate_distances.py.
+"""
+import hashlib
+import json
+
+from distance_matrix import coord_key, load_matrix, trip_cost
+from spot_index import ROAD_DETOUR_FACTOR, SpotIndex
+
+# Coordonnées de chez mémé : 7 avenue du Lac Marion, 64200 Biarritz
+CHEZ_MEME_COORDS = {'lat': 43.47007441987446, 'lng': -1.5502231105144162}
+
+# Points de départ de la matrice de distances (voir calculate_distances.py)
+ORIGINS = {
+    'chez_meme': {'name': 'Chez Mémé', **CHEZ_MEME_COORDS},
+}
+
+# Calcul des coûts (prix_round_trip) pour l'aller-retour
+# Hypothèses : Renault Clio IV (6.5 L/100km), essence 1.75€/L
+# Formule carburant : (distance_km * 2 / 100) * 6.5 * 1.75
+PRICING = {
+    'consommation_l_100km': 6.5,
+    'prix_carburant_l': 1.75,
+}
+
+# Péages A63 (classe 1) aller-retour par origine et par spot, les spots absents sont sans péage
+# Référence : https://public-content.vinci-autoroutes.com/PDF/Tarifs-peage-asf/C1-TARIFS-WEB-2025-maille.pdf
+# Chez mémé : sortie 4 Biarritz (demi-échangeur sud) -> 1,2€/passage
+# Hendaye : péage n°2 (St Jean de Luz Sud) -> 1,9€/passage = 3,8€ A/R
+# Capbreton/Hossegor/Seignosse : péage n°8 (Capbreton) -> 2€/passage = 4€ A/R
+# Zumaia : péage n°2 également (péage Espagne non inclus - frontière libre)
+TOLLS_ROUND_TRIP = {
+    'chez_meme': {
+        'Hendaye Plage': 3.8,
+        'Santocha': 4.0,
+        'La Gravière': 4.0,
+        'Le Penon': 4.0,
+        'Roca Puta': 3.8,
+    },
+}
+
+# Catalogue des spots de surf à proximité (l'ordre d'affichage est calculé)
+# Descriptions officielles depuis Surf Forecast : https://fr.surf-forecast.com/
+# Coordonnées GPS mises à jour selon les points d'arrivée fournis
+# Distances et temps de trajet : distance_matrix.json (API OSRM, distances routières réelles)
+SPOT_CATALOG = [
+    {
+        'name': 'Côte des Basques',
+        'location': 'Biarritz',
+        'lat': 43.47564359716611,
+        'lng': -1.5664002921277527,
+        'rating': 4,
+        'description': 'Côte des Basques dans la Côte Basque est un spot de plage et de récif exposé qui offre un surf assez régulier et peut fonctionner à tout moment de l\'année. Fonctionne mieux avec des vents offshore de l\'est avec un certain abri ici des vents du nord-ouest. Houles de vent et de fond en parts égales et l\'angle idéal de houle est de l\'ouest. Le spot de plage offre à la fois des vagues gauches et droites. Meilleur autour de la marée basse. Quand le surf est bon, la foule est probable. Attention aux rochers dans le lineup.'
+    },
+    {
+        'name': 'Grande Plage',
+        'location': 'Biarritz',
+        'lat': 43.48505622591267,
+        'lng': -1.5574765227972476,
+        'rating': 3,
+        'description': 'Grande Plage dans la Côte Basque est un spot de plage exposé qui offre un surf assez régulier et peut fonctionner à tout moment de l\'année. Les vents offshore soufflent de l\'est avec un certain abri ici des vents du sud. Houles de vent et de fond en parts égales et la meilleure direction de houle est de l\'ouest. Le spot de plage offre à la fois des vagues gauches et droites. Susceptible d\'être bondé si ça fonctionne. Les dangers incluent la foule et la pollution.'
+    },
+    {
+        'name': 'Chambre d\'Amour',
+        'location': 'Anglet',
+        'lat': 43.49427252956886,
+        'lng': -1.5456154571455343,
+        'rating': 3,
+        'description': 'Anglet - Chambre d\'Amour dans la Côte Basque est un spot de plage exposé qui offre un surf assez régulier et peut fonctionner à tout moment de l\'année. La meilleure direction de vent est du sud-est. Tendance à recevoir un mélange de houles de fond et de vent et l\'angle idéal de houle est du nord-ouest. Le spot de plage offre à la fois des vagues gauches et droites. Surfeable à tous les stades de la marée. C\'est souvent bondé ici. Les dangers incluent les dangers créés par l\'homme (bouées etc.) et le localisme.'
+    },
+    {
+        'name': 'Uhabia',
+        'location': 'Bidart',
+        'lat': 43.43108738144451,
+        'lng': -1.5989006378043706,
+        'rating': 3,
+        'description': 'Bidart dans la Côte Basque est un spot de plage exposé qui offre un surf assez fiable et peut fonctionner à tout moment de l\'année. La meilleure direction de vent est du sud-est. Tendance à recevoir un mélange de houles de fond et de vent et la meilleure direction de houle est de l\'ouest. Le spot de plage offre des vagues gauches et droites. Bon surf à tous les stades de la marée. Parfois bondé. Attention aux courants, rochers et pollution.'
+    },
+    {
+        'name': 'Parlementia',
+        'location': 'Guéthary',
+        'lat': 43.427723562362054,
+        'lng': -1.6068852440572812,
+        'rating': 3,
+        'description': 'Parlementia dans la Côte Basque est un spot de récif exposé qui offre un surf fiable et peut fonctionner à tout moment de l\'année. La meilleure direction de vent est de l\'est-sud-est. Houles de vent et de fond en parts égales et la meilleure direction de houle est de l\'ouest. Il n\'y a pas de spot de plage, seulement un récif droite. La qualité du surf n\'est pas affectée par la marée. Quand ça fonctionne ici, ça peut être bondé. Attention aux rochers.'
+    },
+    {
+        'name': 'Hendaye Plage',
+        'location': 'Hendaye',
+        'lat': 43.3735961088257,
+        'lng': -1.7742203280832838,
+        'rating': 3,
+        'description': 'Hendaye Plage dans la Côte Basque est un spot de plage et de récif assez exposé qui offre un surf assez régulier et peut fonctionner à tout moment de l\'année. Les vents offshore viennent du sud avec un certain abri ici des vents d\'ouest. La plupart du surf ici provient de houles de fond et la direction idéale de houle est de l\'ouest-nord-ouest. Le spot de plage offre des vagues gauches et droites et il y a aussi un récif droite. La qualité du surf n\'est pas affectée par la marée. Susceptible d\'être bondé si ça fonctionne. Attention aux rochers.'
+    },
+    {
+        'name': 'Santocha',
+        'location': 'Capbreton',
+        'lat': 43.64702883230817,
+        'lng': -1.4426945771349413,
+        'rating': 3,
+        'description': 'Capbreton - Le Santocha dans les Landes est un spot de plage assez exposé qui offre un surf assez régulier et peut fonctionner à tout moment de l\'année. La meilleure direction de vent est de l\'est. Houles de vent et de fond en parts égales et la meilleure direction de houle est de l\'ouest. Le spot de plage offre des vagues gauches et droites. Même quand il y a des vagues, il n\'est probablement pas bondé. Attention au localisme.'
+    },
+    {
+        'name': 'La Gravière',
+        'location': 'Hossegor',
+        'lat': 43.6737751398771,
+        'lng': -1.4391911691273902,
+        'rating': 4,
+        'description': 'Hossegor - La Gravière dans les Landes est un spot de barre de sable exposé qui offre un surf assez régulier. La meilleure période de l\'année pour les vagues est l\'automne. Les vents offshore soufflent de l\'est. Tendance à recevoir un mélange de houles de fond et de vent et la direction idéale de houle est de l\'ouest. Le spot de barre de sable offre à la fois des vagues gauches et droites. C\'est parfois bondé ici. Prenez des précautions particulières ici si ça devient très bondé.'
+    },
+    {
+        'name': 'Le Penon',
+        'location': 'Seignosse',
+        'lat': 43.709888795671304,
+        'lng': -1.4339030135463402,
+        'rating': 3,
+        'description': 'Le Penon en Aquitaine est un spot de plage/jetée exposé qui offre un surf irrégulier sans modèle saisonnier particulier. La meilleure direction de vent est de l\'est. Houles de vent et de fond en parts égales et l\'angle idéal de houle est de l\'ouest. Le spot de plage offre des vagues gauches et droites. Bon surf à tous les stades de la marée. Quand le surf est bon, ça peut devenir assez chargé dans l\'eau. Attention aux courants dangereux.'
+    },
+    {
+        'name': 'Roca Puta',
+        'location': 'Zumaia (Espagne)',
+        'lat': 43.30547054811386,
+        'lng': -2.240322543271815,
+        'rating': 4,
+        'description': 'Roca Puta dans le Pays Basque est un spot de récif exposé qui offre un surf assez régulier. L\'automne et l\'hiver sont les meilleures périodes de l\'année pour les vagues. Fonctionne mieux avec des vents offshore du sud-est. Les houles de fond et de vent sont également probables et la direction idéale de houle est du nord-ouest. Il n\'y a pas de spot de plage, seulement un récif droite. Meilleur autour de la marée basse. Il est très rarement bondé ici. Les dangers incluent des rochers, des courants et la pollution.'
+    }
+]
+
+
+def with_travel_info(spots, origin_key, routes):
+    """
+    Copie des spots enrichie des infos de trajet depuis une origine :
+    distance_km, temps_minutes et prix_round_trip (None si le trajet n'est pas dans la matrice)
+    """
+    origin = ORIGINS[origin_key]
+    tolls = TOLLS_ROUND_TRIP.get(origin_key, {})
+    enriched = []
+    for spot in spots:
+        route = routes.get(coord_key(origin, spot))
+        enriched.append({
+            **spot,
+            'distance_km': route['distance_km'] if route else None,
+            'temps_minutes': route['temps_minutes'] if route else None,
+            'prix_round_trip': trip_cost(route['distance_km'], tolls.get(spot['name'], 0), PRICING) if route else None,
+        })
+    return enriched
+
+
+def build_geojson(spots):
+    """FeatureCollection GeoJSON des spots (coordonnées [lng, lat])"""
+    return {
+        'type': 'FeatureCollection',
+        'features': [{
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [spot['lng'], spot['lat']]},
+            'properties': {key: value for key, value in spot.items() if key not in ('lat', 'lng')},
+        } for spot in spots],
+    }
+
+
+# Chargés une fois au démarrage : aucun calcul de trajet par requête
+DISTANCE_MATRIX = load_matrix()
+# Du plus proche au plus éloigné de chez mémé, les spots hors matrice en dernier
+SURF_SPOTS = sorted(
+    with_travel_info(SPOT_CATALOG, 'chez_meme', DISTANCE_MATRIX),
+    key=lambda spot: (spot['distance_km'] is None, spot['distance_km'] or 0),
+)
+
+SURF_SPOTS_GEOJSON = json.dumps(build_geojson(SURF_SPOTS), ensure_ascii=False).encode('utf-8')
+SURF_SPOTS_GEOJSON_ETAG = hashlib.sha1(SURF_SPOTS_GEOJSON).hexdigest()
+
+# Trajets exacts (matrice + péages) par origine connue, indexés par nom de spot
+TRAVEL_BY_ORIGIN = {
+    origin_key: {spot['name']: spot for spot in with_travel_info(SPOT_CATALOG, origin_key, DISTANCE_MATRIX)}
+    for origin_key in ORIGINS
+}
+SPOT_INDEX = SpotIndex(SPOT_CATALOG)
+ORIGIN_INDEX = SpotIndex({'key': key, **origin} for key, origin in ORIGINS.items())
+
+# En deçà de cette distance, le point de recherche est considéré comme l'origine connue
+ORIGIN_MATCH_KM = 0.2
+
+
+def find_nearby_spots(lat, lng, radius_km, limit=10, min_rating=None, max_cost=None):
+    """
+    Spots les plus proches de (lat, lng) dans un rayon, filtrés par note minimale
+    et coût aller-retour maximal.
+
+    Depuis une origine connue (ORIGINS), distance, temps et coût viennent de la
+    matrice. Ailleurs, la distance routière est estimée (vol d'oiseau × détour
+    moyen) et le coût ne comprend que le carburant : 'estimation' vaut alors True.
+    """
+    matched = ORIGIN_INDEX.nearby(lat, lng, ORIGIN_MATCH_KM, limit=1)
+    origin_key = matched[0][1]['key'] if matched else None
+
+    def travel_info(spot, distance):
+        if origin_key is not None:
+            travel = TRAVEL_BY_ORIGIN[origin_key][spot['name']]
+            if travel['distance_km'] is not None:
+                return travel['distance_km'], travel['temps_minutes'], travel['prix_round_trip'], False
+        road_km = round(distance * ROAD_DETOUR_FACTOR, 1)
+        return road_km, None, trip_cost(road_km, 0, PRICING), True
+
+    def accept(spot, distance):
+        if min_rating is not None and spot['rating'] < min_rating:
+            return False
+        return max_cost is None or travel_info(spot, distance)[2] <= max_cost
+
+    results = []
+    for distance, spot in SPOT_INDEX.nearby(lat, lng, radius_km, limit, predicate=accept):
+        distance_km, temps_minutes, prix_round_trip, estimated = travel_info(spot, distance)
+        results.append({
+            'name': spot['name'],
+            'location': spot['location'],
+            'lat': spot['lat'],
+            'lng': spot['lng'],
+            'rating': spot['rating'],
+            'vol_oiseau_km': round(distance, 1),
+            'distance_km': distance_km,
+            'temps_minutes': temps_minutes,
+            'prix_round_trip': prix_round_trip,
+            'estimation': estimated,
+        })
+    return results
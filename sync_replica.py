@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script pour copier la base SQLite principale vers le réplica local (tests du routage des lectures).
+
+Usage:
+    DATABASE_URL=sqlite:///chez_meme.db DATABASE_REPLICA_URL=sqlite:///chez_meme_replica.db python sync_replica.py
+
+En production (PostgreSQL), le réplica est alimenté par la réplication en continu
+du fournisseur : ce script ne sert qu'en local, avec deux fichiers SQLite.
+"""
+import os
+import sqlite3
+import sys
+from urllib.parse import urlparse
+
+
+def sqlite_path(url):
+    """sqlite:///fichier.db -> chemin du fichier (relatif au dossier instance/ comme Flask-SQLAlchemy)"""
+    if not url.startswith('sqlite:///'):
+        return None
+    path = urlparse(url).path[1:]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', path)
+    return path
+
+
+def main():
+    primary = sqlite_path(os.environ.get('DATABASE_URL', 'sqlite:///chez_meme.db'))
+    replica = sqlite_path(os.environ.get('DATABASE_REPLICA_URL', ''))
+    if not primary or not replica:
+        print("[ERROR] DATABASE_URL et DATABASE_REPLICA_URL doivent être des URL sqlite:///")
+        return 1
+    if not os.path.exists(primary):
+        print(f"[ERROR] Base principale introuvable: {primary}")
+        return 1
+
+    source = sqlite3.connect(primary)
+    target = sqlite3.connect(replica)
+    try:
+        # API de sauvegarde SQLite : copie cohérente même si l'application écrit en parallèle
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    print(f"[OK] {primary} -> {replica}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
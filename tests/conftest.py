@@ -0,0 +1,53 @@
+"""
+Fixtures communes : une application sur une base SQLite temporaire, initialisée une fois.
+
+Lancer depuis la racine du dépôt : python -m pytest
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Avant l'import de app (create_app lit l'environnement)
+_tmp_dir = tempfile.mkdtemp(prefix='chez-meme-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp_dir, 'test.db')
+os.environ['ADMIN_MDP'] = 'test-admin'
+os.environ['SESSION_STORE'] = 'memory'
+os.environ['RATE_LIMIT_STORE'] = 'memory'
+os.environ['UPLOAD_TMP_DIR'] = os.path.join(_tmp_dir, 'uploads')
+os.environ['HCAPTCHA_SECRET_KEY'] = ''
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    application = create_app()
+    application.config['TESTING'] = True
+    # Première requête : création des tables et de l'admin (initialize_db)
+    application.test_client().get('/robots.txt')
+    return application
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app):
+    client = app.test_client()
+    response = client.post('/admin/login', data={'username': 'admin', 'password': 'test-admin'})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def db(app):
+    from extensions import db as database
+    with app.app_context():
+        yield database
+        database.session.rollback()
@@ -0,0 +1,53 @@
+import time
+from datetime import date, datetime, timedelta
+
+from db_pool import server_timeout
+
+
+def test_event_stream_shorter_than_worker_timeout(app):
+    assert app.config['ADMIN_EVENTS_MAX_SECONDS'] < server_timeout()
+
+
+def test_changes_polling(app, admin_client, db):
+    from models import ReservationPending
+
+    start = admin_client.get('/admin/api/changes').get_json()
+    assert start['success'] and start['events'] == []
+
+    pending = ReservationPending(guest_name='Polling', start_date=date.today() + timedelta(days=300),
+                                 end_date=date.today() + timedelta(days=302))
+    db.session.add(pending)
+    db.session.commit()
+
+    data = admin_client.get(f"/admin/api/changes?after={start['last_id']}").get_json()
+    assert data['last_id'] > start['last_id']
+    event = data['events'][-1]
+    assert event['table'] == 'reservation_pending' and event['action'] == 'insert'
+    assert event['id'] == pending.id and event['event_id'] == data['last_id']
+    assert event['pending_count'] >= 1
+
+    assert admin_client.get(f"/admin/api/changes?after={data['last_id']}").get_json()['events'] == []
+
+
+def test_changes_requires_admin(client):
+    assert client.get('/admin/api/changes').status_code == 302
+
+
+def test_admin_housekeeping_purges_old_changes(app, admin_client, db, monkeypatch):
+    import admin_routes
+    from models import ChangeLog
+
+    old = ChangeLog(table_name='reservation', action='insert',
+                    created_at=datetime.utcnow() - timedelta(hours=app.config['CHANGE_LOG_RETENTION_HOURS'] + 1))
+    recent = ChangeLog(table_name='reservation', action='update')
+    db.session.add_all([old, recent])
+    db.session.commit()
+    old_id, recent_id = old.id, recent.id
+
+    # Dernier passage il y a plus de HOUSEKEEPING_INTERVAL_SECONDS
+    monkeypatch.setattr(admin_routes, '_last_housekeeping',
+                        time.monotonic() - admin_routes.HOUSEKEEPING_INTERVAL_SECONDS - 1)
+    assert admin_client.get('/admin/api/changes').status_code == 200
+    db.session.expire_all()
+    assert db.session.get(ChangeLog, old_id) is None
+    assert db.session.get(ChangeLog, recent_id) is not None
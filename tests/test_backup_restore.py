@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from datetime import date
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def backup_data(admin_client, db):
+    from models import ReservationPending
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (30, 160, 90)).save(buffer, 'JPEG')
+    buffer.seek(0)
+    response = admin_client.post('/admin/photos/upload', data={'photos': [(buffer, 'b.jpg')], 'captions': ['sauvegarde']},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['success']
+    db.session.add(ReservationPending(guest_name='Héloïse Sauvegardée', nickname='Lou', start_date=date(2033, 5, 1),
+                                      end_date=date(2033, 5, 4)))
+    db.session.commit()
+
+
+def source_counts(db):
+    from admin_routes import EXPORT_DATASETS
+    return {dataset: model.query.count() for dataset, (model, _) in EXPORT_DATASETS.items()}
+
+
+@pytest.mark.parametrize('dataset', ['reservations', 'pending', 'photos'])
+def test_jsonl_and_csv_exports(admin_client, db, backup_data, dataset):
+    from admin_routes import EXPORT_DATASETS
+
+    model, fields = EXPORT_DATASETS[dataset]
+    jsonl = admin_client.get(f'/admin/export/{dataset}.jsonl')
+    assert jsonl.status_code == 200 and jsonl.headers['Cache-Control'] == 'no-store'
+    rows = [json.loads(line) for line in jsonl.get_data(as_text=True).splitlines()]
+    assert len(rows) == model.query.count()
+    assert all(list(row) == fields for row in rows)
+
+    exported = list(csv.DictReader(io.StringIO(admin_client.get(f'/admin/export/{dataset}.csv').get_data(as_text=True))))
+    assert [int(row['id']) for row in exported] == [row['id'] for row in rows]
+    # Mêmes valeurs en CSV qu'en JSON (dates ISO, None -> champ vide)
+    for row, csv_row in zip(rows, exported):
+        assert {field: '' if value is None else str(value) for field, value in row.items()} == csv_row
+
+
+def test_zip_backup_restores_into_empty_database(app, admin_client, db, backup_data, tmp_path, monkeypatch):
+    import restore_backup
+    from app import create_app
+    from models import ImageAsset, ReservationPending, search_pending_reservations
+
+    expected = source_counts(db)
+    backed_up = ReservationPending.query.filter_by(guest_name='Héloïse Sauvegardée').count()
+    images = {asset.content_hash: asset.data for asset in ImageAsset.query}
+
+    archive_path = tmp_path / 'backup.zip'
+    archive_path.write_bytes(admin_client.get('/admin/export/archive.zip').data)
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        assert json.loads(archive.read('manifest.json'))['datasets'] == list(expected)
+
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///' + os.path.join(tmp_path, 'restored.db'))
+    monkeypatch.setattr('sys.argv', ['restore_backup.py', str(archive_path)])
+    assert restore_backup.main() == 0
+
+    restored = create_app()
+    with restored.app_context():
+        assert source_counts(db) == expected
+        assert {asset.content_hash: asset.data for asset in ImageAsset.query} == images
+        # Index de recherche reconstruit : préfixe sans accent, search_text rempli
+        results = search_pending_reservations('helo sauv').items
+        assert [pending.guest_name for pending in results] == ['Héloïse Sauvegardée'] * backed_up
+        assert results[0].search_text == 'heloise sauvegardee lou'
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_restore_refuses_non_empty_database(admin_client, backup_data, tmp_path, monkeypatch):
+    import restore_backup
+
+    archive_path = tmp_path / 'backup.zip'
+    archive_path.write_bytes(admin_client.get('/admin/export/archive.zip').data)
+    # Base de test (non vide) : rien n'est écrit sans --replace
+    monkeypatch.setattr('sys.argv', ['restore_backup.py', str(archive_path)])
+    assert restore_backup.main() == 1
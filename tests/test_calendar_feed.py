@@ -0,0 +1,61 @@
+from datetime import date, datetime
+
+import pytest
+
+from public_routes import ics_line, reservation_to_vevent
+from reservation_import import _unfold_ics_lines, parse_ics, resolve_conflicts
+
+
+def test_ics_line_folding():
+    content = 'SUMMARY:' + 'Mémé et toute la famille, ' * 8
+    folded = ics_line(content)
+    assert folded.endswith('\r\n')
+    physical = folded[:-2].split('\r\n')
+    assert len(physical) > 1
+    assert all(len(line.encode('utf-8')) <= 75 for line in physical)
+    assert all(line.startswith(' ') for line in physical[1:])
+    assert _unfold_ics_lines(folded) == [(1, content)]
+
+
+def test_vevent_round_trip_keeps_dates():
+    vevent = reservation_to_vevent(7, date(2030, 7, 1), date(2030, 7, 5), 'Dupont; Jean, fils', datetime(2030, 1, 1))
+    rows, errors = parse_ics('BEGIN:VCALENDAR\r\n' + vevent + 'END:VCALENDAR\r\n')
+    assert errors == []
+    assert len(rows) == 1
+    assert rows[0]['guest_name'] == 'Dupont; Jean, fils'
+    assert (rows[0]['start_date'], rows[0]['end_date']) == (date(2030, 7, 1), date(2030, 7, 5))
+
+
+@pytest.fixture
+def feed_token(app):
+    app.config['CALENDAR_FEED_TOKEN'] = 'test-feed-token'
+    yield 'test-feed-token'
+    app.config['CALENDAR_FEED_TOKEN'] = ''
+
+
+def test_feed_reimport_back_to_back(app, client, db, feed_token):
+    """Deux séjours qui se suivent (départ = arrivée suivante) ne sont pas en conflit une fois réimportés"""
+    from models import Reservation
+
+    stays = [(date(2032, 3, 1), date(2032, 3, 5)), (date(2032, 3, 5), date(2032, 3, 9))]
+    for number, (start, end) in enumerate(stays):
+        db.session.add(Reservation(guest_name=f'Feed {number}', start_date=start, end_date=end, status='approved',
+                                   token=f'feed-token-{number}'))
+    db.session.commit()
+
+    response = client.get(f'/calendar.ics?token={feed_token}&from=2032-03-01&to=2032-03-31')
+    assert response.status_code == 200
+    rows, errors = parse_ics(response.get_data(as_text=True))
+    assert errors == []
+    assert [(row['start_date'], row['end_date']) for row in rows] == stays
+
+    accepted, conflicts = resolve_conflicts(rows, [])
+    assert conflicts == [] and len(accepted) == 2
+    # Réimporter dans la même base : chaque ligne ne chevauche que son propre original
+    _, conflicts = resolve_conflicts(rows[:1], [(stays[1][0], stays[1][1], 'Feed 1')])
+    assert conflicts == []
+
+
+def test_feed_requires_token(client, feed_token):
+    assert client.get('/calendar.ics').status_code == 404
+    assert client.get('/calendar.ics?token=wrong').status_code == 404
@@ -0,0 +1,74 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from captcha import CaptchaVerifier
+from fake_hcaptcha_server import SiteVerifyHandler
+
+
+@pytest.fixture(scope='module')
+def siteverify_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteVerifyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/siteverify'
+    server.shutdown()
+    server.server_close()
+
+
+def token(prefix):
+    # Le faux serveur n'accepte chaque token qu'une fois
+    return f'{prefix}-{time.monotonic_ns()}'
+
+
+def test_valid_token(siteverify_url):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url)
+    assert verifier.verify(token('pass'), '203.0.113.5') is True
+
+
+def test_rejected_token(siteverify_url):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url)
+    assert verifier.verify(token('bad'), '203.0.113.5') is False
+    assert verifier.verify('', '203.0.113.5') is False
+
+
+def test_async_verification(siteverify_url):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url)
+    assert verifier.verify_async(token('pass')).result(timeout=5) is True
+    assert verifier.verify_async(token('bad')).result(timeout=5) is False
+
+
+@pytest.mark.parametrize('fail_open', [True, False])
+def test_timeout_uses_fail_open(siteverify_url, fail_open):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url, read_timeout=0.2, fail_open=fail_open)
+    started = time.monotonic()
+    assert verifier.verify(token('slow')) is fail_open
+    assert time.monotonic() - started < 5
+
+
+@pytest.mark.parametrize('fail_open', [True, False])
+def test_server_error_uses_fail_open(siteverify_url, fail_open):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url, fail_open=fail_open)
+    assert verifier.verify(token('error')) is fail_open
+
+
+def test_validated_token_is_cached(siteverify_url):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url)
+    value = token('pass')
+    assert verifier.verify(value) is True
+    # hcaptcha.com (et le faux serveur) refuseraient un second envoi : servi par le cache
+    assert verifier.verify(value) is True
+    assert verifier.verify_async(value).result(timeout=5) is True
+
+
+def test_expired_cache_entry_asks_again(siteverify_url):
+    verifier = CaptchaVerifier('secret', verify_url=siteverify_url, cache_ttl=0)
+    value = token('pass')
+    assert verifier.verify(value) is True
+    assert verifier.verify(value) is False
+
+
+def test_disabled_without_secret():
+    assert CaptchaVerifier('', verify_url='http://127.0.0.1:9/siteverify').verify('') is True
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def replica_app(app, tmp_path):
+    """Application sur deux fichiers SQLite : base principale et réplica (sans réplication)"""
+    from app import create_app
+    from extensions import db
+    from models import Leaderboard, User
+
+    application = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp_path, 'primary.db'),
+        'SQLALCHEMY_BINDS': {'replica': 'sqlite:///' + os.path.join(tmp_path, 'replica.db')},
+        'REPLICA_STICKY_SECONDS': 1,
+    })
+    with application.app_context():
+        for engine in db.engines.values():
+            db.metadata.create_all(engine)
+        db.session.add(User(username='admin', email='admin@example.com', is_admin=True,
+                            password_hash=generate_password_hash('replica-admin')))
+        db.session.add(Leaderboard(person_name='Seulement-principale', rank_position=1))
+        db.session.commit()
+        with db.engines['replica'].begin() as connection:
+            connection.execute(Leaderboard.__table__.insert().values(person_name='Seulement-replica',
+                                                                     rank_position=1, visit_count=0))
+    yield application
+    with application.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_public_reads_go_to_replica(replica_app):
+    body = replica_app.test_client().get('/leaderboard').get_data(as_text=True)
+    assert 'Seulement-replica' in body
+    assert 'Seulement-principale' not in body
+
+
+def test_admin_sticks_to_primary_after_write(replica_app):
+    client = replica_app.test_client()
+    assert client.post('/admin/login', data={'username': 'admin', 'password': 'replica-admin'}).status_code == 302
+    assert 'Seulement-replica' in client.get('/leaderboard').get_data(as_text=True)
+
+    response = client.post('/admin/leaderboard/add', data={'person_name': 'Nouveau', 'visit_count': '1'})
+    assert response.get_json()['success']
+    body = client.get('/leaderboard').get_data(as_text=True)
+    assert 'Nouveau' in body and 'Seulement-principale' in body
+
+    time.sleep(1.1)  # Fin de REPLICA_STICKY_SECONDS
+    body = client.get('/leaderboard').get_data(as_text=True)
+    assert 'Seulement-replica' in body and 'Nouveau' not in body
+
+
+def test_no_session_read_without_replica(app, admin_client, monkeypatch):
+    store = app.extensions['session_store']
+    loads = []
+    load = store.load
+    monkeypatch.setattr(store, 'load', lambda *args: loads.append(args) or load(*args))
+
+    response = admin_client.get('/gallery.json')
+    assert response.status_code == 200
+    assert loads == []
+    assert 'Cookie' not in response.vary
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import calculate_distances
+from distance_matrix import compute_matrix, coord_key, load_matrix
+from surf_spots import ORIGINS, SPOT_CATALOG, with_travel_info
+
+ORIGIN = {'lat': 43.4, 'lng': -1.6}
+SPOTS = [{'lat': 43.4 + index / 100, 'lng': -1.5} for index in range(6)]
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeOSRM:
+    """Remplace requests.Session.get : distance proportionnelle à la latitude de l'arrivée"""
+
+    def __init__(self, delay=0.05, down=False):
+        self.delay = delay
+        self.down = down
+        self.urls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        if self.down:
+            raise requests.ConnectionError("OSRM injoignable")
+        with self.lock:
+            self.urls.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        lat = float(url.rsplit(';', 1)[1].split(',')[1])
+        return FakeResponse({'routes': [{'distance': lat * 1000, 'duration': 600}]})
+
+
+@pytest.fixture
+def osrm(monkeypatch):
+    fake = FakeOSRM()
+    monkeypatch.setattr(requests.Session, 'get', fake.get)
+    return fake
+
+
+def test_routes_fetched_in_parallel(osrm):
+    routes, errors = compute_matrix([ORIGIN], SPOTS, 'http://osrm.test', max_workers=4)
+    assert errors == []
+    assert len(osrm.urls) == len(SPOTS)
+    assert osrm.max_in_flight > 1
+    assert routes[coord_key(ORIGIN, SPOTS[2])] == {'distance_km': 43.4, 'temps_minutes': 10}
+    assert osrm.urls[0].startswith('http://osrm.test/route/v1/driving/-1.6,43.4;')
+
+
+def test_cached_routes_are_reused(osrm):
+    routes, _ = compute_matrix([ORIGIN], SPOTS[:4], 'http://osrm.test')
+    osrm.urls.clear()
+    again, errors = compute_matrix([ORIGIN], SPOTS[:4], 'http://osrm.test', routes)
+    assert errors == [] and osrm.urls == [] and again == routes
+    # Nouveau spot : seul son trajet est demandé
+    extended, _ = compute_matrix([ORIGIN], SPOTS, 'http://osrm.test', routes)
+    assert len(osrm.urls) == 2 and len(extended) == len(SPOTS)
+
+
+def test_osrm_down_reports_errors_and_keeps_cache(osrm):
+    cached = {coord_key(ORIGIN, SPOTS[0]): {'distance_km': 1.0, 'temps_minutes': 2}}
+    osrm.down = True
+    routes, errors = compute_matrix([ORIGIN], SPOTS, 'http://osrm.test', cached)
+    assert routes == cached
+    assert sorted(key for key, _ in errors) == sorted(coord_key(ORIGIN, spot) for spot in SPOTS[1:])
+
+
+def test_refresh_with_osrm_down_keeps_previous_matrix(osrm, monkeypatch):
+    cached = load_matrix()
+    saved = {}
+    osrm.down = True
+    monkeypatch.setattr(calculate_distances, 'load_matrix', lambda: dict(cached))
+    monkeypatch.setattr(calculate_distances, 'save_matrix', lambda routes, osrm_url: saved.update(routes))
+    monkeypatch.setattr('sys.argv', ['calculate_distances.py', '--refresh'])
+
+    assert calculate_distances.main() == 1
+    expected = {coord_key(origin, spot) for origin in ORIGINS.values() for spot in SPOT_CATALOG}
+    assert saved == {key: route for key, route in cached.items() if key in expected}
+    # Trajets absents de l'ancienne matrice : affichés sans distance plutôt qu'en erreur
+    spots = with_travel_info(SPOT_CATALOG, 'chez_meme', saved)
+    assert all((spot['distance_km'] is None) == (coord_key(ORIGINS['chez_meme'], spot) not in saved) for spot in spots)
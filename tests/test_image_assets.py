@@ -0,0 +1,49 @@
+import io
+
+from PIL import Image
+
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+    buffer.seek(0)
+    return buffer
+
+
+def test_same_file_reuses_asset(app, db):
+    from image_assets import store_image
+    from models import ImageAsset
+
+    first = store_image(jpeg((40, 90, 160)))
+    second = store_image(jpeg((40, 90, 160)))
+    assert first.id is not None
+    assert second.id == first.id
+    assert ImageAsset.query.filter_by(content_hash=first.content_hash).count() == 1
+
+
+def test_concurrent_upload_keeps_other_workers_asset(app, db, monkeypatch):
+    import image_assets
+    from models import ImageAsset
+
+    stream = jpeg((160, 40, 90))
+    content_hash = image_assets.hash_stream(stream)
+    prepare_image = image_assets.prepare_image
+    other_token = image_assets.new_token()
+
+    def prepare_while_other_worker_inserts(*args, **kwargs):
+        # Un autre worker valide le même fichier entre la recherche et l'insertion
+        with db.engine.begin() as connection:
+            connection.execute(ImageAsset.__table__.insert().values(
+                token=other_token, content_hash=content_hash, mime_type='image/jpeg', width=64, height=48,
+                byte_size=1, data=b'x'))
+        return prepare_image(*args, **kwargs)
+
+    monkeypatch.setattr(image_assets, 'prepare_image', prepare_while_other_worker_inserts)
+    try:
+        asset = image_assets.store_image(stream)
+        assert asset.token == other_token
+        assert ImageAsset.query.filter_by(content_hash=content_hash).count() == 1
+    finally:
+        db.session.rollback()
+        with db.engine.begin() as connection:
+            connection.execute(ImageAsset.__table__.delete().where(ImageAsset.content_hash == content_hash))
@@ -0,0 +1,99 @@
+import io
+
+import pytest
+from PIL import Image
+
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def public_cache(app):
+    app.config['IMAGE_PUBLIC_CACHE'] = True
+    yield
+    app.config['IMAGE_PUBLIC_CACHE'] = False
+
+
+def purge_urls(db, after):
+    from models import ImagePurge
+    return [purge.url for purge in ImagePurge.query.filter(ImagePurge.id > after).order_by(ImagePurge.id)]
+
+
+def last_purge_id(db):
+    from models import ImagePurge
+    return db.session.query(db.func.max(ImagePurge.id)).scalar() or 0
+
+
+def upload_photo(admin_client, color):
+    response = admin_client.post('/admin/photos/upload', data={'photos': [(jpeg(color), 'p.jpg')], 'captions': ['p']},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['success']
+
+
+def test_delete_purges_only_the_type_that_served_it(app, admin_client, db, public_cache):
+    from models import Photo
+
+    upload_photo(admin_client, (10, 200, 30))
+    photo = Photo.query.order_by(Photo.id.desc()).first()
+    token = photo.public_image_token
+    start = last_purge_id(db)
+
+    assert admin_client.delete(f'/admin/photos/delete/{photo.id}').get_json()['success']
+    assert purge_urls(db, start) == [f'/image/{token}/photo']
+
+
+def test_shared_image_purged_when_last_public_user_leaves(app, admin_client, db, public_cache):
+    from models import Photo, WallOfShame
+
+    upload_photo(admin_client, (200, 10, 30))
+    photo = Photo.query.order_by(Photo.id.desc()).first()
+    token = photo.public_image_token
+    # Même fichier sur le Wall of Shame : même ImageAsset
+    response = admin_client.post('/admin/wall-of-shame/upload', data={'photo': (jpeg((200, 10, 30)), 'w.jpg'),
+                                                                     'person_name': 'Partage'},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['success']
+    wall = WallOfShame.query.order_by(WallOfShame.id.desc()).first()
+    assert wall.image_asset_id == photo.image_asset_id
+    start = last_purge_id(db)
+
+    # Le Wall of Shame n'est jamais en cache public : rien à purger
+    assert admin_client.delete(f'/admin/wall-of-shame/delete/{wall.id}').get_json()['success']
+    assert purge_urls(db, start) == []
+
+    assert admin_client.delete(f'/admin/photos/delete/{photo.id}').get_json()['success']
+    assert purge_urls(db, start) == [f'/image/{token}/photo']
+
+
+def test_replaced_leader_image(app, admin_client, db, public_cache):
+    from models import Leaderboard
+
+    response = admin_client.post('/admin/leaderboard/add', data={'photo': (jpeg((1, 2, 250)), 'l.jpg'),
+                                                                 'person_name': 'Leader', 'visit_count': '1'},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['success']
+    leader = Leaderboard.query.order_by(Leaderboard.id.desc()).first()
+    token = leader.public_image_token
+    start = last_purge_id(db)
+
+    response = admin_client.post(f'/admin/leaderboard/update/{leader.id}',
+                                 data={'photo': (jpeg((250, 250, 1)), 'l2.jpg'), 'person_name': 'Leader',
+                                       'visit_count': '2'},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['success']
+    assert purge_urls(db, start) == [f'/image/{token}/leader']
+
+
+def test_public_cache_headers(app, admin_client, client, db, public_cache):
+    from models import Photo
+
+    upload_photo(admin_client, (90, 90, 200))
+    token = Photo.query.order_by(Photo.id.desc()).first().public_image_token
+    assert client.get(f'/image/{token}/photo').headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    # Même image demandée comme type privé ou non utilisé : pas de cache partagé
+    assert client.get(f'/image/{token}/wall').headers['Cache-Control'].startswith('private')
+    assert client.get(f'/image/{token}/leader').headers['Cache-Control'].startswith('private')
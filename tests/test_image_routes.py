@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def photo_image(admin_client, db):
+    from models import Photo
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (120, 30, 200)).save(buffer, 'JPEG')
+    buffer.seek(0)
+    response = admin_client.post('/admin/photos/upload', data={'photos': [(buffer, 'r.jpg')], 'captions': ['range']},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['success']
+    photo = Photo.query.order_by(Photo.id.desc()).first()
+    return f'/image/{photo.public_image_token}/photo', photo.image_asset
+
+
+def test_full_response(client, photo_image):
+    url, asset = photo_image
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == asset.data
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.content_length == asset.byte_size
+
+
+def test_range_request(client, photo_image):
+    url, asset = photo_image
+    response = client.get(url, headers={'Range': 'bytes=10-99'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 10-99/{asset.byte_size}'
+    assert response.content_length == 90
+    assert response.data == asset.data[10:100]
+
+
+def test_unsatisfiable_range(client, photo_image):
+    url, asset = photo_image
+    response = client.get(url, headers={'Range': f'bytes={asset.byte_size + 10}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{asset.byte_size}'
+
+
+def test_if_none_match(client, photo_image):
+    url, asset = photo_image
+    response = client.get(url, headers={'If-None-Match': f'"{asset.content_hash}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert client.get(url, headers={'If-None-Match': '"autre"'}).status_code == 200
+
+
+def test_blob_reader_reads_across_chunks(db, photo_image):
+    from image_assets import BlobReader
+
+    _, asset = photo_image
+    reader = BlobReader(db.engine, asset.id, asset.byte_size)
+    chunks = iter(lambda: reader.read(100), b'')
+    assert b''.join(chunks) == asset.data
+    reader.seek(-20, io.SEEK_END)
+    assert reader.read() == asset.data[-20:]
@@ -0,0 +1,51 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from admin_routes import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor('pas-un-curseur')
+
+
+@pytest.mark.parametrize('url', ['/admin/api/reservations', '/admin/api/pending'])
+@pytest.mark.parametrize('limit', ['0', '-5'])
+def test_limit_must_be_positive(admin_client, url, limit):
+    response = admin_client.get(f'{url}?limit={limit}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_invalid_cursor_returns_400(admin_client):
+    assert admin_client.get('/admin/api/reservations?cursor=xyz').status_code == 400
+
+
+def test_keyset_pages_cover_all_rows(admin_client, db):
+    from models import ReservationPending
+
+    created = datetime(2001, 1, 1)
+    for number in range(5):
+        # Deux lignes avec le même created_at : départagées par l'id
+        db.session.add(ReservationPending(guest_name=f'Page {number}', created_at=created + timedelta(days=number // 2),
+                                          start_date=date(2031, 1, 1 + number), end_date=date(2031, 1, 2 + number)))
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = '/admin/api/pending?limit=2&to=2031-01-31' + (f'&cursor={cursor}' if cursor else '')
+        data = admin_client.get(url).get_json()
+        assert len(data['items']) <= 2
+        seen += [item['guest_name'] for item in data['items'] if item['guest_name'].startswith('Page ')]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert sorted(seen) == [f'Page {number}' for number in range(5)]
+    assert len(seen) == len(set(seen))
+    assert admin_client.get('/admin/api/pending?limit=1000').status_code == 200
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+import models
+
+
+def names(search_term):
+    return [pending.guest_name for pending in models.search_pending_reservations(search_term).items]
+
+
+@pytest.fixture(params=['fts', 'like'])
+def search_mode(request, app, monkeypatch):
+    """Recherche par la table FTS5 (triggers) ou par LIKE sur search_text (repli)"""
+    assert models._pending_fts_available
+    if request.param == 'like':
+        monkeypatch.setattr(models, '_pending_fts_available', False)
+    return request.param
+
+
+def test_accent_folded_prefix_search_follows_writes(db, search_mode):
+    pending = models.ReservationPending(guest_name='Éléonore Brûlé', nickname='Nönö', start_date=date(2034, 3, 1),
+                                        end_date=date(2034, 3, 5))
+    db.session.add(pending)
+    db.session.commit()
+    try:
+        assert pending.search_text == 'eleonore brule nono'
+        for term in ('eleo', 'ÉLÉO', 'brû', 'élé bru', 'non'):
+            assert names(term) == ['Éléonore Brûlé'], term
+        assert names('leonore') == []  # Préfixe de mot seulement
+        assert names('eleo zzz') == []
+
+        pending.guest_name = 'Zéphyrine Brûlé'
+        db.session.commit()
+        assert names('eleo') == []
+        assert names('zeph brul') == ['Zéphyrine Brûlé']
+
+        db.session.delete(pending)
+        db.session.commit()
+        pending = None
+        assert names('zeph') == []
+    finally:
+        if pending is not None:
+            db.session.delete(pending)
+            db.session.commit()
+
+
+def test_admin_search_route(admin_client, db):
+    pending = models.ReservationPending(guest_name='Anaïs Lefèvre', start_date=date(2034, 4, 1),
+                                        end_date=date(2034, 4, 3))
+    db.session.add(pending)
+    db.session.commit()
+    try:
+        data = admin_client.get('/admin/pending/search', query_string={'q': 'anai lefe'}).get_json()
+        assert data['total'] == 1
+        assert data['results'][0]['guest_name'] == 'Anaïs Lefèvre'
+    finally:
+        db.session.delete(pending)
+        db.session.commit()
@@ -0,0 +1,127 @@
+import io
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from PIL import Image
+from werkzeug.serving import make_server
+
+from fake_cache_proxy import CachingProxyHandler, ResponseCache
+from proxy_cache import ProxyPurger
+
+
+@pytest.fixture
+def proxy_cache_seconds(app):
+    app.config['PROXY_CACHE_SECONDS'] = 60
+    yield 60
+    app.config['PROXY_CACHE_SECONDS'] = 0
+
+
+@pytest.fixture
+def proxy(app, proxy_cache_seconds, monkeypatch):
+    """Application servie sur un port libre derrière fake_cache_proxy.py, purges envoyées au proxy"""
+    app_server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=app_server.serve_forever, daemon=True).start()
+
+    class Handler(CachingProxyHandler):
+        cache = ResponseCache()
+        backend = urlsplit(f'http://127.0.0.1:{app_server.server_port}')
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    purger = ProxyPurger(url)
+    monkeypatch.setitem(app.extensions, 'proxy_purger', purger)
+    yield url, Handler.cache, purger
+    server.shutdown()
+    server.server_close()
+    app_server.shutdown()
+
+
+def wait_for_purge(purger, count=1):
+    deadline = time.monotonic() + 5
+    while sum(purger.counters.values()) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert purger.counters['errors'] == 0
+
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+    buffer.seek(0)
+    return buffer
+
+
+def test_anonymous_response_is_cacheable(client, proxy_cache_seconds):
+    response = client.get('/calendrier')
+    assert response.status_code == 200
+    assert response.cache_control.public
+    assert response.cache_control.s_maxage == proxy_cache_seconds
+    assert response.headers['Surrogate-Control'] == f'max-age={proxy_cache_seconds}'
+    assert response.headers['Surrogate-Key'] == 'reservations'
+    assert 'Cookie' in response.vary
+    assert 'Set-Cookie' not in response.headers
+
+
+def test_admin_response_is_private(admin_client, proxy_cache_seconds):
+    response = admin_client.get('/calendrier')
+    assert response.status_code == 200
+    assert response.cache_control.private
+    assert response.cache_control.s_maxage is None
+    assert 'Surrogate-Key' not in response.headers
+    assert 'Surrogate-Control' not in response.headers
+    assert 'Cookie' in response.vary
+
+
+def test_no_proxy_headers_when_disabled(client):
+    response = client.get('/calendrier')
+    assert 'Surrogate-Key' not in response.headers
+    assert response.cache_control.s_maxage is None
+
+
+def test_reservation_commit_purges_its_key(admin_client, proxy):
+    url, cache, purger = proxy
+    assert requests.get(f'{url}/calendrier').headers['X-Cache'] == 'MISS'
+    assert requests.get(f'{url}/calendrier').headers['X-Cache'] == 'HIT'
+    assert requests.get(f'{url}/leaderboard').headers['X-Cache'] == 'MISS'
+    # Le proxy ne renvoie pas les en-têtes Surrogate-* au navigateur
+    assert 'Surrogate-Key' not in requests.get(f'{url}/calendrier').headers
+
+    response = admin_client.post('/admin/add', data={'start_date': '2039-02-01', 'end_date': '2039-02-04',
+                                                     'guest_name': 'Purge', 'status': 'approved'})
+    assert response.get_json()['success']
+    wait_for_purge(purger)
+
+    assert cache.get('/calendrier') is None
+    assert cache.get('/leaderboard') is not None
+    assert requests.get(f'{url}/calendrier').headers['X-Cache'] == 'MISS'
+
+
+def test_photo_delete_purges_key_and_image_url(app, admin_client, db, proxy):
+    from models import Photo
+
+    url, cache, purger = proxy
+    app.config['IMAGE_PUBLIC_CACHE'] = True
+    try:
+        response = admin_client.post('/admin/photos/upload', data={'photos': [(jpeg((5, 80, 200)), 'p.jpg')],
+                                                                   'captions': ['purge']},
+                                     content_type='multipart/form-data')
+        assert response.get_json()['success']
+        wait_for_purge(purger)
+        photo = Photo.query.order_by(Photo.id.desc()).first()
+        image_url = f'/image/{photo.public_image_token}/photo'
+
+        assert requests.get(f'{url}/gallery.json').headers['X-Cache'] == 'MISS'
+        cache.put(image_url, 200, [('Content-Type', 'image/webp')], b'image', 60, [])
+        purged = sum(purger.counters.values())
+
+        assert admin_client.delete(f'/admin/photos/delete/{photo.id}').get_json()['success']
+        wait_for_purge(purger, purged + 2)
+    finally:
+        app.config['IMAGE_PUBLIC_CACHE'] = False
+
+    assert cache.get('/gallery.json') is None
+    assert cache.get(image_url) is None
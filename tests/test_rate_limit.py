@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from rate_limit import DatabaseBucketStore, MemoryBucketStore, RateLimiter, subnet_key
+
+
+def test_subnet_key():
+    assert subnet_key('203.0.113.42') == '203.0.113.0/24'
+    assert subnet_key('2001:db8:1:2:3:4:5:6') == '2001:db8:1:2::/64'
+    assert subnet_key('not-an-ip') is None
+    assert subnet_key(None) is None
+
+
+def test_ip_and_subnet_buckets():
+    limiter = RateLimiter(MemoryBucketStore(), {'ip': (2, 0.0001), 'net': (3, 0.0001)})
+    assert limiter.check('198.51.100.1')[0]
+    assert limiter.check('198.51.100.1')[0]
+    allowed, retry_after = limiter.check('198.51.100.1')
+    assert not allowed and retry_after > 0
+    # Autre IP du même /24 : son propre seau, mais le sous-réseau est partagé
+    assert limiter.check('198.51.100.2')[0]
+    assert not limiter.check('198.51.100.3')[0]
+    assert limiter.check('192.0.2.1')[0]
+    assert limiter.counters['rejected_ip'] == 1
+    assert limiter.counters['rejected_net'] == 1
+
+
+@pytest.fixture(params=['memory', 'database'])
+def store(request, db):
+    if request.param == 'memory':
+        return MemoryBucketStore()
+    from models import RateLimitBucket
+    return DatabaseBucketStore(lambda: db.engine, RateLimitBucket.__table__)
+
+
+def test_subnet_rejection_refunds_ip_token(store):
+    limiter = RateLimiter(store, {'ip': (2, 0.0001), 'net': (1, 0.0001)}, name='refund')
+    assert limiter.check('198.51.100.10')[0]
+    # Refusé par le sous-réseau : le seau de l'IP n'est pas entamé
+    for _ in range(3):
+        assert not limiter.check('198.51.100.11')[0]
+    assert store.consume('refund:ip:198.51.100.11', 2, 0.0001, time.time())[0]
+    assert store.consume('refund:ip:198.51.100.11', 2, 0.0001, time.time())[0]
+    assert limiter.counters['rejected_net'] == 3
+
+
+def post_invalid_reservation(client, forwarded_for, remote_addr='10.0.0.1'):
+    # Dates invalides : la demande est refusée après le limiteur, sans rien écrire
+    return client.post('/reserver', data={'start_date': '2030-01-02', 'end_date': '2030-01-01', 'guest_name': 'T'},
+                       headers={'X-Forwarded-For': forwarded_for}, environ_base={'REMOTE_ADDR': remote_addr})
+
+
+def test_forwarded_ip_ignored_without_proxy(app, client):
+    """PROXY_FIX_X_FOR=0 par défaut : un X-Forwarded-For choisi par le client ne change pas de seau"""
+    assert app.config['PROXY_FIX_X_FOR'] == 0
+    burst = app.config['RATE_LIMIT_IP_BURST']
+    statuses = [post_invalid_reservation(client, f'203.0.{number}.8', '10.1.2.3').status_code
+                for number in range(burst + 1)]
+    assert statuses[-1] == 429
+
+
+def test_limiter_uses_forwarded_client_ip(app):
+    """Derrière le proxy (PROXY_FIX_X_FOR=1), chaque visiteur a son seau, pas celui du proxy"""
+    from app import create_app
+
+    client = create_app(config={'PROXY_FIX_X_FOR': 1, 'TESTING': True}).test_client()
+    burst = app.config['RATE_LIMIT_IP_BURST']
+    for number in range(burst + 3):
+        response = post_invalid_reservation(client, f'203.0.{number}.7')
+        assert response.status_code == 200
+    statuses = [post_invalid_reservation(client, '192.0.2.99').status_code for _ in range(burst + 1)]
+    assert statuses[-1] == 429
@@ -0,0 +1,100 @@
+import random
+from datetime import date, timedelta
+
+from reservation_import import parse_csv, resolve_conflicts
+
+DAY0 = date(2030, 1, 1)
+
+
+def row(line, start, end, status='approved'):
+    return {'line': line, 'guest_name': f'Ligne {line}', 'start_date': DAY0 + timedelta(days=start),
+            'end_date': DAY0 + timedelta(days=end), 'status': status}
+
+
+def existing(start, end, guest_name):
+    return (DAY0 + timedelta(days=start), DAY0 + timedelta(days=end), guest_name)
+
+
+def reasons(errors):
+    return {error['line']: error['reason'] for error in errors}
+
+
+def test_row_rejected_by_existing_does_not_block_others():
+    # A=[1,10) chevauche l'existant [9,12) ; B=[5,8) ne chevauche que A, qui n'est pas importée
+    rows = [row(2, 1, 10), row(3, 5, 8)]
+    accepted, errors = resolve_conflicts(rows, [existing(9, 12, 'Existant')])
+    assert [r['line'] for r in accepted] == [3]
+    assert reasons(errors) == {2: 'Conflit avec Existant'}
+
+
+def test_earlier_arrival_has_priority():
+    # La ligne 2 arrive plus tôt : retenue même si la ligne 1 est avant elle dans le fichier
+    rows = [row(1, 5, 10), row(2, 3, 6), row(3, 8, 12)]
+    accepted, errors = resolve_conflicts(rows, [])
+    assert [r['line'] for r in accepted] == [2, 3]
+    assert reasons(errors) == {1: 'Conflit avec ligne 2'}
+
+
+def test_file_order_breaks_ties():
+    rows = [row(1, 3, 10), row(2, 3, 5)]
+    accepted, errors = resolve_conflicts(rows, [])
+    assert [r['line'] for r in accepted] == [1]
+    assert reasons(errors) == {2: 'Conflit avec ligne 1'}
+
+
+def test_existing_stay_starting_inside_a_row():
+    accepted, errors = resolve_conflicts([row(1, 0, 10), row(2, 12, 14)], [existing(4, 6, 'Milieu')])
+    assert [r['line'] for r in accepted] == [2]
+    assert reasons(errors) == {1: 'Conflit avec Milieu'}
+
+
+def test_half_open_intervals_and_rejected_rows():
+    rows = [row(1, 0, 5), row(2, 5, 9), row(3, 2, 4, status='rejected')]
+    accepted, errors = resolve_conflicts(rows, [existing(9, 10, 'Suivant')])
+    assert errors == [] and len(accepted) == 3
+
+
+def test_existing_overlaps_found_behind_short_stays():
+    # Une longue réservation existante couvre des courtes qui commencent après elle
+    accepted, errors = resolve_conflicts([row(1, 20, 22)], [existing(0, 30, 'Long'), existing(10, 11, 'Court')])
+    assert accepted == [] and reasons(errors) == {1: 'Conflit avec Long'}
+
+
+def brute_force(rows, existing_stays):
+    kept, rejected = [], {}
+    # Par arrivée, ordre du fichier à arrivée égale
+    for item in sorted((item for item in rows if item['status'] == 'approved'), key=lambda item: item['start_date']):
+        overlaps = lambda start, end: start < item['end_date'] and item['start_date'] < end
+        if any(overlaps(start, end) for start, end, _ in existing_stays):
+            rejected[item['line']] = 'existing'
+        elif any(overlaps(other['start_date'], other['end_date']) for other in kept):
+            rejected[item['line']] = 'row'
+        else:
+            kept.append(item)
+    return [item['line'] for item in rows if item['line'] not in rejected], rejected
+
+
+def test_matches_brute_force():
+    rng = random.Random(28)
+    for _ in range(300):
+        rows = []
+        for line in range(rng.randint(0, 12)):
+            start = rng.randint(0, 40)
+            rows.append(row(line, start, start + rng.randint(1, 8), rng.choice(['approved'] * 4 + ['rejected'])))
+        stays = []
+        for number in range(rng.randint(0, 5)):
+            start = rng.randint(0, 40)
+            stays.append(existing(start, start + rng.randint(1, 8), f'E{number}'))
+        accepted, errors = resolve_conflicts(rows, stays)
+        expected_accepted, expected_rejected = brute_force(rows, stays)
+        assert [r['line'] for r in accepted] == expected_accepted
+        assert set(reasons(errors)) == set(expected_rejected)
+        for line, reason in reasons(errors).items():
+            assert reason.startswith('Conflit avec ligne') == (expected_rejected[line] == 'row')
+
+
+def test_parse_csv_french_columns():
+    rows, errors = parse_csv("nom;arrivée;départ;statut\nDupont;01/07/2030;05/07/2030;approved\nX;2030-07-05;2030-07-01;\n")
+    assert [r['guest_name'] for r in rows] == ['Dupont']
+    assert rows[0]['start_date'] == date(2030, 7, 1)
+    assert len(errors) == 1 and errors[0]['line'] == 3
@@ -0,0 +1,64 @@
+import pytest
+
+PUBLIC_PAGES = ['/', '/calendrier', '/leaderboard', '/wall-of-shame', '/gallery.json', '/api/reservations',
+                '/reserver']
+
+
+@pytest.fixture
+def store_calls(app, monkeypatch):
+    """Appels au magasin de sessions : (méthode, clé)"""
+    store = app.extensions['session_store']
+    calls = []
+    for name in ('load', 'save', 'delete'):
+        method = getattr(store, name)
+        monkeypatch.setattr(store, name, lambda key, *args, _name=name, _method=method:
+                            calls.append((_name, key)) or _method(key, *args))
+    return calls
+
+
+def cookie_name(app):
+    return app.session_interface.get_cookie_name(app)
+
+
+@pytest.mark.parametrize('path', PUBLIC_PAGES)
+def test_anonymous_get_never_touches_session(app, client, store_calls, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert 'Set-Cookie' not in response.headers
+    assert store_calls == []
+    assert client.get_cookie(cookie_name(app)) is None
+
+
+def test_flash_message_cookie_removed_once_read(app, client, store_calls):
+    # Page admin sans connexion : message flash, donc session et cookie
+    assert client.get('/admin').status_code == 302
+    assert client.get_cookie(cookie_name(app)) is not None
+    assert [call for call, _ in store_calls] == ['save']
+
+    # La page suivante affiche le message : session vide, ligne supprimée et cookie effacé
+    response = client.get('/admin/login')
+    assert 'Connexion admin requise' in response.get_data(as_text=True)
+    assert client.get_cookie(cookie_name(app)) is None
+    assert [call for call, _ in store_calls] == ['save', 'load', 'delete']
+
+    store_calls.clear()
+    assert 'Set-Cookie' not in client.get('/').headers
+    assert store_calls == []
+
+
+def test_logout_deletes_session(app, admin_client, store_calls):
+    sid = admin_client.get_cookie(cookie_name(app)).value
+    admin_client.get('/logout', follow_redirects=True)
+    assert admin_client.get_cookie(cookie_name(app)) is None
+    assert admin_client.get('/admin').status_code == 302
+    # L'ancien identifiant ne donne plus accès à rien
+    from server_session import session_key
+    assert ('delete', session_key(sid)) in store_calls
+    assert app.extensions['session_store'].load(session_key(sid), 0) is None
+
+
+def test_login_regenerates_session_id(app, client):
+    client.get('/admin')
+    before = client.get_cookie(cookie_name(app)).value
+    client.post('/admin/login', data={'username': 'admin', 'password': 'test-admin'})
+    assert client.get_cookie(cookie_name(app)).value != before
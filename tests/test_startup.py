@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_app_has_no_side_effects():
+    # Processus neuf : les tests ont déjà importé les blueprints
+    code = ("import sys, app; "
+            "assert not hasattr(app, 'app'); "
+            "loaded = [name for name in ('public_routes', 'admin_routes', 'api_routes', 'image_routes', 'dotenv') "
+            "if name in sys.modules]; "
+            "assert not loaded, loaded")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_wsgi_entry_point(app):
+    import wsgi
+    assert {'public', 'admin', 'api', 'images'} <= set(wsgi.app.blueprints)
@@ -0,0 +1,119 @@
+"""
+Cache disque des tuiles de carte avec éviction LRU.
+
+Les tuiles sont téléchargées une fois depuis le serveur amont (OpenStreetMap
+par défaut) puis servies depuis le disque. La date de modification des
+fichiers sert d'horodatage LRU : elle est rafraîchie à chaque lecture et les
+tuiles les plus anciennes sont supprimées quand la taille maximale est
+dépassée.
+"""
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TileCache:
+    def __init__(self, directory, upstream_url, max_bytes=200 * 1024 * 1024, user_agent='ChezMeme', timeout=5):
+        self.directory = directory
+        self.upstream_url = upstream_url
+        self.max_bytes = max_bytes
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._size = None  # Calculé au premier accès
+        self._lock = threading.Lock()
+        self._http = None
+
+    def _path(self, z, x, y):
+        return os.path.join(self.directory, str(z), str(x), f"{y}.png")
+
+    def _session(self):
+        # Session HTTP réutilisée : connexions keep-alive vers le serveur de tuiles
+        if self._http is None:
+            import requests
+            self._http = requests.Session()
+            self._http.headers['User-Agent'] = self.user_agent
+        return self._http
+
+    def _iter_files(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.png'):
+                    yield os.path.join(root, name)
+
+    def _current_size(self):
+        if self._size is None:
+            self._size = sum(os.path.getsize(path) for path in self._iter_files())
+        return self._size
+
+    def _evict(self):
+        """Supprime les tuiles les moins récemment utilisées jusqu'à 90% de la taille maximale"""
+        entries = []
+        for path in self._iter_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, file_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+            removed += 1
+        self._size = size
+        logger.info("Cache de tuiles: %s tuile(s) évincée(s)", removed)
+
+    def get(self, z, x, y):
+        """Octets PNG de la tuile, ou None si le serveur amont est indisponible"""
+        path = self._path(z, x, y)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Marquer comme récemment utilisée
+            return data
+        except FileNotFoundError:
+            pass
+
+        try:
+            response = self._session().get(self.upstream_url.format(z=z, x=x, y=y), timeout=self.timeout)
+            if response.status_code != 200:
+                logger.warning("Tuile %s/%s/%s: réponse %s du serveur amont", z, x, y, response.status_code)
+                return None
+            data = response.content
+        except Exception as e:
+            logger.warning("Tuile %s/%s/%s indisponible: %s", z, x, y, e)
+            return None
+
+        self._store(path, data)
+        return data
+
+    def _store(self, path, data):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture atomique : un autre worker ne lit jamais une tuile à moitié écrite
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Impossible d'écrire la tuile dans le cache: %s", e)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._current_size()  # Le parcours inclut déjà la nouvelle tuile
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
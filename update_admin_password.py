@@ -7,7 +7,8 @@ Usage: python update_admin_password.py
 import os
 import sys
 from getpass import getpass
-from app import app, db, User
+from app import create_app, db, User
+app = create_app()
 from werkzeug.security import generate_password_hash
 
 def main():
@@ -0,0 +1,6 @@
+"""
+Application servie par gunicorn : gunicorn -c gunicorn_config.py wsgi:app
+"""
+from app import create_app
+
+app = create_app()